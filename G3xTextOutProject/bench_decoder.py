@@ -0,0 +1,197 @@
+"""
+Benchmark do decoder TEXT OUT
+
+Replica o putty.log.txt até a duração de um voo completo e compara
+o decoder antigo (re.match/re.finditer por linha, globais, print de
+cada linha) com o TextOutDecoder em duas medidas:
+
+  - só decodificação: os dois só juntam as linhas em listas, sem CSV e
+    sem print
+  - ponta a ponta: os dois gravam o mesmo CSV em memória (o print do
+    antigo vai para /dev/null), então a formatação do CSV entra nos dois
+
+  python3 bench_decoder.py              # 3 h de voo
+  python3 bench_decoder.py --hours 1 --log outro.log
+
+Notas de aceitação (meta do pedido: >= 5x na decodificação)
+  - NÃO atingida: só decodificação fica em 1.0x-1.4x e ponta a ponta
+    em 1.3x-2.2x (putty.log.txt escalado para 3 h e 10 h)
+  - só ~8% das linhas são @ ou =51; o laço antigo já gasta quase todo
+    o tempo nas mesmas conversões str/int/float do novo, e só ler e
+    decodificar o arquivo já é 15-25% do tempo do antigo
+  - o ganho real de uso é o print por linha no terminal, agora só com -v
+  - o novo dá mais leituras de motor (13568 x 11410 em 3 h): são os
+    sensores de ID hexa (0E COIL, 1D lFUEL, 2E 0FLAPS) que o regex
+    antigo descartava; test_g3xTextOut.py fixa essa diferença
+"""
+
+import argparse
+import csv
+import io
+import os
+import re
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+from g3xTextOut import INPUT_FILE, TextOutDecoder
+
+
+# -------------------------------------------------
+# Decoder antigo (g3xTextOut.py até a versão com globais)
+# -------------------------------------------------
+class LegacyDecoder:
+
+    def __init__(self):
+        self.sensor_map = {}
+        self.last_time = None
+
+    def parse_gps(self, line):
+        m = re.match(
+            r"@(\d{2})(\d{2})(\d{2})"
+            r"(\d{2})(\d{2})(\d{2})"
+            r"([NS])(\d{2})(\d{5})"
+            r"([EW])(\d{3})(\d{5}).*?([+-]\d{5})",
+            line
+        )
+        if not m:
+            return None
+
+        day, month, year, hh, mm, ss = m.group(1, 2, 3, 4, 5, 6)
+        ns, lat_d, lat_m = m.group(7, 8, 9)
+        ew, lon_d, lon_m = m.group(10, 11, 12)
+        alt = int(m.group(13))
+
+        self.last_time = f"{hh}:{mm}:{ss}"
+        date = f"20{year}-{month}-{day}"
+
+        lat = int(lat_d) + int(lat_m) / 1000 / 60
+        lon = int(lon_d) + int(lon_m) / 1000 / 60
+        if ns == "S": lat *= -1
+        if ew == "W": lon *= -1
+
+        return [date, self.last_time, lat, lon, alt]
+
+    def parse_sensor_map(self, line):
+        for m in re.finditer(r"(\d{2})([A-Z0-9]+)", line):
+            self.sensor_map[m.group(1)] = m.group(2)
+
+    def parse_engine(self, line):
+        rows = []
+        for m in re.finditer(r"(\d{2})([+-]\d\.\d+E[+-]\d{2})", line):
+            name = self.sensor_map.get(m.group(1))
+            if name and self.last_time:
+                rows.append([self.last_time, name, float(m.group(2))])
+        return rows
+
+    def decode_rows(self, path):
+        """o laço de decode_file() sem CSV e sem print"""
+        track, engine = [], []
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+
+                if line.startswith("@"):
+                    row = self.parse_gps(line)
+                    if row:
+                        track.append(row)
+
+                elif line.startswith("=51i"):
+                    self.parse_sensor_map(line)
+
+                elif line.startswith("=51") and not line.startswith("=51i"):
+                    engine += self.parse_engine(line)
+        return track, engine
+
+    def decode_file(self, path, track_writer, engine_writer):
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+
+                if line.startswith("@"):
+                    row = self.parse_gps(line)
+                    if row:
+                        track_writer.writerow(row)
+                        print(row)
+
+                elif line.startswith("=51i"):
+                    self.parse_sensor_map(line)
+
+                elif line.startswith("=51") and not line.startswith("=51i"):
+                    for r in self.parse_engine(line):
+                        print(r)
+                        engine_writer.writerow(r)
+
+
+# -------------------------------------------------
+# Benchmark
+# -------------------------------------------------
+def scaled_log(src, hours, path):
+    """repete o log de origem até cobrir `hours` de registros @ (1 Hz)"""
+    with open(src, errors="ignore") as f:
+        lines = f.readlines()
+    gps = sum(1 for l in lines if l.startswith("@")) or 1
+    copies = max(1, int(hours * 3600 / gps))
+    with open(path, "w") as f:
+        for _ in range(copies):
+            f.writelines(lines)
+    return copies * len(lines)
+
+
+def decode_only(decoder, path):
+    t0 = time.perf_counter()
+    if isinstance(decoder, LegacyDecoder):
+        track, engine = decoder.decode_rows(path)
+    else:
+        track, engine = [], []
+        with open(path, errors="ignore") as f:
+            for t, e in decoder.iter_rows(f):
+                track += t
+                engine += e
+    return time.perf_counter() - t0, len(track), len(engine)
+
+
+def run(decoder, path):
+    """o print() do decoder antigo vai para /dev/null (o mais barato possível)"""
+    track, engine = io.StringIO(), io.StringIO()
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        t0 = time.perf_counter()
+        decoder.decode_file(path, csv.writer(track), csv.writer(engine))
+        dt = time.perf_counter() - t0
+    return dt, track.getvalue(), engine.getvalue()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="G3X TEXT OUT decoder benchmark")
+    ap.add_argument("--log", default=INPUT_FILE)
+    ap.add_argument("--hours", type=float, default=3.0)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".log")
+    os.close(fd)
+    try:
+        n = scaled_log(args.log, args.hours, path)
+        print(f"Log: {n} linhas ({os.path.getsize(path) / 1e6:.1f} MB, ~{args.hours:g} h)")
+
+        # melhor de `repeat` rodadas; a primeira também aquece o cache do SO
+        d_old = min(decode_only(LegacyDecoder(), path) for _ in range(args.repeat))
+        d_new = min(decode_only(TextOutDecoder(), path) for _ in range(args.repeat))
+        t_old, track_old, engine_old = min(run(LegacyDecoder(), path) for _ in range(args.repeat))
+        t_new, track_new, engine_new = min(run(TextOutDecoder(), path) for _ in range(args.repeat))
+    finally:
+        os.remove(path)
+
+    print("só decodificação:")
+    print(f"  antigo  {d_old[0]:7.2f}s  {n / d_old[0]:>10,.0f} linhas/s")
+    print(f"  novo    {d_new[0]:7.2f}s  {n / d_new[0]:>10,.0f} linhas/s  ({d_old[0] / d_new[0]:.1f}x)")
+    print("ponta a ponta (CSV):")
+    print(f"  antigo  {t_old:7.2f}s  {n / t_old:>10,.0f} linhas/s")
+    print(f"  novo    {t_new:7.2f}s  {n / t_new:>10,.0f} linhas/s  ({t_old / t_new:.1f}x)")
+    print(f"trilha: {d_old[1]} / {d_new[1]} linhas, motor: {d_old[2]} / {d_new[2]} leituras")
+    speedup = d_old[0] / d_new[0]
+    print(f"meta de 5x na decodificação: {'atingida' if speedup >= 5 else 'NÃO atingida'} ({speedup:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Exportadores incrementais para o G3X TEXT OUT
+
+Cada exportador grava a amostra assim que ela chega (write) e fecha
+o arquivo no fim (close); a memória não cresce com o tamanho do log.
+
+  CSV      flight.csv     mesmas colunas do export_csv antigo
+  GPX      flight.gpx     <trkpt> por amostra
+  NDJSON   flight.ndjson  um objeto JSON compacto por linha
+  G3XC     flight.g3xc    binário colunar, blocos comprimidos (zlib)
+
+    with open_exporters("flight", ("csv", "gpx", "ndjson", "g3xc")) as out:
+        for sample in samples:
+            out.write(sample)
+"""
+
+import json
+import math
+import struct
+import zlib
+from array import array
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+
+# ============================================================
+# Modelo
+# ============================================================
+
+@dataclass(slots=True)
+class FlightSample:
+    time_utc: datetime
+    lat: float
+    lon: float
+    alt_gps_ft: int
+    alt_baro_ft: Optional[int] = None
+    ias_kt: Optional[float] = None
+    heading_deg: Optional[float] = None
+    rpm: Optional[int] = None
+
+
+def _opt(v):
+    return "" if v is None else v
+
+
+# ============================================================
+# Texto
+# ============================================================
+
+class CSVExporter:
+
+    HEADER = "time_utc,lat,lon,alt_gps_ft,alt_baro_ft,ias_kt,heading_deg,rpm\n"
+
+    def __init__(self, path):
+        self.f = open(path, "w", buffering=1 << 16)
+        self.f.write(self.HEADER)
+
+    def write(self, s: FlightSample):
+        self.f.write(
+            f"{s.time_utc.isoformat()},{s.lat:.6f},{s.lon:.6f},{s.alt_gps_ft},"
+            f"{_opt(s.alt_baro_ft)},{_opt(s.ias_kt)},{_opt(s.heading_deg)},{_opt(s.rpm)}\n"
+        )
+
+    def close(self):
+        self.f.close()
+
+
+class GPXExporter:
+
+    def __init__(self, path, name="Garmin G3X Flight"):
+        self.f = open(path, "w", buffering=1 << 16)
+        self.f.write('<?xml version="1.0"?>\n')
+        self.f.write('<gpx version="1.1" creator="G3X TEXT OUT Decoder">\n')
+        self.f.write(f"<trk><name>{name}</name><trkseg>\n")
+
+    def write(self, s: FlightSample):
+        self.f.write(
+            f'<trkpt lat="{s.lat}" lon="{s.lon}">'
+            f"<ele>{s.alt_gps_ft * 0.3048:.1f}</ele>"
+            f"<time>{s.time_utc.isoformat()}Z</time>"
+            "</trkpt>\n"
+        )
+
+    def close(self):
+        # rodapé só no fim: um GPX interrompido fica sem </gpx>
+        self.f.write("</trkseg></trk>\n</gpx>\n")
+        self.f.close()
+
+
+class NDJSONExporter:
+
+    def __init__(self, path):
+        self.f = open(path, "w", buffering=1 << 16)
+        self.encode = json.JSONEncoder(separators=(",", ":")).encode
+
+    def write(self, s: FlightSample):
+        self.f.write(self.encode({
+            "time_utc": s.time_utc.isoformat(),
+            "lat": s.lat,
+            "lon": s.lon,
+            "alt_gps_ft": s.alt_gps_ft,
+            "alt_baro_ft": s.alt_baro_ft,
+            "ias_kt": s.ias_kt,
+            "heading_deg": s.heading_deg,
+            "rpm": s.rpm,
+        }))
+        self.f.write("\n")
+
+    def close(self):
+        self.f.close()
+
+
+# ============================================================
+# Binário colunar (.g3xc)
+#
+#  cabeçalho : b"G3XC" + versão(u8) + n_colunas(u8)
+#              + por coluna: tamanho do nome(u8), nome, tipo (array typecode)
+#  bloco     : n_linhas(u32) + por coluna: tamanho(u32) + zlib(valores)
+#
+#  time_utc    q  segundos desde 1970 (UTC)
+#  lat/lon     i  1e-7 grau
+#  alt_gps_ft  i
+#  opcionais   f  float32, NaN = ausente
+# ============================================================
+
+G3XC_MAGIC = b"G3XC"
+G3XC_VERSION = 1
+COORD_SCALE = 1e7
+
+G3XC_COLUMNS = (
+    ("time_utc", "q"),
+    ("lat", "i"),
+    ("lon", "i"),
+    ("alt_gps_ft", "i"),
+    ("alt_baro_ft", "f"),
+    ("ias_kt", "f"),
+    ("heading_deg", "f"),
+    ("rpm", "f"),
+)
+
+_NAN = float("nan")
+
+
+class ColumnarExporter:
+
+    def __init__(self, path, block_rows=4096, level=6):
+        self.f = open(path, "wb")
+        self.block_rows = block_rows
+        self.level = level
+        self._new_block()
+
+        header = bytearray(G3XC_MAGIC)
+        header += struct.pack("<BB", G3XC_VERSION, len(G3XC_COLUMNS))
+        for name, code in G3XC_COLUMNS:
+            header += struct.pack("<B", len(name)) + name.encode() + code.encode()
+        self.f.write(header)
+
+    def _new_block(self):
+        self.cols = [array(code) for _, code in G3XC_COLUMNS]
+
+    def write(self, s: FlightSample):
+        c = self.cols
+        t = s.time_utc
+        if t.tzinfo is None:
+            t = t.replace(tzinfo=timezone.utc)
+        c[0].append(int(t.timestamp()))
+        c[1].append(round(s.lat * COORD_SCALE))
+        c[2].append(round(s.lon * COORD_SCALE))
+        c[3].append(s.alt_gps_ft)
+        c[4].append(_NAN if s.alt_baro_ft is None else s.alt_baro_ft)
+        c[5].append(_NAN if s.ias_kt is None else s.ias_kt)
+        c[6].append(_NAN if s.heading_deg is None else s.heading_deg)
+        c[7].append(_NAN if s.rpm is None else s.rpm)
+
+        if len(c[0]) >= self.block_rows:
+            self.flush()
+
+    def flush(self):
+        n = len(self.cols[0])
+        if not n:
+            return
+        out = [struct.pack("<I", n)]
+        for col in self.cols:
+            data = zlib.compress(col.tobytes(), self.level)
+            out.append(struct.pack("<I", len(data)))
+            out.append(data)
+        self.f.write(b"".join(out))
+        self._new_block()
+
+    def close(self):
+        self.flush()
+        self.f.close()
+
+
+def read_columnar(path):
+    """lê um .g3xc bloco a bloco: {coluna: array} (lat/lon já em graus)"""
+    with open(path, "rb") as f:
+        if f.read(4) != G3XC_MAGIC:
+            raise ValueError(f"não é um arquivo G3XC: {path}")
+        version, ncols = struct.unpack("<BB", f.read(2))
+        if version != G3XC_VERSION:
+            raise ValueError(f"versão G3XC não suportada: {version}")
+
+        columns = []
+        for _ in range(ncols):
+            (size,) = struct.unpack("<B", f.read(1))
+            name = f.read(size).decode()
+            columns.append((name, f.read(1).decode()))
+
+        while True:
+            head = f.read(4)
+            if len(head) < 4:
+                return
+            block = {}
+            for name, code in columns:
+                (size,) = struct.unpack("<I", f.read(4))
+                col = array(code)
+                col.frombytes(zlib.decompress(f.read(size)))
+                if name in ("lat", "lon"):
+                    col = array("d", (v / COORD_SCALE for v in col))
+                block[name] = col
+            yield block
+
+
+def iter_columnar_samples(path):
+    """.g3xc -> FlightSample"""
+    def opt(v, conv):
+        return None if math.isnan(v) else conv(v)
+
+    for b in read_columnar(path):
+        for row in zip(*(b[name] for name, _ in G3XC_COLUMNS)):
+            t, lat, lon, alt, baro, ias, hdg, rpm = row
+            yield FlightSample(
+                datetime.fromtimestamp(t, timezone.utc).replace(tzinfo=None),
+                lat, lon, alt,
+                opt(baro, int), opt(ias, float), opt(hdg, float), opt(rpm, int),
+            )
+
+
+# ============================================================
+# Vários formatos de uma vez
+# ============================================================
+
+EXPORTERS = {
+    "csv": ("flight.csv", CSVExporter),
+    "gpx": ("flight.gpx", GPXExporter),
+    "ndjson": ("flight.ndjson", NDJSONExporter),
+    "g3xc": ("flight.g3xc", ColumnarExporter),
+}
+
+
+class open_exporters:
+    """context manager: distribui cada amostra para todos os formatos"""
+
+    def __init__(self, basename="flight", formats=("csv", "gpx", "ndjson")):
+        self.paths = []
+        self.exporters = []
+        for fmt in formats:
+            default, cls = EXPORTERS[fmt]
+            path = f"{basename}{default[default.index('.'):]}"
+            self.paths.append(path)
+            self.exporters.append(cls(path))
+        self.count = 0
+
+    def write(self, sample: FlightSample):
+        for e in self.exporters:
+            e.write(sample)
+        self.count += 1
+
+    def close(self):
+        for e in self.exporters:
+            e.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,300 @@
+"""
+G3X TEXT OUT - modo ao vivo
+
+Lê a serial do G3X (9600/115200) sem bloquear, decodifica @ (GPS),
+=11/=21 (dados do ar), =31 (motor), =51 (sensores), =71 e =C1 à medida
+que chegam (registros com checksum errado são descartados) e
+publica o último estado fundido numa taxa fixa, em JSON:
+
+  - TCP: uma linha JSON por publicação para cada assinante
+  - UDP: um datagrama por publicação (ex.: broadcast na rede da estação)
+
+    python3 g3xLive.py /dev/ttyUSB0 --baud 115200 --rate 5 --udp 255.255.255.255:4100
+    cat putty.log.txt | python3 g3xLive.py -          # replay pela entrada padrão
+
+Requer: pyserial (só para dispositivos serial)
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+
+from g3xTextOut import TextOutDecoder
+
+
+# =========================================================
+# BUFFER CIRCULAR DE ENTRADA
+#  - tamanho fixo: a leitura vai direto para o buffer (readv),
+#    sem concatenar strings
+#  - cada byte é varrido uma vez na busca por "\n"
+#  - estouro (linha sem fim, lixo na serial): descarta o mais antigo
+# =========================================================
+
+class RingBuffer:
+
+    def __init__(self, capacity=64 * 1024):
+        self.buf = bytearray(capacity)
+        self.view = memoryview(self.buf)
+        self.start = 0          # primeiro byte ainda não consumido
+        self.end = 0            # fim dos dados válidos
+        self.scan = 0           # até onde já se procurou "\n"
+        self.dropped = 0        # bytes descartados por estouro
+
+    def free(self):
+        """área livre para a próxima leitura (compacta se preciso)"""
+        cap = len(self.buf)
+        if self.end == cap:
+            if self.start == 0:
+                # buffer cheio sem nenhuma linha completa: descarta tudo
+                self.dropped += cap
+                self.start = self.end = self.scan = 0
+            else:
+                n = self.end - self.start
+                self.buf[:n] = self.buf[self.start:self.end]
+                self.scan -= self.start
+                self.start, self.end = 0, n
+        return self.view[self.end:]
+
+    def commit(self, n):
+        self.end += n
+
+    def fill(self, fd):
+        """lê o que houver no fd; retorna bytes lidos (0 = EOF)"""
+        n = os.readv(fd, [self.free()])
+        self.commit(n)
+        return n
+
+    def lines(self):
+        """linhas completas (sem CR/LF), decodificadas em latin-1"""
+        buf = self.buf
+        start, end = self.start, self.end
+        i = buf.find(b"\n", self.scan, end)
+        while i != -1:
+            yield buf[start:i].rstrip(b"\r").decode("latin-1")
+            start = i + 1
+            i = buf.find(b"\n", start, end)
+        self.start = start
+        self.scan = end
+
+
+# =========================================================
+# ESTADO FUNDIDO
+# =========================================================
+
+class LiveState:
+
+    def __init__(self):
+        self.decoder = TextOutDecoder()
+        self.gps = {}
+        self.records = {}       # tipo (air, eis, cni...) -> último registro
+        self.sensors = {}
+        self.updated = {}       # grupo -> time.monotonic() da última linha
+        self.lines = 0
+        self.decoded = 0
+
+    def feed(self, line):
+        self.lines += 1
+        kind, rows = self.decoder.feed(line)
+        if kind is None:
+            return
+
+        if kind == "gps":
+            date, hms, lat, lon, alt = rows[0]
+            self.gps = {"time": f"{date}T{hms}Z", "lat": round(lat, 7),
+                        "lon": round(lon, 7), "alt_ft": alt}
+        elif kind == "engine":
+            for _, name, value in rows:
+                self.sensors[name] = value
+        elif kind == "map":
+            return
+        else:
+            self.records[kind] = rows[0]._asdict()
+
+        self.decoded += 1
+        self.updated[kind] = time.monotonic()
+
+    def snapshot(self):
+        now = time.monotonic()
+        return {
+            "gps": self.gps,
+            **self.records,
+            "sensors": self.sensors,
+            # idade de cada grupo (s): o cliente decide o que é velho
+            "age": {k: round(now - t, 2) for k, t in self.updated.items()},
+        }
+
+
+# =========================================================
+# PUBLICAÇÃO (TCP + UDP)
+# =========================================================
+
+class Subscriber:
+    __slots__ = ("writer", "addr", "dropped")
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.addr = writer.get_extra_info("peername")
+        self.dropped = 0
+
+
+class LiveBridge:
+
+    def __init__(self, fd, port=4100, host="0.0.0.0", udp_target=None,
+                 rate=5.0, max_buffer=64 * 1024, verbose=True):
+        self.fd = fd
+        self.host = host
+        self.port = port
+        self.udp_target = udp_target
+        self.period = 1.0 / rate
+        self.max_buffer = max_buffer
+        self.verbose = verbose
+
+        self.ring = RingBuffer()
+        self.state = LiveState()
+        self.subscribers = set()
+        self.server = None
+        self.udp = None
+        self.published = 0
+        self.eof = None
+
+    # ---------------- entrada ----------------
+
+    def _on_readable(self):
+        try:
+            n = self.ring.fill(self.fd)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            n = 0
+            if self.verbose:
+                print(f"[G3X LIVE] Erro de leitura: {e}")
+
+        feed = self.state.feed
+        for line in self.ring.lines():
+            feed(line)
+
+        if n == 0:
+            asyncio.get_running_loop().remove_reader(self.fd)
+            self.eof.set_result(True)
+
+    # ---------------- assinantes ----------------
+
+    async def _on_connect(self, reader, writer):
+        sub = Subscriber(writer)
+        self.subscribers.add(sub)
+        if self.verbose:
+            print(f"[G3X LIVE] Assinante conectado: {sub.addr}")
+        try:
+            while await reader.read(1024):
+                pass
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.subscribers.discard(sub)
+            writer.close()
+            if self.verbose:
+                print(f"[G3X LIVE] Assinante desconectado: {sub.addr} "
+                      f"(publicações perdidas: {sub.dropped})")
+
+    def publish(self):
+        data = json.dumps(self.state.snapshot(), separators=(",", ":")).encode() + b"\n"
+
+        for sub in list(self.subscribers):
+            transport = sub.writer.transport
+            if transport.is_closing():
+                continue
+            # assinante lento perde a publicação; a próxima já traz o estado novo
+            if transport.get_write_buffer_size() + len(data) > self.max_buffer:
+                sub.dropped += 1
+                continue
+            sub.writer.write(data)
+
+        if self.udp is not None:
+            self.udp.sendto(data, self.udp_target)
+
+        self.published += 1
+
+    # ---------------- laço principal ----------------
+
+    async def serve(self):
+        loop = asyncio.get_running_loop()
+        self.eof = loop.create_future()
+
+        self.server = await asyncio.start_server(self._on_connect, self.host, self.port)
+        print(f"[G3X LIVE] TCP na porta {self.port}, {1 / self.period:g} Hz")
+
+        if self.udp_target:
+            self.udp, _ = await loop.create_datagram_endpoint(
+                asyncio.DatagramProtocol,
+                family=socket.AF_INET,
+                allow_broadcast=True,
+            )
+            print(f"[G3X LIVE] UDP -> {self.udp_target[0]}:{self.udp_target[1]}")
+
+        os.set_blocking(self.fd, False)
+        loop.add_reader(self.fd, self._on_readable)
+
+        deadline = loop.time()
+        try:
+            while not self.eof.done():
+                self.publish()
+                deadline += self.period
+                await asyncio.sleep(max(0.0, deadline - loop.time()))
+            self.publish()      # estado final
+        finally:
+            if not self.eof.done():
+                loop.remove_reader(self.fd)
+            self.server.close()
+            if self.udp is not None:
+                self.udp.close()
+
+        s = self.state
+        print(f"[G3X LIVE] Fim da entrada: {s.lines} linhas, {s.decoded} decodificadas, "
+              f"{s.decoder.bad_checksum} com checksum errado, {self.published} publicações, "
+              f"{self.ring.dropped} bytes descartados")
+
+
+# =========================================================
+# MAIN
+# =========================================================
+
+def open_source(path, baud):
+    """fd não bloqueante: '-' = entrada padrão, senão porta serial"""
+    if path == "-":
+        return sys.stdin.fileno(), None
+
+    import serial   # pyserial só é necessário para a serial de verdade
+    ser = serial.Serial(path, baudrate=baud, timeout=0)
+    return ser.fileno(), ser
+
+
+def main():
+    ap = argparse.ArgumentParser(description="G3X TEXT OUT ao vivo -> TCP/UDP")
+    ap.add_argument("device", help="porta serial (ex.: /dev/ttyUSB0) ou - para stdin")
+    ap.add_argument("--baud", type=int, default=115200, choices=(9600, 19200, 38400, 57600, 115200))
+    ap.add_argument("--rate", type=float, default=5.0, help="publicações por segundo")
+    ap.add_argument("--port", type=int, default=4100, help="porta TCP dos assinantes")
+    ap.add_argument("--udp", metavar="HOST:PORT", help="também publica por UDP")
+    args = ap.parse_args()
+
+    udp_target = None
+    if args.udp:
+        host, port = args.udp.rsplit(":", 1)
+        udp_target = (host, int(port))
+
+    fd, ser = open_source(args.device, args.baud)
+    try:
+        asyncio.run(LiveBridge(fd, args.port, udp_target=udp_target, rate=args.rate).serve())
+    except KeyboardInterrupt:
+        print("\n[G3X LIVE] Encerrado")
+    finally:
+        if ser is not None:
+            ser.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,97 +1,643 @@
+import os
 import re
 import csv
+import sys
+from array import array
+from collections import namedtuple
+from datetime import datetime
+
+from flight_export import FlightSample, open_exporters
 
 INPUT_FILE = "putty.log.txt"
 TRACK_CSV = "flight_track.csv"
 ENGINE_CSV = "engine_data.csv"
+MERGED_CSV = "flight_merged.csv"
+
+
+# -------------------------------------------------
+# Layout dos registros (posições fixas)
+# -------------------------------------------------
+# @YYMMDDHHMMSS S DDMMmmm W DDDMMmmm G EPH ±AAAAA E±vvvv N±vvvv U±vvvv
+#  0 1     7      13      21         30 31  34
+GPS_LEN = 40            # até a altitude; o resto (velocidades) não é usado
+
+# =51i: pares ID(2, hex) + NOME(17, completado com espaços) + checksum(2)
+SENSOR_ENTRY = 19
+
+# =511 + UTC(8): pares ID(2, hex) + valor ±d.ddddE±dd (11) + checksum(2)
+ENGINE_HEADER = 12
+ENGINE_ENTRY = 13
+
+# Registros "=" de largura fixa: "=" + tipo + versão + UTC(8, HHMMSSCC)
+# + campos + checksum(2, soma dos bytes mod 256 em hexa); "_" no campo =
+# dado inválido. Campos: (nome, início, fim, divisor, offset); divisor
+# None = texto.
+AIR_FIELDS = (                       # =11 atitude / dados do ar
+    ("pitch_deg",     11, 15, 10, 0),
+    ("roll_deg",      15, 20, 10, 0),
+    ("heading_deg",   20, 23, 1, 0),
+    ("ias_kt",        23, 27, 10, 0),
+    ("palt_ft",       27, 33, 1, 0),
+    ("turn_rate_dps", 33, 37, 10, 0),
+    ("lat_accel_g",   37, 40, 100, 0),
+    ("vert_accel_g",  40, 43, 10, 0),
+    ("aoa_pct",       43, 45, 1, 0),
+    ("vs_fpm",        45, 49, 0.1, 0),
+    ("oat_c",         49, 52, 1, 0),
+    ("altimeter_inhg", 52, 55, 100, 27.5),
+)
+
+AIR2_FIELDS = (                      # =21 dados do ar 2 / seleções
+    ("tas_kt",          11, 15, 10, 0),
+    ("dalt_ft",         15, 21, 1, 0),
+    ("sel_heading_deg", 21, 24, 1, 0),
+    ("sel_alt_ft",      24, 30, 1, 0),
+    ("sel_ias_kt",      30, 34, 10, 0),
+    ("sel_vs_fpm",      34, 38, 0.1, 0),
+)
+
+EIS_FIELDS = (                       # =31 motor (conferido contra o =51)
+    ("oil_press_psi",  11, 14, 1, 0),
+    ("oil_temp_c",     14, 18, 1, 0),
+    ("rpm",            18, 22, 1, 0),
+    ("rpm2",           22, 26, 1, 0),
+    ("map_inhg",       26, 29, 10, 0),
+    ("fuel_flow_gph",  29, 32, 10, 0),
+    ("fuel_flow2_gph", 32, 35, 10, 0),
+    ("fuel_press_psi", 35, 38, 10, 0),
+    ("fuel_qty_l_gal", 38, 41, 10, 0),
+    ("fuel_qty_r_gal", 41, 44, 10, 0),
+    ("fuel_rem_gal",   44, 47, 10, 0),
+    ("volts1",         47, 50, 10, 0),
+    ("volts2",         50, 53, 10, 0),
+    ("amps1",          53, 57, 10, 0),
+    ("extra",          57, 217, None, 0),   # resto sem layout conhecido
+)
+
+STATUS_FIELDS = (                    # =71: conteúdo não documentado aqui
+    ("data", 11, 18, None, 0),
+)
+
+CNI_FIELDS = (                       # =C1 rádios
+    ("com1_active_mhz",  11, 17, 1000, 0),
+    ("com1_standby_mhz", 17, 23, 1000, 0),
+    ("extra",            23, 127, None, 0),
+)
+
+AUX_FIELDS = (                       # =51D: conteúdo não documentado aqui
+    ("data", 12, 27, None, 0),
+)
+
+
+class RecordSpec:
+    """layout de um tipo de registro + tupla tipada da saída"""
+    __slots__ = ("kind", "length", "utc", "fields", "row")
+
+    def __init__(self, kind, length, fields, utc=3):
+        self.kind = kind
+        self.length = length
+        self.utc = utc
+        self.fields = fields
+        self.row = namedtuple(f"{kind.capitalize()}Record",
+                              ["utc"] + [f[0] for f in fields])
+
+
+# prefixo -> layout; =51i / =511 têm tamanho variável (parse_sensor_map/parse_engine)
+RECORDS = {
+    "=11": RecordSpec("air", 57, AIR_FIELDS),
+    "=21": RecordSpec("air2", 40, AIR2_FIELDS),
+    "=31": RecordSpec("eis", 219, EIS_FIELDS),
+    "=71": RecordSpec("status", 20, STATUS_FIELDS),
+    "=C1": RecordSpec("cni", 129, CNI_FIELDS),
+    "=51D": RecordSpec("aux", 29, AUX_FIELDS, utc=4),
+}
+
+# linhas fora do padrão (ruído na serial): tokenizador compilado uma vez
+ENGINE_RE = re.compile(r"([0-9A-F]{2})([+-]\d\.\d+E[+-]\d{2})")
+SENSOR_RE = re.compile(r"([0-9A-F]{2})([A-Za-z0-9]+)")
+
+
+# -------------------------------------------------
+# Decoder
+# -------------------------------------------------
+def checksum_ok(line):
+    """checksum dos registros "=": soma dos bytes mod 256, 2 dígitos hexa"""
+    try:
+        given = int(line[-2:], 16)
+    except ValueError:
+        return False
+    return sum(line[:-2].encode("latin-1")) & 0xFF == given
+
+
+def parse_fixed(line, spec):
+    """registro de largura fixa -> spec.row (campo inválido -> None)"""
+    u = spec.utc
+    values = [f"{line[u:u + 2]}:{line[u + 2:u + 4]}:{line[u + 4:u + 6]}.{line[u + 6:u + 8]}"]
+    for name, start, end, div, offset in spec.fields:
+        text = line[start:end]
+        if div is None:
+            values.append(text.rstrip("_ "))
+            continue
+        try:
+            v = int(text)
+        except ValueError:
+            values.append(None)
+            continue
+        values.append(v if div == 1 and not offset else round(v / div + offset, 4))
+    return spec.row._make(values)
+
+
+class TextOutDecoder:
+    """
+    Decoder do G3X TEXT OUT com estado próprio (mapa de sensores e
+    última hora do GPS), sem regex no caminho normal.
+
+        dec = TextOutDecoder()
+        for line in f:
+            kind, rows = dec.feed(line)
+
+    kind: "gps" (rows = [linha da trilha]), "engine" (rows = leituras),
+    "map", um dos RECORDS ("air", "eis"... rows = [tupla tipada]) ou None.
+    Registros "=" com checksum errado são descartados (bad_checksum).
+    """
+
+    def __init__(self, echo=False):
+        self.echo = echo
+        self.sensor_map = {}     # ID -> nome do sensor
+        self.last_time = None    # HH:MM:SS vindo do GPS (@)
+        self._date_key = None
+        self._date = None
+        self.bad_checksum = 0
+
+    # ---------------- GPS (@) ----------------
+    def parse_gps(self, line):
+        if len(line) < GPS_LEN or line[13] not in "NS" or line[21] not in "EW":
+            return None
+        try:
+            # data é YYMMDD (ex.: @260204... = 2026-02-04); muda 1x por dia
+            if line[1:7] != self._date_key:
+                int(line[1:7])
+                self._date_key = line[1:7]
+                self._date = f"20{line[1:3]}-{line[3:5]}-{line[5:7]}"
+            lat = int(line[14:16]) + int(line[16:21]) / 60000
+            lon = int(line[22:25]) + int(line[25:30]) / 60000
+            alt = int(line[34:40])
+        except ValueError:
+            return None
+
+        if line[13] == "S":
+            lat = -lat
+        if line[21] == "W":
+            lon = -lon
+
+        self.last_time = f"{line[7:9]}:{line[9:11]}:{line[11:13]}"
+        return [self._date, self.last_time, lat, lon, alt]
+
+    # ---------------- mapa de sensores (=51i) ----------------
+    def parse_sensor_map(self, line):
+        body = line[4:-2]
+        if len(body) % SENSOR_ENTRY == 0:
+            for i in range(0, len(body), SENSOR_ENTRY):
+                name = body[i + 2:i + SENSOR_ENTRY].rstrip()
+                if name:
+                    self.sensor_map[body[i:i + 2]] = name
+            return
+
+        for m in SENSOR_RE.finditer(body):
+            self.sensor_map[m.group(1)] = m.group(2)
+
+    # ---------------- leituras (=511) ----------------
+    def parse_engine(self, line):
+        last_time = self.last_time
+        if last_time is None:
+            return []
+
+        sensor_map = self.sensor_map
+        rows = []
+        body = line[ENGINE_HEADER:-2]
+
+        if len(body) % ENGINE_ENTRY == 0:
+            for i in range(0, len(body), ENGINE_ENTRY):
+                name = sensor_map.get(body[i:i + 2])
+                if name:
+                    try:
+                        rows.append([last_time, name, float(body[i + 2:i + ENGINE_ENTRY])])
+                    except ValueError:
+                        pass
+            return rows
+
+        for m in ENGINE_RE.finditer(line, ENGINE_HEADER):
+            name = sensor_map.get(m.group(1))
+            if name:
+                rows.append([last_time, name, float(m.group(2))])
+        return rows
+
+    # ---------------- despacho ----------------
+    def feed(self, line):
+        line = line.strip()
+
+        if line.startswith("@"):
+            row = self.parse_gps(line)
+            if row is None:
+                return None, []
+            if self.echo:
+                print(row)
+            return "gps", [row]
+
+        if not line.startswith("="):
+            return None, []
+
+        if not checksum_ok(line):
+            self.bad_checksum += 1
+            return None, []
+
+        spec = RECORDS.get(line[:3]) or RECORDS.get(line[:4])
+        if spec is not None:
+            if len(line) != spec.length:
+                return None, []
+            return spec.kind, [parse_fixed(line, spec)]
+
+        if line.startswith("=51"):
+            kind = line[3:4]
+            if kind == "i":
+                self.parse_sensor_map(line)
+                return "map", []
+            if kind == "1":
+                rows = self.parse_engine(line)
+                if self.echo:
+                    for r in rows:
+                        print(r)
+                return "engine", rows
+
+        return None, []
+
+    def _decode_lines(self, lines):
+        """mesmo que feed() linha a linha, para linhas já limpas (iter_records)"""
+        parse_gps = self.parse_gps
+        parse_engine = self.parse_engine
+        track, engine = [], []
+        for line in lines:
+            if line[0] == "@":
+                row = parse_gps(line)
+                if row is not None:
+                    track.append(row)
+            elif not checksum_ok(line):
+                self.bad_checksum += 1
+            elif line[3:4] == "1":
+                engine += parse_engine(line)
+            elif line[3:4] == "i":
+                self.parse_sensor_map(line)
+        return track, engine
+
+    def iter_rows(self, f):
+        """(linhas da trilha, leituras do motor) por bloco de iter_records()"""
+        for lines in iter_records(f):
+            if not self.echo:
+                yield self._decode_lines(lines)
+                continue
+            track, engine = [], []
+            for line in lines:
+                kind, rows = self.feed(line)
+                if kind == "gps":
+                    track += rows
+                elif rows:
+                    engine += rows
+            yield track, engine
+
+    def decode_file(self, path, track_writer, engine_writer):
+        n_track = n_engine = 0
+        with open(path, errors="ignore") as f:
+            for track, engine in self.iter_rows(f):
+                track_writer.writerows(track)
+                engine_writer.writerows(engine)
+                n_track += len(track)
+                n_engine += len(engine)
+        return n_track, n_engine
+
+
+def iter_records(f, chunk_size=1 << 22):
+    """
+    Lê o arquivo em blocos e devolve, por bloco, só as linhas @ e =51*
+    na ordem original. As outras (=11, =21, =31... ~90% do log) são
+    puladas com str.find, sem passar pelo laço Python.
+    """
+    tail = ""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            if not tail:
+                break
+            chunk, tail = tail + "\n", ""
+        else:
+            chunk = tail + chunk
+            cut = chunk.rfind("\n") + 1
+            chunk, tail = chunk[:cut], chunk[cut:]
+
+        # "\n" na frente: a primeira linha do bloco também é achada
+        chunk = "\n" + chunk.replace("\r", "")
+        find = chunk.find
+        lines = []
+        i = find("\n@")
+        j = find("\n=51")
+        while i != -1 or j != -1:
+            if j == -1 or (i != -1 and i < j):
+                end = find("\n", i + 1)
+                lines.append(chunk[i + 1:end])
+                i = find("\n@", end)
+            else:
+                end = find("\n", j + 1)
+                lines.append(chunk[j + 1:end])
+                j = find("\n=51", end)
+        yield lines
 
-sensor_map = {}      # ID -> sensor name
-last_time = None     # HH:MM:SS vindo do GPS (@)
 
 # -------------------------------------------------
-# GPS
+# Tabelas tipadas por registro
 # -------------------------------------------------
-def parse_gps(line):
-    global last_time
-    m = re.match(
-        r"@(\d{2})(\d{2})(\d{2})"
-        r"(\d{2})(\d{2})(\d{2})"
-        r"([NS])(\d{2})(\d{5})"
-        r"([EW])(\d{3})(\d{5}).*?([+-]\d{5})",
-        line
-    )
-    if not m:
-        return None
-
-    day, month, year, hh, mm, ss = m.group(1,2,3,4,5,6)
-    ns, lat_d, lat_m = m.group(7,8,9)
-    ew, lon_d, lon_m = m.group(10,11,12)
-    alt = int(m.group(13))
-
-    last_time = f"{hh}:{mm}:{ss}"
-    date = f"20{year}-{month}-{day}"
-
-    lat = int(lat_d) + int(lat_m) / 1000 / 60
-    lon = int(lon_d) + int(lon_m) / 1000 / 60
-    if ns == "S": lat *= -1
-    if ew == "W": lon *= -1
-
-    return [date, last_time, lat, lon, alt]
+_NAN = float("nan")
+
+
+class RecordTable:
+    """
+    Colunas de um tipo de registro: array('d') para números (NaN =
+    inválido) e lista para texto; utc em segundos do dia.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.utc = array("d")
+        self.columns = {
+            name: (array("d") if div is not None else [])
+            for name, _, _, div, _ in spec.fields
+        }
+        self._cols = list(self.columns.values())
+
+    def append(self, row):
+        u = row.utc
+        self.utc.append(int(u[0:2]) * 3600 + int(u[3:5]) * 60 + int(u[6:8]) + int(u[9:11]) / 100)
+        for col, v in zip(self._cols, row[1:]):
+            col.append(_NAN if v is None else v)
+
+    def __len__(self):
+        return len(self.utc)
+
+    def write_csv(self, path):
+        names = ["utc"] + list(self.columns)
+        with open(path, "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(names)
+            w.writerows(zip(self.utc, *self.columns.values()))
+
+
+def iter_lines(f, chunk_size=1 << 22):
+    """todas as linhas do arquivo, lidas em blocos e já sem CR/LF"""
+    tail = ""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        lines = (tail + chunk).replace("\r", "").split("\n")
+        tail = lines.pop()
+        yield from lines
+    if tail:
+        yield tail
+
+
+def decode_records(path):
+    """log -> {kind: RecordTable} para todos os RECORDS, + decoder (contadores)"""
+    dec = TextOutDecoder()
+    tables = {spec.kind: RecordTable(spec) for spec in RECORDS.values()}
+    with open(path, errors="ignore") as f:
+        for line in iter_lines(f):
+            if line[:1] != "=":
+                continue
+            kind, rows = dec.feed(line)
+            table = tables.get(kind)
+            if table is not None:
+                table.append(rows[0])
+    return tables, dec
+
+
+def write_records(tables, outdir="records"):
+    os.makedirs(outdir, exist_ok=True)
+    for kind, table in tables.items():
+        if len(table):
+            table.write_csv(os.path.join(outdir, f"{kind}.csv"))
+
+
+def decode_to_csv(path, track_csv=TRACK_CSV, engine_csv=ENGINE_CSV, echo=False):
+    with open(track_csv, "w", newline="") as f_track, \
+         open(engine_csv, "w", newline="") as f_engine:
+
+        track_writer = csv.writer(f_track)
+        engine_writer = csv.writer(f_engine)
+
+        track_writer.writerow(["date", "time", "lat", "lon", "alt_ft"])
+        engine_writer.writerow(["time", "sensor", "value"])
+
+        return TextOutDecoder(echo).decode_file(path, track_writer, engine_writer)
+
 
 # -------------------------------------------------
-# Sensor map (=51i)
+# Trilha + motor numa tabela larga (as-of join)
 # -------------------------------------------------
-def parse_sensor_map(line):
-    # captura pares: ID + NOME
-    for m in re.finditer(r"(\d{2})([A-Z0-9]+)", line):
-        sensor_map[m.group(1)] = m.group(2)
+def _hms_seconds(text):
+    """HHMMSS[CC] -> segundos do dia"""
+    t = int(text[0:2]) * 3600 + int(text[2:4]) * 60 + int(text[4:6])
+    return t + int(text[6:8]) / 100 if len(text) >= 8 else t
+
+
+def _age(t_fix, t):
+    """t_fix - t em segundos, atravessando a meia-noite UTC"""
+    d = t_fix - t
+    if d < -43200:
+        d += 86400
+    elif d > 43200:
+        d -= 86400
+    return d
+
+
+class TrackEngineMerger:
+    """
+    Junta @ (GPS) e =511 (sensores) numa só passada: cada fix da trilha
+    recebe, por sensor, o último valor com UTC <= hora do fix (as-of),
+    desde que não seja mais velho que `tolerance` segundos (o =511 vem
+    a cada ~10 s).
+
+    As colunas (uma por sensor do =51i) ficam fixas quando o mapa se
+    repete; até lá as linhas esperam em `pending` (um ciclo do mapa).
+    """
+
+    HEADER = ["date", "time", "lat", "lon", "alt_ft"]
+
+    def __init__(self, writer, tolerance=15.0):
+        self.writer = writer
+        self.tolerance = tolerance
+        self.dec = TextOutDecoder()
+        self.ids = None         # IDs na ordem das colunas, depois de fixadas
+        self.cur = {}           # ID -> (utc, valor) mais recente
+        self.prev = {}          # ID -> (utc, valor) anterior
+        self.pending = []
+        self.rows = 0
+        self.late = set()       # sensores que apareceram depois das colunas fixas
+
+    def _fix_columns(self):
+        self.ids = list(self.dec.sensor_map)
+        self.writer.writerow(self.HEADER + [self.dec.sensor_map[i] for i in self.ids])
+        for row, values in self.pending:
+            self._write(row, values)
+        self.pending = []
+
+    def _write(self, row, values):
+        self.writer.writerow(row + [values.get(i, "") for i in self.ids])
+        self.rows += 1
+
+    def _asof(self, t_fix):
+        values = {}
+        tol = self.tolerance
+        prev = self.prev
+        for sid, (t, v) in self.cur.items():
+            d = _age(t_fix, t)
+            if d < 0:
+                # leitura chegou antes do @ mas é de depois do fix
+                if sid not in prev:
+                    continue
+                t, v = prev[sid]
+                d = _age(t_fix, t)
+                if d < 0:
+                    continue
+            if d <= tol:
+                values[sid] = v
+        return values
+
+    def _engine(self, line):
+        t = _hms_seconds(line[4:12])
+        cur, prev = self.cur, self.prev
+        body = line[ENGINE_HEADER:-2]
+        if len(body) % ENGINE_ENTRY == 0:
+            pairs = ((body[i:i + 2], body[i + 2:i + ENGINE_ENTRY])
+                     for i in range(0, len(body), ENGINE_ENTRY))
+        else:
+            pairs = (m.groups() for m in ENGINE_RE.finditer(line, ENGINE_HEADER))
+        for sid, text in pairs:
+            try:
+                v = float(text)
+            except ValueError:
+                continue
+            if sid in cur:
+                prev[sid] = cur[sid]
+            cur[sid] = (t, v)
+
+    def feed(self, line):
+        if line[:1] == "@":
+            row = self.dec.parse_gps(line)
+            if row is None:
+                return
+            values = self._asof(_hms_seconds(line[7:13]))
+            if self.ids is None:
+                self.pending.append((row, values))
+            else:
+                self._write(row, values)
+
+        elif line[:3] == "=51" and checksum_ok(line):
+            if line[3] == "1":
+                self._engine(line)
+            elif line[3] == "i":
+                known = len(self.dec.sensor_map)
+                self.dec.parse_sensor_map(line)
+                if self.ids is None:
+                    # mapa repetido sem nada novo: ciclo completo
+                    if known and len(self.dec.sensor_map) == known:
+                        self._fix_columns()
+                else:
+                    self.late.update(i for i in self.dec.sensor_map if i not in self.ids)
+
+    def close(self):
+        if self.ids is None:
+            self._fix_columns()
+
+
+def merge_to_csv(path, out_csv=MERGED_CSV, tolerance=15.0):
+    with open(out_csv, "w", newline="") as f_out, open(path, errors="ignore") as f:
+        merger = TrackEngineMerger(csv.writer(f_out), tolerance)
+        for lines in iter_records(f):
+            for line in lines:
+                merger.feed(line)
+        merger.close()
+    return merger
+
 
 # -------------------------------------------------
-# Engine values (=51)
+# Amostras de voo (exportadores incrementais)
 # -------------------------------------------------
-def parse_engine(line):
-    rows = []
-    for m in re.finditer(r"(\d{2})([+-]\d\.\d+E[+-]\d{2})", line):
-        sid = m.group(1)
-        value = float(m.group(2))
-        name = sensor_map.get(sid)
+def iter_samples(path):
+    """
+    uma FlightSample por registro @, lendo o log em blocos; altitude
+    barométrica, IAS e proa vêm do último =11 e a RPM do último =31
+    """
+    dec = TextOutDecoder()
+    air = eis = None
+    with open(path, errors="ignore") as f:
+        for line in iter_lines(f):
+            head = line[:3]
+            if head == "=11" or head == "=31":
+                kind, rows = dec.feed(line)
+                if kind == "air":
+                    air = rows[0]
+                elif kind == "eis":
+                    eis = rows[0]
+                continue
+            if line[:1] != "@":
+                continue
+            row = dec.parse_gps(line)
+            if row is not None:
+                date, hms, lat, lon, alt = row
+                yield FlightSample(
+                    datetime.fromisoformat(f"{date}T{hms}"), lat, lon, alt,
+                    alt_baro_ft=air.palt_ft if air else None,
+                    ias_kt=air.ias_kt if air else None,
+                    heading_deg=air.heading_deg if air else None,
+                    rpm=eis.rpm if eis else None,
+                )
+
+
+def export_flight(path, basename="flight", formats=("csv", "gpx", "ndjson", "g3xc")):
+    with open_exporters(basename, formats) as out:
+        for sample in iter_samples(path):
+            out.write(sample)
+    return out.count, out.paths
 
-        if name and last_time:
-            rows.append([last_time, name, value])
-    return rows
 
 # -------------------------------------------------
 # MAIN
 # -------------------------------------------------
-with open(TRACK_CSV, "w", newline="") as f_track, \
-     open(ENGINE_CSV, "w", newline="") as f_engine:
+if __name__ == "__main__":
+    ECHO = "-v" in sys.argv     # imprime cada linha decodificada
 
-    track_writer = csv.writer(f_track)
-    engine_writer = csv.writer(f_engine)
+    if "--records" in sys.argv:  # records/<tipo>.csv, um por tipo de registro
+        tables, dec = decode_records(INPUT_FILE)
+        write_records(tables)
+        for kind, table in tables.items():
+            print(f" - records/{kind}.csv: {len(table)} linhas")
+        print(f"checksum inválido: {dec.bad_checksum}")
+        sys.exit(0)
 
-    track_writer.writerow(["date", "time", "lat", "lon", "alt_ft"])
-    engine_writer.writerow(["time", "sensor", "value"])
+    if "--merge" in sys.argv:   # flight_merged.csv: trilha + sensores, uma linha por fix
+        m = merge_to_csv(INPUT_FILE)
+        print(f"✔ {m.rows} linhas x {len(m.ids)} sensores -> {MERGED_CSV}")
+        if m.late:
+            print(f"sensores fora das colunas: {sorted(m.dec.sensor_map[i] for i in m.late)}")
+        sys.exit(0)
 
-    with open(INPUT_FILE) as f:
-        for line in f:
-            line = line.strip()
+    if "--export" in sys.argv:  # flight.csv / .gpx / .ndjson / .g3xc
+        n, paths = export_flight(INPUT_FILE)
+        print(f"✔ {n} amostras -> {', '.join(paths)}")
+        sys.exit(0)
 
-            if line.startswith("@"):
-                row = parse_gps(line)
-                if row:
-                    track_writer.writerow(row)
-                    print(row)
-
-            elif line.startswith("=51i"):
-                parse_sensor_map(line)
-
-            elif line.startswith("=51") and not line.startswith("=51i"):
-                for r in parse_engine(line):
-                    print(r)
-                    engine_writer.writerow(r)
-
-print("----------------------------------------------------------------------")
-print("✔ CSV gerados com EGT / CHT completos")
-print(" - flight_track.csv")
-print(" - engine_data.csv")
-print("----------------------------------------------------------------------")
+    decode_to_csv(INPUT_FILE, echo=ECHO)
+
+    print("----------------------------------------------------------------------")
+    print("✔ CSV gerados com EGT / CHT completos")
+    print(" - flight_track.csv")
+    print(" - engine_data.csv")
+    print("----------------------------------------------------------------------")
@@ -0,0 +1,65 @@
+"""
+Testa o TextOutDecoder contra o decoder antigo (bench_decoder.LegacyDecoder).
+
+As diferenças de saída entre os dois são correções, não regressões:
+  - IDs de sensor são hexa: 0E (COIL), 1D (lFUEL) e 2E (0FLAPS) eram
+    descartados pelo regex antigo (\\d{2}), daí as leituras a mais
+  - nomes com espaço ("0BATERIA BACK") ficam inteiros
+  - a data do @ é YYMMDD (o antigo lia DDMMYY)
+"""
+
+import os
+import unittest
+from collections import Counter
+
+from bench_decoder import LegacyDecoder
+from g3xTextOut import TextOutDecoder
+
+LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "putty.log.txt")
+
+HEX_SENSORS = {"0E": "COIL", "1D": "lFUEL", "2E": "0FLAPS"}
+
+
+def decode_new(path):
+    dec = TextOutDecoder()
+    track, engine = [], []
+    with open(path, errors="ignore") as f:
+        for t, e in dec.iter_rows(f):
+            track += t
+            engine += e
+    return dec, track, engine
+
+
+class LegacyComparison(unittest.TestCase):
+    """Diferenças entre o decoder novo e o antigo no putty.log.txt"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.legacy = LegacyDecoder()
+        cls.old_track, cls.old_engine = cls.legacy.decode_rows(LOG)
+        cls.dec, cls.new_track, cls.new_engine = decode_new(LOG)
+
+    def test_extra_engine_rows_are_hex_sensors(self):
+        extra = Counter(map(tuple, self.new_engine))
+        extra.subtract(Counter(map(tuple, self.old_engine)))
+        # nada do antigo some; tudo que sobra é de sensor com ID hexa
+        self.assertFalse([row for row, n in extra.items() if n < 0])
+        names = {row[1] for row, n in extra.items() if n > 0}
+        self.assertEqual(names, set(HEX_SENSORS.values()))
+        self.assertEqual(len(self.new_engine) - len(self.old_engine), sum(extra.values()))
+
+    def test_sensor_map(self):
+        for sid, name in HEX_SENSORS.items():
+            self.assertEqual(self.dec.sensor_map[sid], name)
+            self.assertNotIn(sid, self.legacy.sensor_map)
+        self.assertEqual(self.dec.sensor_map["23"], "0BATERIA BACK")
+        self.assertEqual(self.legacy.sensor_map["23"], "0BATERIA")
+
+    def test_track_matches_except_date(self):
+        self.assertEqual([r[1:] for r in self.old_track], [r[1:] for r in self.new_track])
+        self.assertEqual(self.new_track[0][0], "2026-02-04")
+        self.assertEqual(self.old_track[0][0], "2004-02-26")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,112 +1,504 @@
-import socket
-import struct
-import time
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GDL90 traffic generator for EFB load testing.
+
+Drives N targets from a scenario file and sends ICD-correct Traffic
+Reports (message ID 20, built by gdl90.encoder) over UDP at a chosen
+aggregate rate, printing the throughput actually achieved.
+
+  python3 TrafficGen.py                                  # 1 target, 1 Hz
+  python3 TrafficGen.py -n 500 --rate 500                # 500 random targets
+  python3 TrafficGen.py scenarios/conflicts.json --rate 200 --duration 60
+  python3 TrafficGen.py scenarios/dense.json --check     # decode one batch and exit
+
+Scenario file (JSON): an optional ownship and a list of target groups
+
+  {
+    "ownship": {"lat": -23.55, "lon": -46.63, "alt": 5500, "gs": 120, "track": 45},
+    "groups": [
+      {"type": "conflict", "geometry": "head-on", "count": 4, "cpa_s": 60},
+      {"type": "random", "count": 300, "center": [-23.55, -46.63], "radius_nm": 40},
+      {"type": "track", "file": "flight.csv", "count": 3, "offset_s": 120}
+    ]
+  }
+
+  conflict  targets reach ownship's future position (+ miss_nm / miss_ft)
+            cpa_s seconds from now, spaced by spacing_s; geometry is
+            head-on, crossing, converging or overtake
+  random    uniform in a circle; alt/gs ranges, optional turn_dps
+  track     replays a recorded CSV (time, lat, lon, alt columns, e.g. the
+            G3X flight export) in a loop, each copy offset_s later
+
+Requires: the gdl90 package next to this project (encoder, geoutils);
+numpy is optional and speeds up the per-tick motion update.
+"""
+
+import os
+import sys
+import csv
+import json
 import math
+import time
+import socket
 import random
+import bisect
+import argparse
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import gdl90_checkout  # noqa: F401
+
+from gdl90.encoder import Encoder, packDatagrams, UDP_PAYLOAD
+from gdl90.decoder import decodeMessages
+from geoutils.geoutils import destination, haversine, bearing
 
 
 UDP_IP = "127.0.0.1"
 UDP_PORT = 4000
 
+# ===============================
+# GDL90
+# ===============================
+ADDR_ADSB_ICAO = 0
+MISC_AIRBORNE = 0x9          # airborne, true track
+NIC = 8
+NACP = 8
+
+FIRST_ICAO = 0xA00000
+
+DEFAULT_LAT = -23.5505       # São Paulo
+DEFAULT_LON = -46.6333
+
+
+# ===============================
+# TARGETS
+# ===============================
+class Target:
+    __slots__ = ("icao", "callsign", "emitter", "lat", "lon", "alt",
+                 "gs", "track", "vs", "turn", "track_log", "t0")
+
+    def __init__(self, icao, callsign, lat, lon, alt, gs=0.0, track=0.0,
+                 vs=0.0, turn=0.0, emitter=1):
+        self.icao = icao
+        self.callsign = callsign
+        self.emitter = emitter
+        self.lat = lat
+        self.lon = lon
+        self.alt = alt
+        self.gs = gs               # kt
+        self.track = track         # deg true
+        self.vs = vs               # fpm
+        self.turn = turn           # deg/s
+        self.track_log = None      # RecordedTrack for replayed targets
+        self.t0 = 0.0              # replay offset (s)
+
+
+class RecordedTrack:
+    """a recorded flight, sampled by linear interpolation"""
+
+    def __init__(self, times, lats, lons, alts):
+        if len(times) < 2:
+            raise ValueError("a recorded track needs at least two points")
+        self.times = times
+        self.lats = lats
+        self.lons = lons
+        self.alts = alts
+        self.duration = times[-1] - times[0]
+
+    @classmethod
+    def from_csv(cls, path):
+        times, lats, lons, alts = [], [], [], []
+        with open(path, newline="") as f:
+            reader = csv.DictReader(f)
+            cols = {name.strip().lower(): name for name in reader.fieldnames or ()}
+            c_time = _column(cols, "time", "time_utc", "timestamp", "t")
+            c_lat = _column(cols, "lat", "latitude")
+            c_lon = _column(cols, "lon", "longitude")
+            c_alt = _column(cols, "alt", "alt_ft", "alt_gps_ft", "altitude")
+            if c_lat is None or c_lon is None or c_alt is None:
+                raise ValueError(f"{path}: needs lat, lon and alt columns")
+
+            for n, row in enumerate(reader):
+                try:
+                    lat = float(row[c_lat])
+                    lon = float(row[c_lon])
+                    alt = float(row[c_alt])
+                except (TypeError, ValueError):
+                    continue
+                t = _seconds(row[c_time]) if c_time else float(n)
+                if t is None or (times and t <= times[-1]):
+                    continue
+                times.append(t)
+                lats.append(lat)
+                lons.append(lon)
+                alts.append(alt)
+        return cls(times, lats, lons, alts)
+
+    def sample(self, t):
+        """(lat, lon, alt, gs, track, vs) at t seconds into the (looped) track"""
+        times = self.times
+        t = times[0] + t % self.duration
+        i = min(max(bisect.bisect_right(times, t), 1), len(times) - 1)
+        t0, t1 = times[i - 1], times[i]
+        f = (t - t0) / (t1 - t0)
+        lat0, lon0, lat1, lon1 = self.lats[i - 1], self.lons[i - 1], self.lats[i], self.lons[i]
+        lat = lat0 + (lat1 - lat0) * f
+        lon = lon0 + (lon1 - lon0) * f
+        alt = self.alts[i - 1] + (self.alts[i] - self.alts[i - 1]) * f
+        gs = haversine(lat0, lon0, lat1, lon1) * 3600.0 / (t1 - t0)
+        vs = (self.alts[i] - self.alts[i - 1]) * 60.0 / (t1 - t0)
+        return lat, lon, alt, gs, bearing(lat0, lon0, lat1, lon1), vs
+
+
+def _column(cols, *names):
+    for name in names:
+        if name in cols:
+            return cols[name]
+    return None
+
+
+def _seconds(value):
+    """epoch/relative seconds or an ISO 8601 timestamp"""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+# ===============================
+# SCENARIOS
+# ===============================
+# conflict geometry -> target track relative to ownship's track
+GEOMETRIES = {
+    "head-on": (180.0,),
+    "crossing": (90.0, 270.0),
+    "converging": (45.0, 315.0, 135.0, 225.0),
+    "overtake": (0.0,),
+}
+
+
+def conflict_targets(group, ownship, rnd, icao):
+    if ownship is None:
+        raise ValueError("conflict groups need an ownship")
+    angles = GEOMETRIES[group.get("geometry", "head-on")]
+    count = group.get("count", len(angles))
+    cpa_s = group.get("cpa_s", 60.0)
+    spacing_s = group.get("spacing_s", 10.0)
+    miss_nm = group.get("miss_nm", 0.0)
+    miss_ft = group.get("miss_ft", 0.0)
+    gs = group.get("gs", ownship.gs or 120.0)
+    if group.get("geometry") == "overtake":
+        gs = group.get("gs", (ownship.gs or 120.0) * 1.5)
+
+    out = []
+    for n in range(count):
+        t = cpa_s + n * spacing_s
+        rel = angles[n % len(angles)]
+        track = (ownship.track + rel) % 360.0
+        # where ownship will be at t, shifted sideways by the miss distance
+        lat, lon = destination(ownship.lat, ownship.lon, ownship.track, ownship.gs * t / 3600.0)
+        if miss_nm:
+            lat, lon = destination(lat, lon, (track + 90.0) % 360.0, miss_nm)
+        # back along the target's own track to where it starts
+        lat, lon = destination(lat, lon, (track + 180.0) % 360.0, gs * t / 3600.0)
+        # same vertical speed as ownship, so the miss_ft offset holds all the way to CPA
+        out.append(Target(icao + n, f"CNF{n:04d}", lat, lon,
+                          ownship.alt + miss_ft, gs, track, ownship.vs))
+    return out
 
-def crc16_ccitt(data):
-    crc = 0xFFFF
-    for b in data:
-        crc ^= b << 8
-        for _ in range(8):
-            if crc & 0x8000:
-                crc = (crc << 1) ^ 0x1021
-            else:
-                crc <<= 1
-            crc &= 0xFFFF
-    return crc
-
-
-def escape_gdl90(data):
-    out = bytearray()
-    for b in data:
-        if b == 0x7E:
-            out += b'\x7D\x5E'
-        elif b == 0x7D:
-            out += b'\x7D\x5D'
+
+def random_targets(group, ownship, rnd, icao):
+    center = group.get("center") or (ownship and [ownship.lat, ownship.lon]) or [DEFAULT_LAT, DEFAULT_LON]
+    radius_nm = group.get("radius_nm", 40.0)
+    alt_lo, alt_hi = group.get("alt", (1000, 35000))
+    gs_lo, gs_hi = group.get("gs", (90, 450))
+    vs_choices = group.get("vs", (0, 0, 0, 500, -500))
+    turn = group.get("turn_dps", 0.0)
+
+    out = []
+    for n in range(group.get("count", 100)):
+        # uniform over the disc, not clustered at the center
+        lat, lon = destination(center[0], center[1], rnd.uniform(0.0, 360.0),
+                               radius_nm * math.sqrt(rnd.random()))
+        out.append(Target(icao + n, f"RND{n:04d}", lat, lon,
+                          rnd.randrange(int(alt_lo), int(alt_hi) + 1, 25),
+                          rnd.uniform(gs_lo, gs_hi), rnd.uniform(0.0, 360.0),
+                          rnd.choice(vs_choices), rnd.choice((-turn, 0.0, turn)) if turn else 0.0,
+                          emitter=rnd.randint(1, 7)))
+    return out
+
+
+def track_targets(group, ownship, rnd, icao, base_dir="."):
+    log = RecordedTrack.from_csv(os.path.join(base_dir, group["file"]))
+    offset_s = group.get("offset_s", 60.0)
+    out = []
+    for n in range(group.get("count", 1)):
+        t = Target(icao + n, f"TRK{n:04d}", log.lats[0], log.lons[0], log.alts[0])
+        t.track_log = log
+        t.t0 = n * offset_s
+        out.append(t)
+    return out
+
+
+GROUPS = {
+    "conflict": conflict_targets,
+    "random": random_targets,
+    "track": track_targets,
+}
+
+
+def load_scenario(path, seed=1):
+    """(ownship Target or None, [Target]) from a scenario file"""
+    with open(path) as f:
+        spec = json.load(f)
+    rnd = random.Random(spec.get("seed", seed))
+
+    ownship = None
+    own = spec.get("ownship")
+    if own:
+        ownship = Target(own.get("icao", 0xF00000), own.get("callsign", "OWNSHIP"),
+                         own["lat"], own["lon"], own.get("alt", 5500),
+                         own.get("gs", 0.0), own.get("track", 0.0), own.get("vs", 0.0))
+
+    targets = []
+    icao = FIRST_ICAO
+    for group in spec.get("groups", ()):
+        kind = group.get("type")
+        if kind not in GROUPS:
+            raise ValueError(f"{path}: unknown group type {kind!r}")
+        if kind == "track":
+            new = track_targets(group, ownship, rnd, icao, os.path.dirname(os.path.abspath(path)))
         else:
-            out.append(b)
-    return bytes(out)
-
-
-def encode_latlon(deg):
-    return int(deg * (2**24 / 180))
-
-
-def build_traffic_report(
-    icao,
-    lat,
-    lon,
-    alt_ft,
-    track_deg,
-    speed_kt,
-    climb_fpm
-):
-    msg_id = 0x14
-
-    lat_enc = encode_latlon(lat)
-    lon_enc = encode_latlon(lon)
-    alt_enc = int((alt_ft + 1000) / 25)
-
-    payload = struct.pack(
-        ">B I i i H H h B B",
-        msg_id,
-        icao & 0xFFFFFF,
-        lat_enc,
-        lon_enc,
-        alt_enc & 0x0FFF,
-        int(speed_kt),
-        int(climb_fpm),
-        int(track_deg / 360 * 256),
-        0x01   # NIC/NAC placeholder
+            new = GROUPS[kind](group, ownship, rnd, icao)
+        targets.extend(new)
+        icao += len(new)
+    return ownship, targets
+
+
+def default_scenario(count, seed=1):
+    """the old single São Paulo target, or `count` random targets around it"""
+    if count == 1:
+        icao = random.Random(seed).randint(0x100000, 0xFFFFFF)
+        return None, [Target(icao, "", DEFAULT_LAT, DEFAULT_LON, 5500, 120.0, 45.0)]
+    group = {"count": count, "center": [DEFAULT_LAT, DEFAULT_LON]}
+    return None, random_targets(group, None, random.Random(seed), FIRST_ICAO)
+
+
+# ===============================
+# MOTION
+# ===============================
+def advance(targets, dt, elapsed):
+    """move every target dt seconds; one batched destination() call"""
+    moving = [t for t in targets if t.track_log is None]
+    if moving:
+        lat, lon = destination([t.lat for t in moving], [t.lon for t in moving],
+                               [t.track for t in moving], [t.gs * dt / 3600.0 for t in moving])
+        for t, la, lo in zip(moving, lat, lon):
+            t.lat = float(la)
+            t.lon = float(lo)
+            if t.vs:
+                t.alt += t.vs * dt / 60.0
+            if t.turn:
+                t.track = (t.track + t.turn * dt) % 360.0
+
+    for t in targets:
+        if t.track_log is not None:
+            t.lat, t.lon, t.alt, t.gs, t.track, t.vs = t.track_log.sample(elapsed + t.t0)
+
+
+# ===============================
+# OUTPUT
+# ===============================
+def encode_traffic(encoder, t, msgid=20):
+    build = encoder.msgTrafficReport if msgid == 20 else encoder.msgOwnshipReport
+    return build(
+        addrType=ADDR_ADSB_ICAO,
+        address=t.icao,
+        latitude=t.lat,
+        longitude=t.lon,
+        altitude=t.alt,
+        misc=MISC_AIRBORNE,
+        navIntegrityCat=NIC,
+        navAccuracyCat=NACP,
+        hVelocity=int(t.gs),
+        vVelocity=int(t.vs),
+        trackHeading=t.track,
+        emitterCat=t.emitter,
+        callSign=t.callsign,
     )
 
-    crc = crc16_ccitt(payload)
-    frame = payload + struct.pack("<H", crc)
 
-    return b'\x7E' + escape_gdl90(frame) + b'\x7E'
+class TrafficSender:
+    def __init__(self, sock, hosts, targets, ownship=None, rate=None,
+                 tick=0.05, mtu=UDP_PAYLOAD):
+        self.sock = sock
+        self.hosts = hosts
+        self.targets = targets
+        self.ownship = ownship
+        self.rate = rate if rate else float(len(targets))   # reports/s, all targets
+        self.tick = tick
+        self.mtu = mtu
+        self.encoder = Encoder()
 
+        self.next = 0              # round-robin position
+        self.credit = 0.0
+        self.stats = dict(msgs=0, datagrams=0, bytes=0, encode=0.0, late=0)
 
-def generate_traffic():
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    def batch(self):
+        """this tick's share of the aggregate rate, round-robin over targets"""
+        self.credit += self.rate * self.tick
+        n = min(int(self.credit), len(self.targets))
+        self.credit -= n
+        if self.credit >= 1.0:
+            self.credit = 0.0       # more than every target per tick: drop the excess
+        i = self.next
+        self.next = (i + n) % len(self.targets) if self.targets else 0
+        batch = self.targets[i:i + n]
+        if len(batch) < n:
+            batch += self.targets[:n - len(batch)]
+        return batch
+
+    def send(self, frames):
+        st = self.stats
+        for d in packDatagrams(frames, self.mtu):
+            for host in self.hosts:
+                self.sock.sendto(d, host)
+                st["datagrams"] += 1
+                st["bytes"] += len(d)
+
+    def run(self, duration=None, report=1.0):
+        enc = self.encoder
+        st = self.stats
+        start = deadline = time.monotonic()
+        last_report, last = start, dict(st)
+        next_second = start
+
+        while duration is None or deadline - start < duration:
+            now = time.monotonic()
+            if now - last_report >= report:
+                self._report(now - last_report, last)
+                last_report, last = now, dict(st)
+
+            advance(self.targets + ([self.ownship] if self.ownship else []),
+                    self.tick, deadline - start)
+
+            frames = []
+            if now >= next_second:
+                frames.append(enc.msgHeartbeat())
+                if self.ownship is not None:
+                    frames.append(encode_traffic(enc, self.ownship, msgid=10))
+                    frames.append(enc.msgOwnshipGeometricAltitude(altitude=int(self.ownship.alt)))
+                next_second += 1.0
+
+            t0 = time.perf_counter()
+            batch = self.batch()
+            frames.extend(encode_traffic(enc, t) for t in batch)
+            st["encode"] += time.perf_counter() - t0
+            st["msgs"] += len(batch)
+            self.send(frames)
+
+            # absolute deadlines: no drift; fell behind by more than a tick -> skip
+            deadline += self.tick
+            delay = deadline - time.monotonic()
+            if delay < -self.tick:
+                st["late"] += 1
+                deadline = time.monotonic()
+            elif delay > 0:
+                time.sleep(delay)
 
-    # Initial aircraft state
-    lat = -23.5505     # São Paulo
-    lon = -46.6333
-    alt = 5500         # feet
-    speed = 120        # knots
-    track = 45         # degrees
-    climb = 0
-    icao = random.randint(0x100000, 0xFFFFFF)
+        self._report(time.monotonic() - start, dict(msgs=0, datagrams=0, bytes=0, encode=0.0, late=0),
+                     total=True)
 
-    print(f"Generating traffic ICAO={icao:06X}")
+    def _report(self, dt, last, total=False):
+        st = self.stats
+        msgs = st["msgs"] - last["msgs"]
+        enc_us = (st["encode"] - last["encode"]) / msgs * 1e6 if msgs else 0.0
+        print(f"{'TOTAL ' if total else ''}{msgs / dt:8.1f} msg/s (target {self.rate:g})  "
+              f"{(st['datagrams'] - last['datagrams']) / dt:7.1f} dgram/s  "
+              f"{(st['bytes'] - last['bytes']) / dt / 1024:7.1f} KiB/s  "
+              f"encode {enc_us:5.1f} us/msg  late ticks {st['late'] - last['late']}")
 
-    while True:
-        # Move aircraft
-        dt = 1.0
-        dist_nm = speed * dt / 3600.0
 
-        lat += dist_nm * math.cos(math.radians(track)) / 60
-        lon += dist_nm * math.sin(math.radians(track)) / (60 * math.cos(math.radians(lat)))
+def check(targets, ownship, mtu):
+    """encode one report per target, decode it back with gdl90.decoder"""
+    enc = Encoder()
+    frames = [encode_traffic(enc, t) for t in targets]
+    if ownship is not None:
+        frames.append(encode_traffic(enc, ownship, msgid=10))
+    decoded, bad = decodeMessages(packDatagrams(frames, mtu))
 
-        frame = build_traffic_report(
-            icao,
-            lat,
-            lon,
-            alt,
-            track,
-            speed,
-            climb
-        )
+    lsb = 180.0 / 2 ** 23
+    wrong = 0
+    for t, m in zip(targets, decoded):
+        if (m.MsgType != "TrafficReport" or m.Address != t.icao
+                or abs(m.Latitude - t.lat) > lsb or abs(m.Longitude - t.lon) > lsb
+                or abs(m.Altitude - t.alt) >= 25):
+            wrong += 1
+    print(f"check: {len(frames)} frames, {len(decoded)} decoded, "
+          f"{bad} bad CRC, {wrong} field mismatches")
+    return 0 if bad == 0 and wrong == 0 and len(decoded) == len(frames) else 1
+
+
+# ===============================
+# MAIN
+# ===============================
+def parse_host(text):
+    host, _, port = text.rpartition(":")
+    return (host or UDP_IP, int(port)) if port.isdigit() else (text, UDP_PORT)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="GDL90 multi-target traffic generator")
+    ap.add_argument("scenario", nargs="?", help="scenario JSON (default: random targets around São Paulo)")
+    ap.add_argument("-n", "--count", type=int, default=1, help="targets when no scenario is given")
+    ap.add_argument("--rate", type=float, help="traffic reports per second, all targets (default: 1 Hz each)")
+    ap.add_argument("--tick", type=float, default=0.05, help="send interval (s)")
+    ap.add_argument("--mtu", type=int, default=UDP_PAYLOAD,
+                    help="max UDP payload; 0 = one message per datagram")
+    ap.add_argument("--to", action="append", metavar="HOST:PORT",
+                    help=f"destination (repeatable, default {UDP_IP}:{UDP_PORT})")
+    ap.add_argument("--broadcast", action="store_true", help="allow broadcast destinations")
+    ap.add_argument("--duration", type=float, help="stop after this many seconds")
+    ap.add_argument("--report", type=float, default=1.0, help="throughput report interval (s)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--check", action="store_true", help="round-trip one batch through gdl90.decoder and exit")
+    args = ap.parse_args()
+
+    if args.scenario:
+        ownship, targets = load_scenario(args.scenario, args.seed)
+    else:
+        ownship, targets = default_scenario(args.count, args.seed)
+    if not targets:
+        print("No targets in scenario")
+        return 1
+
+    if args.check:
+        return check(targets, ownship, args.mtu)
+
+    hosts = [parse_host(h) for h in (args.to or [f"{UDP_IP}:{UDP_PORT}"])]
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    if args.broadcast:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
 
-        sock.sendto(frame, (UDP_IP, UDP_PORT))
-        time.sleep(dt)
+    sender = TrafficSender(sock, hosts, targets, ownship, args.rate, args.tick, args.mtu)
+    print(f"Generating {len(targets)} targets at {sender.rate:g} reports/s -> "
+          + ", ".join(f"{h}:{p}" for h, p in hosts))
+    try:
+        sender.run(args.duration, args.report)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+    return 0
 
 
 if __name__ == "__main__":
-    generate_traffic()
+    sys.exit(main())
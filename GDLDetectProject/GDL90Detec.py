@@ -1,77 +1,303 @@
-def crc16_ccitt(data):
-    crc = 0xFFFF
-    for b in data:
-        crc ^= b << 8
-        for _ in range(8):
-            if crc & 0x8000:
-                crc = (crc << 1) ^ 0x1021
-            else:
-                crc <<= 1
-            crc &= 0xFFFF
-    return crc
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GDL90 capture detector / triage.
 
+Tells whether files (or every file under a directory tree) hold a GDL90
+byte stream, and which messages are in it:
 
+  - the input is memory-mapped (or read in chunks for pipes / special
+    files), never loaded whole; frames are cut at the 0x7E flags
+  - each candidate frame is unescaped and checked with the table CRC of
+    gdl90.fcs (CRC-16-CCITT, init 0, as in the ICD)
+  - the scan stops as soon as the verdict is certain (enough valid frames
+    at a high enough valid ratio), or gives up on data that has not shown
+    enough valid frames after GIVE_UP bytes; --full scans everything for
+    complete histograms
+  - directory trees are scanned by a pool of worker processes
+
+  python3 GDL90Detec.py capture.dat
+  python3 GDL90Detec.py ~/Downloads/logs --full --workers 8
+  python3 GDL90Detec.py dumps/ --json > triage.jsonl
+"""
+
+import os
+import sys
+import json
+import mmap
+import argparse
+from collections import Counter
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import gdl90_checkout  # noqa: F401
+
+from gdl90.fcs import crcCompute
+
+
+FLAG_BYTE = b"\x7e"
+
+MIN_FRAME = 3                # message ID + CRC
+MAX_FRAME = 1024             # escaped; the largest message (uplink) is 436 bytes
+
+CHUNK = 1 << 20
+
+# stop as soon as this many valid frames make up at least this fraction
+# of the candidates; random data passes the CRC about 1 time in 65536
+MIN_VALID = 20
+MIN_RATIO = 0.5
+GIVE_UP = 16 << 20           # bytes scanned without reaching MIN_VALID
+
+MESSAGE_NAMES = {
+    0: "Heartbeat",
+    2: "Initialization",
+    7: "Uplink Data",
+    9: "Height Above Terrain",
+    10: "Ownship Report",
+    11: "Ownship Geometric Altitude",
+    20: "Traffic Report",
+    30: "Basic Report",
+    31: "Long Report",
+    29: "SX Heartbeat",
+    101: "ForeFlight / GPS Time",
+    204: "Stratux Heartbeat",
+}
+
+
+# ===============================
+# FRAMES
+# ===============================
 def unescape_gdl90(data):
     """
     GDL90 byte unescaping:
       0x7D 0x5E -> 0x7E
       0x7D 0x5D -> 0x7D
     """
-    out = bytearray()
-    i = 0
-    while i < len(data):
-        if data[i] == 0x7D:
-            if i + 1 < len(data):
-                if data[i + 1] == 0x5E:
-                    out.append(0x7E)
-                elif data[i + 1] == 0x5D:
-                    out.append(0x7D)
+    if b"\x7d" not in data:
+        return data
+    return data.replace(b"\x7d\x5e", b"\x7e").replace(b"\x7d\x5d", b"\x7d")
+
+
+def _split(buf, start, end):
+    """(offset, raw) between consecutive flags in buf[start:end]; returns next start"""
+    find = buf.find
+    i = find(FLAG_BYTE, start, end)
+    frames = []
+    while i != -1:
+        j = find(FLAG_BYTE, i + 1, end)
+        if j == -1:
+            break
+        if j - i > 1:
+            frames.append((i + 1, buf[i + 1:j]))
+        i = j
+    return frames, (start if i == -1 else i)
+
+
+def iter_frames(path, chunk=CHUNK):
+    """
+    yields (offset, raw escaped frame); memory-mapped for regular files,
+    chunk-streamed otherwise ('-' = stdin)
+    """
+    if path == "-":
+        yield from _iter_stream(sys.stdin.buffer, chunk)
+        return
+
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # empty file, pipe, device...
+            yield from _iter_stream(f, chunk)
+            return
+        with mm:
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            size = len(mm)
+            pos = 0
+            while pos < size:
+                # windows of `chunk` bytes keep each find() short and let the
+                # caller stop early; a frame may straddle windows
+                end = min(size, pos + chunk)
+                frames, nxt = _split(mm, pos, end)
+                yield from frames
+                if end == size:
+                    break
+                # resume at the last open frame, unless it is already
+                # longer than any real frame
+                pos = nxt if nxt > pos and end - nxt <= MAX_FRAME else end
+
+
+def _iter_stream(f, chunk):
+    base = 0                 # file offset of buf[0]
+    buf = b""
+    while True:
+        data = f.read(chunk)
+        if not data:
+            break
+        buf += data
+        frames, nxt = _split(buf, 0, len(buf))
+        for off, raw in frames:
+            yield base + off, raw
+        # keep from the last open frame, unless it is already longer
+        # than any real frame
+        if len(buf) - nxt > MAX_FRAME:
+            nxt = len(buf)
+        base += nxt
+        buf = buf[nxt:]
+
+
+# ===============================
+# DETECTION
+# ===============================
+@dataclass
+class Detection:
+    path: str
+    size: int = 0
+    scanned: int = 0             # bytes, up to the last frame examined
+    candidates: int = 0
+    valid: int = 0
+    bad_crc: int = 0
+    oversize: int = 0
+    ids: dict = field(default_factory=dict)      # message ID -> count
+    verdict: str = "no"          # gdl90 / maybe / no / error
+    early: bool = False          # stopped before the end of the file
+    error: str = ""
+
+    @property
+    def ratio(self):
+        return self.valid / self.candidates if self.candidates else 0.0
+
+
+def detect(path, full=False, min_valid=MIN_VALID, min_ratio=MIN_RATIO, give_up=GIVE_UP):
+    det = Detection(path)
+    ids = Counter()
+    try:
+        det.size = os.path.getsize(path) if path != "-" else 0
+        frames = iter_frames(path)
+        try:
+            for offset, raw in frames:
+                det.scanned = offset + len(raw) + 1
+                if len(raw) > MAX_FRAME:
+                    det.oversize += 1
+                    continue
+                frame = unescape_gdl90(raw)
+                if len(frame) < MIN_FRAME:
+                    continue
+                det.candidates += 1
+                if crcCompute(frame[:-2]) == frame[-2:]:
+                    det.valid += 1
+                    ids[frame[0]] += 1
                 else:
-                    # Invalid escape, keep raw
-                    out.append(data[i + 1])
-                i += 2
-            else:
-                i += 1
-        else:
-            out.append(data[i])
-            i += 1
-    return bytes(out)
+                    det.bad_crc += 1
+
+                if full:
+                    continue
+                if det.valid >= min_valid and det.valid >= min_ratio * det.candidates:
+                    det.early = True
+                    break
+                if det.valid < min_valid and det.scanned >= give_up:
+                    det.early = True
+                    break
+        finally:
+            frames.close()
+    except OSError as e:
+        det.verdict = "error"
+        det.error = str(e)
+        return det
+
+    det.ids = dict(sorted(ids.items()))
+    if det.valid >= min_valid and det.ratio >= min_ratio:
+        det.verdict = "gdl90"
+    elif det.valid >= min_valid or (det.valid and det.ratio >= min_ratio):
+        # plenty of frames in a lot of other data, or a short clean capture
+        det.verdict = "maybe"
+    return det
 
 
 def is_gdl90_file(filename):
-    with open(filename, "rb") as f:
-        data = f.read()
+    return detect(filename).verdict == "gdl90"
+
+
+# ===============================
+# DIRECTORY SCAN
+# ===============================
+def iter_files(paths):
+    for p in paths:
+        if os.path.isdir(p):
+            for root, dirs, files in os.walk(p):
+                dirs.sort()
+                for name in sorted(files):
+                    full = os.path.join(root, name)
+                    if os.path.isfile(full) and not os.path.islink(full):
+                        yield full
+        else:
+            yield p
+
 
-    raw_frames = data.split(b'\x7E')
-    valid = 0
-    total = 0
+def scan(paths, workers=None, **kwargs):
+    """detect() over every file, in worker processes; yields as they finish"""
+    files = list(iter_files(paths))
+    if len(files) <= 1 or workers == 1:
+        for p in files:
+            yield detect(p, **kwargs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(detect, p, **kwargs) for p in files]
+        for fut in as_completed(futures):
+            yield fut.result()
 
-    for raw in raw_frames:
-        if len(raw) < 4:
-            continue
 
-        frame = unescape_gdl90(raw)
+# ===============================
+# REPORT
+# ===============================
+def _mib(n):
+    return f"{n / (1 << 20):.1f} MiB"
 
-        if len(frame) < 4:
-            continue
 
-        payload = frame[:-2]
-        rx_crc = int.from_bytes(frame[-2:], "little")
-        calc_crc = crc16_ccitt(payload)
+def print_detection(det, histogram=True):
+    if det.verdict == "error":
+        print(f"?? {det.path}: {det.error}")
+        return
+    mark = {"gdl90": "✔", "maybe": "~", "no": "✘"}[det.verdict]
+    scope = "partial" if det.early else "full"
+    print(f"{mark} {det.path}: {det.verdict.upper()}  "
+          f"{det.valid}/{det.candidates} frames valid ({det.ratio:.0%}), "
+          f"{det.bad_crc} bad CRC, {det.oversize} oversize, "
+          f"scanned {_mib(det.scanned)} of {_mib(det.size)} ({scope})")
+    if histogram and det.ids:
+        for msg_id, n in sorted(det.ids.items(), key=lambda t: -t[1]):
+            name = MESSAGE_NAMES.get(msg_id, "unknown")
+            print(f"      ID {msg_id:3d} (0x{msg_id:02X}) {name:<28} {n:10d}")
 
-        total += 1
-        if rx_crc == calc_crc:
-            valid += 1
 
-    print(f"Total candidate frames: {total}")
-    print(f"Valid GDL90 frames:     {valid}")
+def main():
+    ap = argparse.ArgumentParser(description="Detect and triage GDL90 captures")
+    ap.add_argument("paths", nargs="+", help="files or directories ('-' = stdin)")
+    ap.add_argument("--full", action="store_true", help="scan whole files (complete histograms)")
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--min-valid", type=int, default=MIN_VALID, help="valid frames needed for a GDL90 verdict")
+    ap.add_argument("--min-ratio", type=float, default=MIN_RATIO, help="valid/candidate ratio needed")
+    ap.add_argument("--give-up", type=int, default=GIVE_UP >> 20, metavar="MIB",
+                    help="stop after this many MiB without --min-valid frames")
+    ap.add_argument("--json", action="store_true", help="one JSON object per file")
+    ap.add_argument("-q", "--quiet", action="store_true", help="no message ID histograms")
+    args = ap.parse_args()
+
+    counts = Counter()
+    for det in scan(args.paths, args.workers, full=args.full, min_valid=args.min_valid,
+                    min_ratio=args.min_ratio, give_up=args.give_up << 20):
+        counts[det.verdict] += 1
+        if args.json:
+            print(json.dumps(asdict(det)), flush=True)
+        else:
+            print_detection(det, histogram=not args.quiet)
 
-    return valid > 0
+    if not args.json and sum(counts.values()) > 1:
+        print(f"\n{sum(counts.values())} files: {counts['gdl90']} GDL90, {counts['maybe']} maybe, "
+              f"{counts['no']} not GDL90, {counts['error']} errors")
+    return 0 if counts["gdl90"] else 1
 
 
 if __name__ == "__main__":
-    fname = "/home/helvio/Downloads/log-aviao.dat"   # <-- change this
-    if is_gdl90_file(fname):
-        print("✔ This file IS very likely GDL90")
-    else:
-        print("✘ This file does NOT look like GDL90")
+    sys.exit(main())
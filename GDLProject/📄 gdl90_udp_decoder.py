@@ -1,11 +1,45 @@
 #!/usr/bin/env python3
-import socket
-import serial
+"""
+GDL90 decoder for several sources at once.
+
+One asyncio loop listens on any mix of UDP ports, TCP servers and serial
+ports. Each source has its own incremental framer and tag; every decoded
+message becomes one Record on a single output queue, printed one line per
+message (or as JSON lines).
+
+  python3 "📄 gdl90_udp_decoder.py"                                  # UDP 4000
+  python3 "📄 gdl90_udp_decoder.py" --udp wifi=4000 --serial backup=/dev/ttyUSB0@115200
+  python3 "📄 gdl90_udp_decoder.py" --tcp 127.0.0.1:3100 --json
+
+Sources never block each other: reads are callbacks on the loop, each
+one handles a bounded chunk, and the output queue keeps one bounded lane
+per source served round-robin, so a flood on one source drops its own
+oldest records (counted) instead of stalling or crowding out the others.
+
+Requires: pyserial (only for serial sources)
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from collections import deque, namedtuple
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import gdl90_checkout  # noqa: F401
+
+from gdl90.fcs import crcCompute
 
 FRAME_DELIM = 0x7E
 ESCAPE = 0x7D
 ESC_XOR = 0x20
 
+MAX_FRAME = 1024             # escaped; the largest message (uplink) is 436 bytes
+READ_SIZE = 4096
+QUEUE_SIZE = 2000            # records waiting per source
+RETRY_S = 2.0
 
 
 def clean_callsign(raw: bytes) -> str:
@@ -15,27 +49,13 @@ def clean_callsign(raw: bytes) -> str:
     ).strip()
 
 
-# ============================================================
-# CRC-16 X25 (GDL90) – COMPUTED BUT NOT ENFORCED
-# ============================================================
-
-def crc16_x25(data: bytes) -> int:
-    crc = 0xFFFF
-    for b in data:
-        crc ^= b
-        for _ in range(8):
-            if crc & 1:
-                crc = (crc >> 1) ^ 0x8408
-            else:
-                crc >>= 1
-    return (~crc) & 0xFFFF
-
-
 # ============================================================
 # Framing helpers
 # ============================================================
 
 def unescape(data: bytes) -> bytes:
+    if ESCAPE not in data:
+        return bytes(data)
     out = bytearray()
     i = 0
     while i < len(data):
@@ -49,20 +69,47 @@ def unescape(data: bytes) -> bytes:
     return bytes(out)
 
 
-def extract_frames(buf: bytearray):
-    frames = []
-    while True:
-        try:
-            s = buf.index(FRAME_DELIM)
-            e = buf.index(FRAME_DELIM, s + 1)
-        except ValueError:
-            break
-
-        raw = buf[s + 1:e]
-        del buf[:e + 1]
-        frames.append(unescape(raw))
+class Framer:
+    """
+    incremental 0x7E framer: each byte is searched once, the consumed
+    prefix is dropped once per feed; stream=False (datagrams) discards an
+    unterminated tail instead of carrying it into the next datagram
+    """
+
+    def __init__(self, stream=True):
+        self.buf = bytearray()   # empty, or starts at an opening delimiter
+        self.scan = 0            # where the search for the closing one resumes
+        self.stream = stream
+        self.overflow = 0
+
+    def feed(self, data):
+        buf = self.buf
+        if not buf:
+            start = data.find(FRAME_DELIM)
+            if start == -1:
+                return []
+            buf.extend(memoryview(data)[start:])
+            self.scan = 1
+        else:
+            buf.extend(data)
 
-    return frames
+        frames = []
+        start = 0
+        end = buf.find(FRAME_DELIM, self.scan)
+        while end != -1:
+            if end - start > 1:
+                frames.append(unescape(buf[start + 1:end]))
+            start = end
+            end = buf.find(FRAME_DELIM, start + 1)
+
+        del buf[:start]
+        self.scan = len(buf)
+        if not self.stream or len(buf) > MAX_FRAME:
+            if self.stream:
+                # no closing delimiter in sight: garbage on the line
+                self.overflow += 1
+            del buf[:]
+        return frames
 
 
 def s24(b):
@@ -72,159 +119,366 @@ def s24(b):
     return v
 
 
+def crc_ok(frame: bytes) -> bool:
+    return crcCompute(frame[:-2]) == frame[-2:]
+
+
 # ============================================================
-# GDL90 Decoders
+# GDL90 Decoders (ICD layout)
 # ============================================================
 
 def decode_heartbeat(p):
     return {
-        "uptime_s": (p[1] << 8) | p[2],
-        "gps_valid": bool(p[3] & 0x01),
-        "traffic_valid": bool(p[3] & 0x02),
+        "gps_valid": bool(p[1] & 0x80),
+        "uat_initialized": bool(p[1] & 0x01),
+        "utc_ok": bool(p[2] & 0x01),
+        # seconds since 0000Z; bit 16 lives in status byte 2
+        "timestamp_s": ((p[2] & 0x80) << 9) | (p[4] << 8) | p[3],
     }
 
 
 def decode_geo_altitude(p):
-    alt = ((p[1] << 8) | p[2]) & 0x0FFF
+    alt = (p[1] << 8) | p[2]
+    if alt & 0x8000:
+        alt -= 1 << 16
     return {
-        "geo_altitude_ft": alt * 25 - 1000
+        "geo_altitude_ft": alt * 5,
+        "vertical_warning": bool(p[3] & 0x80),
     }
 
 
-def decode_ownship(p):
-    lat = s24(p[1:4]) * (180 / (1 << 23))
-    lon = s24(p[4:7]) * (180 / (1 << 23))
-    alt = (((p[7] << 8) | p[8]) & 0x0FFF) * 25 - 1000
-    heading = p[9] * (360 / 256)
-    gs = p[10]
-
-    return {
-        "latitude": round(lat, 6),
-        "longitude": round(lon, 6),
-        "altitude_ft": alt,
-        "heading_deg": round(heading, 1),
-        "ground_speed_kt": gs,
-    }
-
 def decode_traffic(p):
-    addr = (p[1] << 16) | (p[2] << 8) | p[3]
-
-    lat = s24(p[4:7]) * (180 / (1 << 23))
-    lon = s24(p[7:10]) * (180 / (1 << 23))
+    """message 10 (ownship) and 20 (traffic) share one layout"""
+    addr = (p[2] << 16) | (p[3] << 8) | p[4]
 
-    alt_raw = ((p[10] << 8) | p[11]) & 0x0FFF
-    altitude = alt_raw * 25 - 1000
+    lat = s24(p[5:8]) * (180 / (1 << 23))
+    lon = s24(p[8:11]) * (180 / (1 << 23))
 
-    ground_speed = p[12]
-    heading = p[13] * (360 / 256)
+    alt_raw = (p[11] << 4) | (p[12] >> 4)
+    altitude = None if alt_raw == 0xFFF else alt_raw * 25 - 1000
+    misc = p[12] & 0x0F
 
-    callsign = p[18:26].decode("ascii", errors="ignore").strip()
-    callsign = clean_callsign(p[18:26])
+    hvel = (p[14] << 4) | (p[15] >> 4)
+    vvel = ((p[15] & 0x0F) << 8) | p[16]
+    if vvel & 0x800:
+        vvel -= 1 << 12
 
     return {
         "address": f"{addr:06X}",
         "latitude": round(lat, 6),
         "longitude": round(lon, 6),
         "altitude_ft": altitude,
-        "heading_deg": round(heading, 1),
-        "ground_speed_kt": ground_speed,
-        "callsign": callsign,
+        "airborne": bool(misc & 0x08),
+        "heading_deg": round(p[17] * (360 / 256), 1),
+        "ground_speed_kt": None if hvel == 0xFFF else hvel,
+        "vertical_speed_fpm": None if vvel == -0x800 else vvel * 64,
+        "emitter": p[18],
+        "callsign": clean_callsign(p[19:27]),
     }
 
 
-# ============================================================
-# Frame Decoder (CRC IGNORED)
-# ============================================================
+# msg id -> (type, decoder, minimum payload length)
+DECODERS = {
+    0x00: ("Heartbeat", decode_heartbeat, 7),
+    0x0A: ("Ownship", decode_traffic, 28),
+    0x0B: ("GeoAltitude", decode_geo_altitude, 5),
+    0x14: ("Traffic", decode_traffic, 28),
+}
 
-def decode_frame(frame: bytes):
-    if len(frame) < 4:
-        return
 
-    payload = frame[:-2]
-    rx_crc = frame[-2] | (frame[-1] << 8)
-    calc_crc = crc16_x25(payload)
+# ============================================================
+# Records
+# ============================================================
 
-    msg_id = payload[0]
+Record = namedtuple("Record", "source time msg_id type data")
+
+
+class SourceStats:
+    __slots__ = ("bytes", "frames", "bad_crc", "dropped", "connected")
+
+    def __init__(self):
+        self.bytes = 0
+        self.frames = 0
+        self.bad_crc = 0
+        self.dropped = 0
+        self.connected = False
+
+
+class FairQueue:
+    """
+    the single output queue: one bounded lane per source, served
+    round-robin, so a flooding source only ever loses its own (oldest)
+    records and cannot push another source's records out
+    """
+
+    def __init__(self, lane_size=QUEUE_SIZE):
+        self.lane_size = lane_size
+        self.lanes = {}          # tag -> deque of records
+        self.order = deque()     # tags with records waiting, in turn order
+        self.ready = asyncio.Event()
+
+    def add_lane(self, tag):
+        self.lanes[tag] = deque(maxlen=self.lane_size)
+
+    def put(self, tag, rec):
+        """False when the lane was full and its oldest record was dropped"""
+        lane = self.lanes[tag]
+        if not lane:
+            self.order.append(tag)
+        full = len(lane) == self.lane_size
+        lane.append(rec)
+        self.ready.set()
+        return not full
+
+    async def get(self):
+        while not self.order:
+            self.ready.clear()
+            await self.ready.wait()
+        tag = self.order.popleft()
+        lane = self.lanes[tag]
+        rec = lane.popleft()
+        if lane:
+            self.order.append(tag)
+        return rec
+
+    def __len__(self):
+        return sum(len(lane) for lane in self.lanes.values())
+
+
+class Ingest:
+    """sources feed frames here; decoded records go to one queue"""
+
+    def __init__(self, queue_size=QUEUE_SIZE, check_crc=True):
+        self.queue = FairQueue(queue_size)
+        self.check_crc = check_crc
+        self.stats = {}
+
+    def register(self, tag):
+        if tag in self.stats:
+            raise ValueError(f"duplicate source tag {tag!r}")
+        self.stats[tag] = SourceStats()
+        self.queue.add_lane(tag)
+        return self.stats[tag]
+
+    def frames(self, tag, frames):
+        st = self.stats[tag]
+        now = time.time()
+        put = self.queue.put
+        for frame in frames:
+            if len(frame) < 3:
+                continue
+            st.frames += 1
+            if self.check_crc and not crc_ok(frame):
+                st.bad_crc += 1
+                continue
+            payload = frame[:-2]
+            msg_id = payload[0]
+            kind, decoder, min_len = DECODERS.get(msg_id, ("Unknown", None, 0))
+            if decoder is not None and len(payload) < min_len:
+                kind, decoder = "Short", None
+            data = decoder(payload) if decoder else {"payload": payload.hex()}
+            if not put(tag, Record(tag, now, msg_id, kind, data)):
+                # the consumer is behind: this source loses its oldest record
+                st.dropped += 1
 
-    print(f"FRAME: {payload.hex()}")
-    print(f"  MSG ID: 0x{msg_id:02X}")
-    print(
-        f"  CRC: rx=0x{rx_crc:04X} calc=0x{calc_crc:04X}",
-        "OK" if rx_crc == calc_crc else "ERROR",
-    )
 
-    # 🚨 CRC IS NOT USED TO BLOCK DECODING 🚨
+# ============================================================
+# Input sources
+# ============================================================
 
-    if msg_id == 0x00:
-        print("  Type: Heartbeat")
-        print(" ", decode_heartbeat(payload))
+class _UdpProtocol(asyncio.DatagramProtocol):
+    def __init__(self, ingest, tag):
+        self.ingest = ingest
+        self.tag = tag
+        self.framer = Framer(stream=False)   # one datagram = whole frames
 
-    elif msg_id == 0x0B:
-        print("  Type: Geo Altitude")
-        print(" ", decode_geo_altitude(payload))
+    def datagram_received(self, data, addr):
+        self.ingest.stats[self.tag].bytes += len(data)
+        self.ingest.frames(self.tag, self.framer.feed(data))
 
-    elif msg_id == 0x0A:
-        print("  Type: Ownship Report")
-        print(" ", decode_ownship(payload))
 
-    elif msg_id == 0x14:
-        print("  Type: Traffic Report")
-        print(" ", decode_traffic(payload))
+async def from_udp(ingest, tag, port=4000, host="0.0.0.0"):
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: _UdpProtocol(ingest, tag), local_addr=(host, port))
+    ingest.stats[tag].connected = True
+    print(f"[{tag}] Listening for GDL90 UDP on {host}:{port}", file=sys.stderr)
+    try:
+        await asyncio.Future()          # until cancelled
+    finally:
+        transport.close()
 
-    else:
-        print("  Type: Unknown")
 
-    print("-" * 70)
+async def from_tcp(ingest, tag, host="127.0.0.1", port=3100):
+    st = ingest.stats[tag]
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError as e:
+            print(f"[{tag}] TCP {host}:{port} unavailable ({e}), retrying", file=sys.stderr)
+            await asyncio.sleep(RETRY_S)
+            continue
+
+        print(f"[{tag}] Connected to GDL90 TCP {host}:{port}", file=sys.stderr)
+        st.connected = True
+        framer = Framer()
+        try:
+            while True:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                st.bytes += len(data)
+                ingest.frames(tag, framer.feed(data))
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            st.connected = False
+            writer.close()
+        print(f"[{tag}] TCP connection lost, retrying", file=sys.stderr)
+        await asyncio.sleep(RETRY_S)
+
+
+async def from_serial(ingest, tag, dev="/dev/ttyUSB0", baud=115200):
+    import serial   # pyserial is only needed for serial sources
+
+    loop = asyncio.get_running_loop()
+    st = ingest.stats[tag]
+    while True:
+        try:
+            ser = serial.Serial(dev, baud, timeout=0)
+        except (serial.SerialException, OSError) as e:
+            print(f"[{tag}] Serial {dev} unavailable ({e}), retrying", file=sys.stderr)
+            await asyncio.sleep(RETRY_S)
+            continue
+
+        print(f"[{tag}] Reading GDL90 serial {dev} @ {baud}", file=sys.stderr)
+        st.connected = True
+        framer = Framer()
+        lost = loop.create_future()
+
+        def on_readable():
+            try:
+                data = ser.read(READ_SIZE)
+            except (serial.SerialException, OSError) as e:
+                if not lost.done():
+                    lost.set_result(e)
+                return
+            if data:
+                st.bytes += len(data)
+                ingest.frames(tag, framer.feed(data))
+
+        loop.add_reader(ser.fileno(), on_readable)
+        try:
+            e = await lost
+            print(f"[{tag}] Serial error ({e}), reopening", file=sys.stderr)
+        finally:
+            loop.remove_reader(ser.fileno())
+            st.connected = False
+            ser.close()
+        await asyncio.sleep(RETRY_S)
 
 
 # ============================================================
-# Input sources
+# Output
 # ============================================================
 
-def from_udp(port=4000):
-    print(f"Listening for GDL90 UDP on 0.0.0.0:{port}")
-    buf = bytearray()
+def format_record(rec: Record) -> str:
+    d = rec.data
+    head = f"[{rec.source}] {rec.type:<11}"
+    if rec.type in ("Traffic", "Ownship"):
+        alt = "-" if d["altitude_ft"] is None else f"{d['altitude_ft']}ft"
+        gs = "-" if d["ground_speed_kt"] is None else f"{d['ground_speed_kt']}kt"
+        return (f"{head} {d['address']} {d['callsign'] or '-':<8} "
+                f"{d['latitude']:.5f},{d['longitude']:.5f} {alt} {gs} {d['heading_deg']:.0f}°")
+    if rec.type == "Heartbeat":
+        return f"{head} gps={int(d['gps_valid'])} utc={int(d['utc_ok'])} t={d['timestamp_s']}s"
+    if rec.type == "GeoAltitude":
+        return f"{head} {d['geo_altitude_ft']}ft"
+    return f"{head} id=0x{rec.msg_id:02X} {d.get('payload', '')[:48]}"
+
+
+async def print_records(ingest, as_json=False):
+    queue = ingest.queue
+    while True:
+        rec = await queue.get()
+        if as_json:
+            line = json.dumps({"source": rec.source, "time": round(rec.time, 3),
+                               "msg_id": rec.msg_id, "type": rec.type, **rec.data})
+        else:
+            line = format_record(rec)
+        print(line)
 
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind(("0.0.0.0", port))
 
+async def report(ingest, period):
     while True:
-        data, _ = sock.recvfrom(8192)
-        buf.extend(data)
-        for f in extract_frames(buf):
-            decode_frame(f)
-
-
-def from_tcp(host="127.0.0.1", port=3100):
-    buf = bytearray()
-    with socket.create_connection((host, port)) as s:
-        while True:
-            data = s.recv(4096)
-            if not data:
-                break
-            buf.extend(data)
-            for f in extract_frames(buf):
-                decode_frame(f)
+        await asyncio.sleep(period)
+        print_stats(ingest)
 
 
-def from_serial(dev="/dev/ttyUSB0", baud=115200):
-    buf = bytearray()
-    with serial.Serial(dev, baud, timeout=1) as ser:
-        while True:
-            data = ser.read(512)
-            if not data:
-                continue
-            buf.extend(data)
-            for f in extract_frames(buf):
-                decode_frame(f)
+def print_stats(ingest):
+    for tag, st in ingest.stats.items():
+        print(f"[{tag}] {'up' if st.connected else 'down'}: {st.bytes} bytes, {st.frames} frames, "
+              f"{st.bad_crc} bad CRC, {st.dropped} dropped", file=sys.stderr)
 
 
 # ============================================================
 # Main
 # ============================================================
 
+def parse_source(kind, text):
+    """[tag=]spec -> (tag, kwargs)"""
+    tag, _, spec = text.rpartition("=")
+    if kind == "udp":
+        kwargs = {"port": int(spec)}
+    elif kind == "tcp":
+        host, _, port = spec.rpartition(":")
+        kwargs = {"host": host or "127.0.0.1", "port": int(port)}
+    else:
+        dev, _, baud = spec.partition("@")
+        kwargs = {"dev": dev, "baud": int(baud) if baud else 115200}
+    return tag or f"{kind}:{spec}", kwargs
+
+
+async def run(sources, as_json=False, stats_period=0.0, check_crc=True):
+    ingest = Ingest(check_crc=check_crc)
+    readers = {"udp": from_udp, "tcp": from_tcp, "serial": from_serial}
+    tasks = []
+    for kind, tag, kwargs in sources:
+        ingest.register(tag)
+        tasks.append(readers[kind](ingest, tag, **kwargs))
+    tasks.append(print_records(ingest, as_json))
+    if stats_period > 0:
+        tasks.append(report(ingest, stats_period))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        print_stats(ingest)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="GDL90 decoder for UDP/TCP/serial sources at once")
+    ap.add_argument("--udp", action="append", default=[], metavar="[TAG=]PORT")
+    ap.add_argument("--tcp", action="append", default=[], metavar="[TAG=]HOST:PORT")
+    ap.add_argument("--serial", action="append", default=[], metavar="[TAG=]DEV[@BAUD]")
+    ap.add_argument("--json", action="store_true", help="one JSON object per message")
+    ap.add_argument("--stats", type=float, default=0.0, metavar="S",
+                    help="print per-source counters every S seconds (stderr)")
+    ap.add_argument("--no-crc", action="store_true", help="decode frames with a bad CRC too")
+    args = ap.parse_args()
+
+    sources = []
+    for kind in ("udp", "tcp", "serial"):
+        for text in getattr(args, kind):
+            tag, kwargs = parse_source(kind, text)
+            sources.append((kind, tag, kwargs))
+    if not sources:
+        sources.append(("udp", "udp:4000", {"port": 4000}))
+
+    try:
+        asyncio.run(run(sources, args.json, args.stats, not args.no_crc))
+    except KeyboardInterrupt:
+        pass
+
+
 if __name__ == "__main__":
-    # Select ONE input method
-    from_udp(4000)
-    # from_tcp()
-    # from_serial()
+    main()
@@ -1,23 +1,24 @@
+import os
+import sys
 import time
 import random
 import socket
-from datetime import datetime
+import asyncio
+import argparse
+import math
+from datetime import datetime, timezone
+
+from flight_profile import Trajectory, load_gpx, parse_route, destination, KT_TO_MS, FPM_TO_MS
+
+try:
+    import numpy as np          # só o modo frota precisa
+except ImportError:
+    np = None
 
 # =========================================================
 # Utilidades NMEA
 # =========================================================
 
-def checksum(sentence: str) -> str:
-    c = 0
-    for ch in sentence:
-        c ^= ord(ch)
-    return f"{c:02X}"
-
-
-def nmea(msg: str) -> str:
-    return f"${msg}*{checksum(msg)}"
-
-
 def dm(value: float, is_lat=True):
     deg = int(abs(value))
     minutes = (abs(value) - deg) * 60
@@ -27,182 +28,742 @@ def dm(value: float, is_lat=True):
 
 
 # =========================================================
-# NMEA 0183 PADRÃO
+# GERADOR PRINCIPAL
 # =========================================================
 
-def gen_gprmc(lat, lon, speed_kts, course):
-    now = datetime.utcnow()
-    return nmea(
-        f"GPRMC,{now:%H%M%S},A,"
-        f"{dm(lat,True)},{'N' if lat>=0 else 'S'},"
-        f"{dm(lon,False)},{'E' if lon>=0 else 'W'},"
-        f"{speed_kts:.1f},{course:.1f},"
-        f"{now:%d%m%y},,,A"
-    )
+def generate_stream(clock=None, seed=None, route=None):
+    """
+    Sentenças de um voo completo (flight_profile.Trajectory).
+    Sem clock: tempo real. Com SimClock/seed: horários simulados e
+    sorteios reproduzíveis.
+    """
+    clock = clock or SimClock()
+    encoder = EpochEncoder(random.Random(seed), clock.now)
 
+    for sample in Trajectory(route, repeat=True):
+        yield from encoder.encode_sample(sample).decode("ascii").split("\r\n")[:-1]
+        clock.tick()
 
-def gen_gpgga(lat, lon, alt_m):
-    now = datetime.utcnow()
-    return nmea(
-        f"GPGGA,{now:%H%M%S},"
-        f"{dm(lat,True)},{'N' if lat>=0 else 'S'},"
-        f"{dm(lon,False)},{'E' if lon>=0 else 'W'},"
-        f"1,08,0.9,{alt_m:.1f},M,0.0,M,,"
-    )
 
+# =========================================================
+# RELÓGIO SIMULADO
+#  speed = 1   -> tempo real
+#  speed = N   -> N vezes mais rápido
+#  speed = 0   -> sem espera (o mais rápido possível)
+# =========================================================
 
-def gen_gpvtg(course, speed_kts):
-    speed_kmh = speed_kts * 1.852
-    return nmea(
-        f"GPVTG,{course:.1f},T,,M,"
-        f"{speed_kts:.1f},N,{speed_kmh:.1f},K,A"
-    )
+class SimClock:
 
+    def __init__(self, start=None, speed=1.0, step=1.0):
+        self.t = time.time() if start is None else float(start)
+        self.speed = speed
+        self.step = step
+        self._deadline = time.monotonic()
 
-def gen_gpgsa():
-    return nmea(
-        "GPGSA,A,3,"
-        "01,02,03,04,05,06,07,08,,,,"
-        "1.5,0.9,1.2"
-    )
+    def now(self) -> float:
+        return self.t
 
+    @property
+    def interval(self) -> float:
+        """tempo real entre épocas"""
+        return self.step / self.speed if self.speed > 0 else 0.0
 
-def gen_gpgsv():
-    sats = []
-    for prn in range(1, 5):
-        sats.append(
-            f"{prn:02d},{random.randint(10,80)},"
-            f"{random.randint(0,359)},"
-            f"{random.randint(20,50)}"
-        )
-    return nmea(f"GPGSV,1,1,04," + ",".join(sats))
+    def advance(self):
+        self.t += self.step
+
+    def tick(self):
+        """avança uma época e espera o tempo real correspondente"""
+        self.advance()
+        if self.speed > 0:
+            self._deadline += self.interval
+            delay = self._deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
 
 
 # =========================================================
-# GARMIN PROPRIETÁRIO
+# MOTOR DE CODIFICAÇÃO (bytes prontos, 1 buffer por época)
+#  - hora/data formatadas 1x por segundo, posição 1x por época
+#  - sentenças constantes (GSA, PGRMM, PGRMT) guardadas já em bytes
+#  - checksum incremental: XOR é associativo, então o checksum de
+#    "GPRMC," + hora + resto = xor(prefixo) ^ xor(hora) ^ xor(resto),
+#    com prefixo e hora calculados uma vez só
 # =========================================================
 
-def gen_pgrmf(lat, lon, speed_kmh, course):
-    now = datetime.utcnow()
-    gps_week = 2200
-    gps_sec = int(time.time()) % 604800
+_HEX = [f"{i:02X}".encode("ascii") for i in range(256)]
+
+
+def xor_bytes(data: bytes) -> int:
+    """XOR de todos os bytes, dobrando o inteiro ao meio (sem laço por byte)"""
+    x = int.from_bytes(data, "little")
+    n = len(data)
+    while n > 1:
+        half = (n + 1) // 2
+        x = (x & ((1 << (half * 8)) - 1)) ^ (x >> (half * 8))
+        n = half
+    return x
+
+
+def nmea_bytes(body: bytes) -> bytes:
+    return b"$" + body + b"*" + _HEX[xor_bytes(body)] + b"\r\n"
+
+
+def _part(data: bytes):
+    """pedaço de sentença + XOR dele: (bytes, xor)"""
+    return data, xor_bytes(data)
+
+
+def _var(text: str):
+    return _part(text.encode("ascii"))
+
+
+SATS_FORMAT = ",".join(f"{prn:02d},%d,%d,%d" for prn in range(1, 5))
+
+
+def _frame(*parts) -> bytes:
+    cs = 0
+    for _, x in parts:
+        cs ^= x
+    return b"".join((b"$", *(d for d, _ in parts), b"*", _HEX[cs], b"\r\n"))
+
+
+class EpochEncoder:
+
+    GPRMC = _part(b"GPRMC,")
+    RMC_VALID = _part(b"A,")
+    GPGGA = _part(b"GPGGA,")
+    GPVTG = _part(b"GPVTG,")
+    GPGSV = _part(b"GPGSV,1,1,04,")
+    PGRMF = _part(b"PGRMF,2200,")
+    PGRME = _part(b"PGRME,")
+    PGRMH = _part(b"PGRMH,A,")
+    PGRMV = _part(b"PGRMV,")
+    PGRMZ = _part(b"PGRMZ,")
+
+    GPGSA_BYTES = nmea_bytes(b"GPGSA,A,3,01,02,03,04,05,06,07,08,,,,1.5,0.9,1.2")
+    PGRMM_BYTES = nmea_bytes(b"PGRMM,WGS 84")
+    PGRMT_BYTES = nmea_bytes(b"PGRMT,GDU460 SW VER 9.12,P,P,R,R,P,,45.0,R")
+
+    def __init__(self, rng=random, clock=time.time):
+        self.rng = rng
+        self.clock = clock
+        self._sec = None
+
+    def stamp(self, t=None):
+        """fixa o horário da época (padrão: clock())"""
+        sec = int(self.clock() if t is None else t)
+        if sec != self._sec:
+            tm = time.gmtime(sec)
+            self._sec = sec
+            self._hms = _var(time.strftime("%H%M%S", tm) + ",")
+            self._dmy = time.strftime("%d%m%y", tm)
+            # PGRMF: "<gps_sec>,<ddmmyy>,<hhmmss>,18,"
+            self._pgrmf_time = _var(
+                f"{sec % 604800},{self._dmy},{time.strftime('%H%M%S', tm)},18,"
+            )
+            self._pgrmt = sec % 60 == 0
+
+    def encode_sample(self, sample, t=None) -> bytes:
+        """época a partir de um FlightSample (cinemática coerente)"""
+        rng = self.rng
+        self.stamp(t)
+
+        sats = [
+            v for _ in range(4)
+            for v in (rng.randint(10, 80), rng.randint(0, 359), rng.randint(20, 50))
+        ]
+        pgrme = (rng.uniform(1, 10), rng.uniform(2, 15))
+
+        gs = sample.speed_kts * KT_TO_MS
+        crs = math.radians(sample.course)
+        vs = int(round(sample.vs_fpm))
+        pgrmh = (vs, int(round(sample.vnav_err_ft)), int(round(sample.agl_ft)),
+                 sample.desired_track, sample.next_leg_course)
+        pgrmv = (gs * math.sin(crs), gs * math.cos(crs), sample.vs_fpm * FPM_TO_MS)
+
+        return self.render(sample.lat, sample.lon, sample.alt_ft, sample.course,
+                           sample.speed_kts, sats, pgrme, pgrmh, pgrmv)
+
+    def render(self, lat, lon, alt_ft, course, speed_kts,
+               sats, pgrme, pgrmh, pgrmv) -> bytes:
+        """
+        Monta a época a partir de valores já sorteados, no horário do
+        último stamp().
+          sats  : 12 valores (elevação, azimute, SNR) x 4 satélites
+          pgrme : (hpe, vpe)
+          pgrmh : (vs, erro vnav, terreno, trilha, próxima trilha)
+          pgrmv : (vel E, vel N, vel Up)
+        """
+        hms = self._hms
+        speed_kmh = speed_kts * 1.852
 
-    return nmea(
-        f"PGRMF,{gps_week},{gps_sec},"
-        f"{now:%d%m%y},{now:%H%M%S},18,"
-        f"{dm(lat, True)},{'N' if lat >= 0 else 'S'},"
-        f"{dm(lon, False)},{'E' if lon >= 0 else 'W'},"
-        f"A,2,{speed_kmh:.1f},{course:.1f},1,1"
-    )
+        # posição formatada uma vez para RMC, GGA e PGRMF
+        pos = _var(
+            f"{dm(lat, True)},{'N' if lat >= 0 else 'S'},"
+            f"{dm(lon, False)},{'E' if lon >= 0 else 'W'}"
+        )
+        h, v = pgrme
+        vs, vnav, terrain, trk, next_trk = pgrmh
+
+        out = [
+            _frame(self.GPRMC, hms, self.RMC_VALID, pos,
+                   _var(f",{speed_kts:.1f},{course:.1f},{self._dmy},,,A")),
+            _frame(self.GPGGA, hms, pos,
+                   _var(f",1,08,0.9,{alt_ft * 0.3048:.1f},M,0.0,M,,")),
+            _frame(self.GPVTG,
+                   _var(f"{course:.1f},T,,M,{speed_kts:.1f},N,{speed_kmh:.1f},K,A")),
+            self.GPGSA_BYTES,
+            _frame(self.GPGSV, _var(SATS_FORMAT % tuple(sats))),
+            _frame(self.PGRMF, self._pgrmf_time, pos,
+                   _var(f",A,2,{speed_kmh:.1f},{course:.1f},1,1")),
+            _frame(self.PGRME,
+                   _var(f"{h:.1f},M,{v:.1f},M,{(h + v) / 2:.1f},M")),
+            _frame(self.PGRMH, _var(
+                f"{vs},{vnav},{vs},{vs},{terrain},{trk:.1f},{next_trk:.1f}")),
+            _frame(self.PGRMV, _var(
+                f"{pgrmv[0]:.2f},{pgrmv[1]:.2f},{pgrmv[2]:.2f}")),
+            _frame(self.PGRMZ, _var(f"{int(alt_ft)},f,3")),
+            self.PGRMM_BYTES,
+        ]
+
+        if self._pgrmt:
+            out.append(self.PGRMT_BYTES)
+
+        return b"".join(out)
 
 
-def gen_pgrme():
-    h = random.uniform(1, 10)
-    v = random.uniform(2, 15)
-    e = (h + v) / 2
-    return nmea(f"PGRME,{h:.1f},M,{v:.1f},M,{e:.1f},M")
+# =========================================================
+# SERVIDOR ASYNCIO (N clientes TCP + UDP opcional)
+#  - cada época é gerada e codificada uma vez só
+#  - os bytes vão para todos os clientes conectados
+#  - cliente lento: buffer de escrita limitado por cliente
+#      "drop"       -> perde as épocas enquanto o buffer estiver cheio
+#      "disconnect" -> derruba o cliente (ele pode reconectar)
+# =========================================================
 
+class NmeaClient:
+    __slots__ = ("writer", "addr", "dropped")
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.addr = writer.get_extra_info("peername")
+        self.dropped = 0
+
+
+class NmeaServer:
+
+    def __init__(self, port=3100, host="0.0.0.0", max_buffer=64 * 1024,
+                 slow_policy="drop", udp_target=None, clock=None, seed=None,
+                 verbose=True, route=None):
+        if slow_policy not in ("drop", "disconnect"):
+            raise ValueError(f"slow_policy inválida: {slow_policy}")
+
+        self.host = host
+        self.port = port
+        self.max_buffer = max_buffer
+        self.slow_policy = slow_policy
+        self.udp_target = udp_target        # ("255.255.255.255", 10110)
+        self.clock = clock or SimClock()
+
+        rng = random if seed is None else random.Random(seed)
+        self.encoder = EpochEncoder(rng, self.clock.now)
+        self.route = route
+        self.verbose = verbose
+        self.clients = set()
+        self.server = None
+        self.udp = None
+        self.epochs = 0
+        self.dropped = 0                    # épocas perdidas, todos os clientes
+
+    # ---------------- conexões ----------------
+
+    async def _on_connect(self, reader, writer):
+        client = NmeaClient(writer)
+        self.clients.add(client)
+        if self.verbose:
+            print(f"[GARMIN G3X SIM] Cliente conectado: {client.addr} "
+                  f"({len(self.clients)} ativos)")
+
+        try:
+            # o simulador não lê nada; só espera o cliente fechar
+            while await reader.read(1024):
+                pass
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._drop_client(client)
+
+    def _drop_client(self, client):
+        if client in self.clients:
+            self.clients.discard(client)
+            client.writer.close()
+            if self.verbose:
+                print(f"[GARMIN G3X SIM] Cliente desconectado: {client.addr} "
+                      f"(épocas perdidas: {client.dropped})")
+
+    # ---------------- fan-out ----------------
+
+    def broadcast(self, data: bytes):
+        for client in list(self.clients):
+            transport = client.writer.transport
+            if transport.is_closing():
+                self._drop_client(client)
+                continue
+
+            if transport.get_write_buffer_size() + len(data) > self.max_buffer:
+                if self.slow_policy == "disconnect":
+                    if self.verbose:
+                        print(f"[GARMIN G3X SIM] Cliente lento: {client.addr}")
+                    self._drop_client(client)
+                else:
+                    client.dropped += 1
+                    self.dropped += 1
+                continue
+
+            client.writer.write(data)
+
+        if self.udp is not None:
+            self.udp.sendto(data, self.udp_target)
+
+    # ---------------- ciclo de vida ----------------
+
+    def max_backlog(self) -> int:
+        """maior buffer de escrita pendente entre os clientes (bytes)"""
+        return max(
+            (c.writer.transport.get_write_buffer_size() for c in self.clients),
+            default=0,
+        )
 
-def gen_pgrmh():
-    vs = random.randint(-500, 500)
-    return nmea(
-        f"PGRMH,A,{vs},{random.randint(-50,50)},"
-        f"{vs},{vs},{random.randint(0,5000)},"
-        f"{random.uniform(0,359):.1f},{random.uniform(0,359):.1f}"
-    )
+    async def start(self):
+        loop = asyncio.get_running_loop()
 
+        self.server = await asyncio.start_server(self._on_connect, self.host, self.port)
+        if self.verbose:
+            print(f"[GARMIN G3X SIM] TCP server ativo na porta {self.port}")
 
-def gen_pgrmv():
-    return nmea(
-        f"PGRMV,"
-        f"{random.uniform(-50,50):.2f},"
-        f"{random.uniform(-50,50):.2f},"
-        f"{random.uniform(-10,10):.2f}"
-    )
+        if self.udp_target:
+            self.udp, _ = await loop.create_datagram_endpoint(
+                asyncio.DatagramProtocol,
+                family=socket.AF_INET,
+                allow_broadcast=True,
+            )
+            print(f"[GARMIN G3X SIM] UDP -> {self.udp_target[0]}:{self.udp_target[1]}")
 
+    def stop(self):
+        for client in list(self.clients):
+            self._drop_client(client)
+        if self.server is not None:
+            self.server.close()
+        if self.udp is not None:
+            self.udp.close()
 
-def gen_pgrmz(alt_ft):
-    return nmea(f"PGRMZ,{int(alt_ft)},f,3")
+    # ---------------- laço principal ----------------
 
+    async def serve(self, epochs=None):
+        loop = asyncio.get_running_loop()
+        await self.start()
 
-def gen_pgrmt():
-    return nmea("PGRMT,GDU460 SW VER 9.12,P,P,R,R,P,,45.0,R")
+        flight = Trajectory(self.route, repeat=True)
+        deadline = loop.time()
 
+        try:
+            while epochs is None or self.epochs < epochs:
+                self.broadcast(self.encoder.encode_sample(next(flight)))
+                self.epochs += 1
+                self.clock.advance()
 
-def gen_pgrmm():
-    return nmea("PGRMM,WGS 84")
+                # relógio absoluto: não acumula atraso
+                deadline += self.clock.interval
+                await asyncio.sleep(max(0.0, deadline - loop.time()))
+        finally:
+            self.stop()
 
 
 # =========================================================
-# GERADOR PRINCIPAL
+# FROTA (N aeronaves num só event loop)
+#  - estado em arrays NumPy, avançado de uma vez por época
+#  - sorteios de todas as aeronaves num só passo
+#  - saída: uma porta TCP por aeronave (porta base + i) ou um
+#    fluxo único multiplexado com tag block NMEA 4.0: \s:G3X0001*hh\
 # =========================================================
 
-def generate_stream():
-    lat = -23.0000
-    lon = -46.0000
-    alt_ft = 2500
-    course = 90.0
-
-    while True:
-        speed_kts = random.uniform(95, 130)
-        speed_kmh = speed_kts * 1.852
-
-        lat += 0.00005
-        lon += 0.00005
-        alt_ft += random.randint(-20, 20)
-        course = (course + random.uniform(-2, 2)) % 360
+class Fleet:
+
+    def __init__(self, n, seed=None, center=(-23.0, -46.0), spread_deg=1.0):
+        if np is None:
+            raise RuntimeError("modo frota requer numpy (pip3 install numpy)")
+
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        rng = self.rng
+
+        self.lat = center[0] + rng.uniform(-spread_deg, spread_deg, n)
+        self.lon = center[1] + rng.uniform(-spread_deg, spread_deg, n)
+        self.alt_ft = rng.integers(1500, 12000, n).astype(np.float64)
+        self.course = rng.uniform(0, 360, n)
+        self.speed_kts = np.zeros(n)
+
+    def step(self, dt=1.0):
+        """avança todas as aeronaves dt segundos (vetorizado)"""
+        rng, n = self.rng, self.n
+
+        self.speed_kts = rng.uniform(95, 130, n)
+        self.course = (self.course + rng.uniform(-2, 2, n)) % 360
+        self.alt_ft += rng.integers(-20, 21, n)
+
+        # grande círculo, vetorizado (arrays numpy) pelo geoutils
+        self.lat, self.lon = destination(self.lat, self.lon, self.course,
+                                         self.speed_kts * dt / 3600.0)
+
+    def encode(self, encoder) -> list:
+        """uma época (bytes) por aeronave"""
+        rng, n = self.rng, self.n
+
+        sats = np.empty((n, 12), dtype=np.int64)
+        sats[:, 0::3] = rng.integers(10, 81, (n, 4))
+        sats[:, 1::3] = rng.integers(0, 360, (n, 4))
+        sats[:, 2::3] = rng.integers(20, 51, (n, 4))
+        pgrme = np.column_stack((rng.uniform(1, 10, n), rng.uniform(2, 15, n)))
+        vs = rng.integers(-500, 501, n)
+        pgrmh = np.column_stack((
+            vs, rng.integers(-50, 51, n), rng.integers(0, 5001, n),
+            rng.uniform(0, 359, n), rng.uniform(0, 359, n),
+        ))
+        pgrmv = np.column_stack((
+            rng.uniform(-50, 50, n), rng.uniform(-50, 50, n), rng.uniform(-10, 10, n),
+        ))
+
+        # tolist(): formatar float/int do Python é bem mais rápido
+        encoder.stamp()
+        render = encoder.render
+        return [
+            render(lat, lon, alt, crs, spd, s, e, (int(h[0]), int(h[1]), int(h[2]), h[3], h[4]), v)
+            for lat, lon, alt, crs, spd, s, e, h, v in zip(
+                self.lat.tolist(), self.lon.tolist(), self.alt_ft.tolist(),
+                self.course.tolist(), self.speed_kts.tolist(),
+                sats.tolist(), pgrme.tolist(), pgrmh.tolist(), pgrmv.tolist(),
+            )
+        ]
+
+
+def tag_block(source: str) -> bytes:
+    """tag block NMEA 4.0 com o ID da fonte: \\s:<id>*hh\\"""
+    body = f"s:{source}".encode("ascii")
+    return b"\\" + body + b"*" + _HEX[xor_bytes(body)] + b"\\"
+
+
+class FleetServer:
+
+    def __init__(self, n, port=3100, host="0.0.0.0", mux=False,
+                 max_buffer=64 * 1024, slow_policy="drop",
+                 clock=None, seed=None, report_every=10.0):
+        self.fleet = Fleet(n, seed)
+        self.clock = clock or SimClock()
+        self.encoder = EpochEncoder(clock=self.clock.now)
+        self.mux = mux
+        self.report_every = report_every
+
+        # max_buffer é por aeronave; no fluxo multiplexado vale para o conjunto
+        ports = [port] if mux else [port + i for i in range(n)]
+        limit = max_buffer * n if mux else max_buffer
+        self.outputs = [
+            NmeaServer(p, host, limit, slow_policy, clock=self.clock, verbose=mux)
+            for p in ports
+        ]
+        self.tags = [b"$" if not mux else tag_block(f"G3X{i + 1:04d}") + b"$"
+                     for i in range(n)]
+
+        self.epochs = 0
+        self.sentences = 0
+        self.dropped_reported = 0
+
+    def _tick(self):
+        self.fleet.step(self.clock.step)
+        frames = self.fleet.encode(self.encoder)
+        self.sentences += sum(f.count(b"\n") for f in frames)
+
+        if self.mux:
+            self.outputs[0].broadcast(b"".join(
+                f.replace(b"$", tag) for f, tag in zip(frames, self.tags)
+            ))
+        else:
+            for out, f in zip(self.outputs, frames):
+                if out.clients:
+                    out.broadcast(f)
+
+    def report(self, elapsed, late):
+        clients = sum(len(o.clients) for o in self.outputs)
+        # contador do servidor (sobrevive à desconexão do cliente); o
+        # relatório mostra só as perdas desde o relatório anterior
+        total = sum(o.dropped for o in self.outputs)
+        dropped = total - self.dropped_reported
+        self.dropped_reported = total
+        backlog = max((o.max_backlog() for o in self.outputs), default=0)
+        print(f"[GARMIN G3X SIM] frota {self.fleet.n}: "
+              f"{self.sentences / elapsed:,.0f} sentenças/s, "
+              f"{clients} clientes, maior atraso de cliente {backlog / 1024:.1f} KB, "
+              f"épocas perdidas {dropped}, laço atrasado {late * 1000:.0f} ms")
+
+    async def serve(self, epochs=None):
+        loop = asyncio.get_running_loop()
+        for out in self.outputs:
+            await out.start()
+
+        where = (f"porta {self.outputs[0].port} (multiplexado)" if self.mux else
+                 f"portas {self.outputs[0].port}-{self.outputs[-1].port}")
+        print(f"[GARMIN G3X SIM] frota de {self.fleet.n} aeronaves em {where}")
+
+        deadline = loop.time()
+        window = loop.time()
+        late = 0.0
+
+        try:
+            while epochs is None or self.epochs < epochs:
+                self._tick()
+                self.epochs += 1
+                self.clock.advance()
+
+                now = loop.time()
+                if now - window >= self.report_every:
+                    self.report(now - window, late)
+                    self.sentences = 0
+                    window = now
+                    late = 0.0
+
+                deadline += self.clock.interval
+                late = max(late, now - deadline)
+                await asyncio.sleep(max(0.0, deadline - now))
+        finally:
+            for out in self.outputs:
+                out.stop()
 
-        alt_m = alt_ft * 0.3048
 
-        # NMEA padrão
-        yield gen_gprmc(lat, lon, speed_kts, course)
-        yield gen_gpgga(lat, lon, alt_m)
-        yield gen_gpvtg(course, speed_kts)
-        yield gen_gpgsa()
-        yield gen_gpgsv()
-
-        # Garmin proprietário
-        yield gen_pgrmf(lat, lon, speed_kmh, course)
-        yield gen_pgrme()
-        yield gen_pgrmh()
-        yield gen_pgrmv()
-        yield gen_pgrmz(alt_ft)
-        yield gen_pgrmm()
-
-        if int(time.time()) % 60 == 0:
-            yield gen_pgrmt()
+# =========================================================
+# SAÍDA SERIAL / PTY (ritmo da linha RS-232)
+#  - 8N1: 10 bits por byte -> baud / 10 bytes/s
+#  - "pty": cria um par pseudo-terminal local; o lado escravo
+#    (/dev/pts/N) é aberto pelo parser como se fosse o G3X
+#  - época maior que o enlace:
+#      "lag"      -> manda tudo e atrasa (aviso)
+#      "truncate" -> corta as últimas sentenças, como o G3X faz
+# =========================================================
 
-        time.sleep(1)
+class SerialLink:
+
+    def __init__(self, target="pty", baud=9600, overflow="lag", chunk=None):
+        if overflow not in ("lag", "truncate"):
+            raise ValueError(f"overflow inválido: {overflow}")
+
+        self.baud = baud
+        self.byte_time = 10.0 / baud
+        self.bytes_per_s = baud / 10.0
+        self.overflow = overflow
+        self.chunk = chunk or max(1, baud // 1000)     # ~10 ms por bloco
+
+        self.ser = None
+        self.fd = None
+        self.slave_fd = None
+        self.name = target
+
+        if target == "pty":
+            import tty      # só POSIX; TCP/UDP continuam funcionando no Windows
+            self.fd, self.slave_fd = os.openpty()
+            tty.setraw(self.slave_fd)
+            os.set_blocking(self.fd, False)
+            self.name = os.ttyname(self.slave_fd)
+        else:
+            import serial
+            self.ser = serial.Serial(target, baudrate=baud, write_timeout=2)
+
+        self._deadline = time.monotonic()
+        self.epochs = 0
+        self.over_budget = 0
+        self.dropped = 0
+
+    def _send(self, data: bytes):
+        if self.ser is not None:
+            self.ser.write(data)
+            return
+        try:
+            n = os.write(self.fd, data)
+        except BlockingIOError:
+            n = 0
+        # ninguém lendo o pty: o buffer do tty enche e os bytes se perdem
+        self.dropped += len(data) - n
+
+    def write(self, data: bytes):
+        """escreve no ritmo da linha (bloqueia o tempo de transmissão)"""
+        now = time.monotonic()
+        if self._deadline < now:
+            self._deadline = now
+
+        for i in range(0, len(data), self.chunk):
+            part = data[i:i + self.chunk]
+            self._send(part)
+            self._deadline += len(part) * self.byte_time
+            delay = self._deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+    def send_epoch(self, data: bytes, interval=1.0):
+        budget = int(self.bytes_per_s * interval) if interval > 0 else len(data)
+        self.epochs += 1
+
+        if len(data) > budget:
+            self.over_budget += 1
+            if self.over_budget == 1 or self.over_budget % 60 == 0:
+                print(f"[GARMIN G3X SIM] época de {len(data)} bytes excede o enlace "
+                      f"({budget} bytes/época a {self.baud} baud) "
+                      f"[{self.over_budget}/{self.epochs}]", file=sys.stderr)
+            if self.overflow == "truncate":
+                # só sentenças inteiras
+                data = data[:data.rfind(b"\n", 0, budget) + 1]
+
+        self.write(data)
+
+    def close(self):
+        if self.ser is not None:
+            self.ser.close()
+        for fd in (self.fd, self.slave_fd):
+            if fd is not None:
+                os.close(fd)
+
+
+def serial_out(link: SerialLink, clock=None, seed=None, route=None, epochs=None):
+    clock = clock or SimClock()
+    encoder = EpochEncoder(random.Random(seed), clock.now)
+    flight = Trajectory(route, repeat=True)
+
+    print(f"[GARMIN G3X SIM] Serial {link.name} @ {link.baud} baud "
+          f"({link.bytes_per_s:.0f} bytes/s)")
+    n = 0
+    try:
+        while epochs is None or n < epochs:
+            link.send_epoch(encoder.encode_sample(next(flight)), clock.interval)
+            clock.tick()
+            n += 1
+    finally:
+        link.close()
 
 
 # =========================================================
-# TCP SERVER
+# LOG EM ARQUIVO / PIPE
 # =========================================================
 
-def tcp_server(port=3100):
-    srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    srv.bind(("0.0.0.0", port))
-    srv.listen(1)
-
-    print(f"[GARMIN G3X SIM] TCP server ativo na porta {port}")
-
-    conn, addr = srv.accept()
-    print(f"[GARMIN G3X SIM] Cliente conectado: {addr}")
+def write_log(out, epochs, clock=None, seed=None, route=None) -> int:
+    """grava `epochs` épocas em out (caminho ou "-" p/ stdout); devolve bytes"""
+    clock = clock or SimClock(speed=0)
+    encoder = EpochEncoder(random.Random(seed), clock.now)
+    flight = Trajectory(route, repeat=True)
+    total = 0
 
+    f = sys.stdout.buffer if out == "-" else open(out, "wb", buffering=1 << 20)
     try:
-        for msg in generate_stream():
-            conn.sendall((msg + "\r\n").encode("ascii"))
-    except (BrokenPipeError, ConnectionResetError):
-        print("[GARMIN G3X SIM] Cliente desconectado")
+        for _ in range(epochs):
+            data = encoder.encode_sample(next(flight))
+            f.write(data)
+            total += len(data)
+            clock.tick()
     finally:
-        conn.close()
-        srv.close()
+        if f is sys.stdout.buffer:
+            f.flush()
+        else:
+            f.close()
+    return total
+
+
+def parse_duration(text: str) -> int:
+    """"3h", "90m", "45s" ou segundos -> segundos"""
+    units = {"h": 3600, "m": 60, "s": 1}
+    if text[-1:].lower() in units:
+        return int(float(text[:-1]) * units[text[-1].lower()])
+    return int(float(text))
+
+
+def parse_start(text: str) -> float:
+    """ISO 8601 (UTC se sem fuso) -> epoch"""
+    dt = datetime.fromisoformat(text)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
 
 
 # =========================================================
 # MAIN
 # =========================================================
 
+def main():
+    ap = argparse.ArgumentParser(description="Simulador NMEA Garmin G3X")
+    ap.add_argument("--port", type=int, default=3100)
+    ap.add_argument("--udp", metavar="HOST:PORT",
+                    help="também envia cada época por UDP (ex. 255.255.255.255:10110)")
+    ap.add_argument("--out", metavar="ARQ",
+                    help="grava em arquivo ('-' = stdout) em vez de servir TCP")
+    ap.add_argument("--duration", default="1h",
+                    help="duração simulada com --out (ex. 3h, 90m)")
+    ap.add_argument("--speed", type=float, default=None,
+                    help="1 = tempo real, N = N vezes, 0 = sem espera "
+                         "(padrão: 1 no servidor, 0 com --out)")
+    ap.add_argument("--start", help="início UTC do relógio simulado (ISO 8601)")
+    ap.add_argument("--seed", type=int, help="semente dos sorteios")
+    ap.add_argument("--gpx", help="rota a partir de um GPX (rtept/wpt/trkpt)")
+    ap.add_argument("--route", metavar="LAT,LON;...", help="rota por waypoints")
+    ap.add_argument("--elev", type=float,
+                    help="elevação (ft) de origem/destino sem <ele>")
+    ap.add_argument("--fleet", type=int, metavar="N",
+                    help="simula N aeronaves (portas --port .. --port+N-1)")
+    ap.add_argument("--mux", action="store_true",
+                    help="frota num único fluxo com tag block por aeronave")
+    ap.add_argument("--report", type=float, default=10.0,
+                    help="intervalo (s) do relatório de desempenho da frota")
+    ap.add_argument("--serial", metavar="DEV",
+                    help="saída serial (ex. /dev/ttyUSB0) ou 'pty' para um par local")
+    ap.add_argument("--baud", type=int, default=9600)
+    ap.add_argument("--overflow", choices=("lag", "truncate"), default="lag",
+                    help="época maior que o enlace: atrasa ou corta sentenças")
+    args = ap.parse_args()
+
+    speed = args.speed if args.speed is not None else (0 if args.out else 1)
+    start = parse_start(args.start) if args.start else None
+    clock = SimClock(start, speed)
+
+    route = None
+    if args.gpx:
+        route = load_gpx(args.gpx, elev_ft=args.elev)
+    elif args.route:
+        route = parse_route(args.route, args.elev)
+
+    if args.out:
+        epochs = parse_duration(args.duration)
+        t0 = time.perf_counter()
+        size = write_log(args.out, epochs, clock, args.seed, route)
+        dt = time.perf_counter() - t0
+        print(f"[GARMIN G3X SIM] {epochs} épocas, {size / 1e6:.1f} MB em {dt:.1f}s "
+              f"({size / 1e6 / dt:.1f} MB/s)", file=sys.stderr)
+        return
+
+    if args.serial:
+        serial_out(SerialLink(args.serial, args.baud, args.overflow),
+                   clock, args.seed, route)
+        return
+
+    if args.fleet:
+        asyncio.run(FleetServer(
+            args.fleet, args.port, mux=args.mux, clock=clock,
+            seed=args.seed, report_every=args.report,
+        ).serve())
+        return
+
+    udp_target = None
+    if args.udp:
+        host, port = args.udp.rsplit(":", 1)
+        udp_target = (host, int(port))
+
+    asyncio.run(
+        NmeaServer(args.port, udp_target=udp_target, clock=clock,
+                   seed=args.seed, route=route).serve()
+    )
+
+
 if __name__ == "__main__":
-    tcp_server(3100)
+    main()
@@ -0,0 +1,327 @@
+"""
+Perfil de voo para o simulador G3X
+
+Estado cinemático único (posição, velocidade, trilha, razão vertical)
+integrado a cada segundo, de modo que RMC/VTG, PGRMV e PGRMH saem
+coerentes entre si:
+
+  solo -> decolagem -> subida -> cruzeiro -> descida -> pouso -> parado
+
+A rota vem de uma lista de waypoints ou de um GPX (rtept, wpt ou
+trkpt). As amostras são calculadas em blocos de `chunk` segundos;
+por época sobra só tirar a próxima da fila.
+"""
+
+import os
+import sys
+import math
+import xml.etree.ElementTree as ET
+from collections import deque, namedtuple
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import gdl90_checkout  # noqa: F401
+
+from geoutils.geoutils import haversine, bearing, destination
+
+
+KT_TO_MS = 0.514444
+FPM_TO_MS = 0.00508
+M_TO_FT = 3.28084
+
+# uma amostra por segundo
+FlightSample = namedtuple("FlightSample", (
+    "lat", "lon", "alt_ft", "speed_kts", "course", "vs_fpm",
+    "agl_ft", "vnav_err_ft", "desired_track", "next_leg_course", "phase",
+))
+
+Waypoint = namedtuple("Waypoint", ("lat", "lon", "elev_ft"))
+
+
+# =========================================================
+# Geodésia (geoutils: esfera, distâncias em milhas náuticas)
+# =========================================================
+
+distance_nm = haversine
+bearing_deg = bearing
+
+
+def _turn(current, target, max_step):
+    """gira `current` em direção a `target` no máximo `max_step` graus"""
+    diff = (target - current + 540) % 360 - 180
+    if abs(diff) <= max_step:
+        return target % 360
+    return (current + math.copysign(max_step, diff)) % 360
+
+
+def _slew(current, target, max_step):
+    if target > current:
+        return min(target, current + max_step)
+    return max(target, current - max_step)
+
+
+# =========================================================
+# Rotas
+# =========================================================
+
+# circuito padrão partindo do ponto inicial antigo do gerador
+DEFAULT_ROUTE = [
+    Waypoint(-23.0000, -46.0000, 2500),
+    Waypoint(-22.7000, -45.6000, None),
+    Waypoint(-22.9000, -45.2000, None),
+    Waypoint(-23.0000, -46.0000, 2500),
+]
+
+
+def parse_route(text: str, elev_ft=None):
+    """"lat,lon;lat,lon;..." -> [Waypoint]"""
+    route = []
+    for item in text.split(";"):
+        lat, lon = (float(v) for v in item.split(",")[:2])
+        route.append(Waypoint(lat, lon, None))
+    return _with_field_elevation(route, elev_ft)
+
+
+def load_gpx(path: str, min_spacing_nm=0.5, elev_ft=None):
+    """
+    GPX -> [Waypoint]. Usa rtept; sem rota, wpt; sem waypoints, trkpt.
+    Pontos a menos de `min_spacing_nm` do anterior são descartados
+    (um track de 1 Hz vira poucos waypoints).
+    """
+    root = ET.parse(path).getroot()
+
+    def points(tag):
+        return [el for el in root.iter() if el.tag.rsplit("}", 1)[-1] == tag]
+
+    els = points("rtept") or points("wpt") or points("trkpt")
+
+    route = []
+    for el in els:
+        lat, lon = float(el.get("lat")), float(el.get("lon"))
+        ele = next((c.text for c in el if c.tag.rsplit("}", 1)[-1] == "ele"), None)
+        elev = float(ele) * M_TO_FT if ele else None
+
+        if route and distance_nm(route[-1].lat, route[-1].lon, lat, lon) < min_spacing_nm:
+            continue
+        route.append(Waypoint(lat, lon, elev))
+
+    if not route:
+        raise ValueError(f"GPX sem pontos: {path}")
+
+    # último ponto do arquivo é o destino, mesmo se perto do anterior
+    last = els[-1]
+    if (route[-1].lat, route[-1].lon) != (float(last.get("lat")), float(last.get("lon"))):
+        route[-1] = Waypoint(float(last.get("lat")), float(last.get("lon")), route[-1].elev_ft)
+
+    return _with_field_elevation(route, elev_ft)
+
+
+def _with_field_elevation(route, elev_ft):
+    """origem/destino sem elevação recebem elev_ft (ou 0)"""
+    route = list(route)
+    for i in (0, -1):
+        if route[i].elev_ft is None or elev_ft is not None:
+            route[i] = route[i]._replace(elev_ft=elev_ft or 0.0)
+    return route
+
+
+def local_flight(origin: Waypoint, leg_nm=15.0, heading=90.0):
+    """rota ida-e-volta a partir de um ponto só (ex.: GPX gravado no solo)"""
+    lat, lon = destination(origin.lat, origin.lon, heading, leg_nm)
+    return [origin, Waypoint(lat, lon, None), origin]
+
+
+# =========================================================
+# Trajetória
+# =========================================================
+
+class Trajectory:
+    """
+    Gera FlightSample a 1 Hz ao longo da rota.
+
+        traj = Trajectory(load_gpx("flight.gpx"))
+        for s in traj: ...
+
+    Depois do pouso a aeronave fica parada (repeat=False) ou refaz
+    a rota (repeat=True).
+    """
+
+    def __init__(self, route=None, cruise_alt_ft=6500, cruise_kts=120,
+                 climb_kts=80, approach_kts=85, rotate_kts=55,
+                 climb_fpm=700, descent_fpm=500, turn_rate=3.0,
+                 chunk=60, repeat=False, dt=1.0):
+        route = list(route or DEFAULT_ROUTE)
+        if len(route) < 2:
+            route = local_flight(route[0])
+        self.route = route
+
+        self.origin_ft = route[0].elev_ft or 0.0
+        self.dest_ft = route[-1].elev_ft or 0.0
+
+        # distância restante a partir de cada waypoint até o destino
+        self._remaining = [0.0] * len(route)
+        for i in range(len(route) - 2, -1, -1):
+            a, b = route[i], route[i + 1]
+            self._remaining[i] = self._remaining[i + 1] + distance_nm(a.lat, a.lon, b.lat, b.lon)
+
+        # rota curta: baixa o cruzeiro para caber subida + descida
+        # em 80% da distância (nm por pé de subida/descida: a, b)
+        a = climb_kts / 60.0 / climb_fpm
+        b = approach_kts / 60.0 / descent_fpm
+        fits = (0.8 * self._remaining[0] + self.origin_ft * a + self.dest_ft * b) / (a + b)
+        self.cruise_alt_ft = max(min(cruise_alt_ft, fits),
+                                 self.origin_ft + 1000, self.dest_ft + 1000)
+
+        self.cruise_kts = cruise_kts
+        self.climb_kts = climb_kts
+        self.approach_kts = approach_kts
+        self.rotate_kts = rotate_kts
+        self.climb_fpm = climb_fpm
+        self.descent_fpm = descent_fpm
+        self.turn_rate = turn_rate
+        self.chunk = chunk
+        self.repeat = repeat
+        self.dt = dt
+
+        self._queue = deque()
+        self.reset()
+
+    def reset(self):
+        a, b = self.route[0], self.route[1]
+        self.lat, self.lon = a.lat, a.lon
+        self.alt_ft = self.origin_ft
+        self.speed_kts = 0.0
+        self.course = bearing_deg(a.lat, a.lon, b.lat, b.lon)
+        self.vs_fpm = 0.0
+        self.phase = "ground"
+        self.leg = 1            # índice do waypoint alvo
+        self.overhead = False   # já passou pelo destino: pousa em frente
+        self.parked = 0
+
+    # ---------------- navegação ----------------
+
+    def _leg_course(self, i):
+        if i <= 0 or i >= len(self.route):
+            return None
+        a, b = self.route[i - 1], self.route[i]
+        return bearing_deg(a.lat, a.lon, b.lat, b.lon)
+
+    def _to_destination_nm(self):
+        wp = self.route[self.leg]
+        return distance_nm(self.lat, self.lon, wp.lat, wp.lon) + self._remaining[self.leg]
+
+    def _ground_ft(self):
+        # referência de AGL: campo de partida na primeira metade, destino depois
+        return self.origin_ft if self.phase in ("ground", "climb") else self.dest_ft
+
+    # ---------------- integração (1 passo) ----------------
+
+    def _step(self):
+        dt = self.dt
+        wp = self.route[self.leg]
+        dist_wp = distance_nm(self.lat, self.lon, wp.lat, wp.lon)
+        desired = bearing_deg(self.lat, self.lon, wp.lat, wp.lon)
+
+        # antecipa a curva: raio ~ v / (taxa de curva)
+        turn_radius_nm = self.speed_kts / 3600.0 / math.radians(self.turn_rate)
+        if dist_wp < max(0.2, turn_radius_nm) and self.phase != "ground":
+            if self.leg < len(self.route) - 1:
+                self.leg += 1
+                wp = self.route[self.leg]
+                desired = bearing_deg(self.lat, self.lon, wp.lat, wp.lon)
+            else:
+                self.overhead = True
+        if self.overhead:
+            desired = self.course
+
+        target_alt = self.cruise_alt_ft
+        phase = self.phase
+
+        if phase == "ground":
+            self.speed_kts = _slew(self.speed_kts, self.climb_kts, 3.0 * dt)
+            if self.speed_kts >= self.rotate_kts:
+                self.phase = "climb"
+
+        elif phase == "climb":
+            self.speed_kts = _slew(self.speed_kts, self.climb_kts, 1.0 * dt)
+            if self.alt_ft >= self.cruise_alt_ft - 50:
+                self.phase = "cruise"
+
+        elif phase == "cruise":
+            self.speed_kts = _slew(self.speed_kts, self.cruise_kts, 0.5 * dt)
+            # topo de descida: tempo para perder a altura x velocidade
+            minutes = (self.alt_ft - self.dest_ft) / self.descent_fpm
+            if self._to_destination_nm() <= minutes * self.speed_kts / 60.0 + 1.0:
+                self.phase = "descent"
+
+        elif phase == "descent":
+            self.speed_kts = _slew(self.speed_kts, self.approach_kts, 0.5 * dt)
+            target_alt = self.dest_ft
+            if self.alt_ft <= self.dest_ft:
+                self.alt_ft = self.dest_ft
+                self.vs_fpm = 0.0
+                self.phase = "rollout"
+
+        elif phase == "rollout":
+            self.speed_kts = _slew(self.speed_kts, 0.0, 3.0 * dt)
+            if self.speed_kts == 0.0:
+                self.phase = "parked"
+
+        elif phase == "parked":
+            self.parked += 1
+            if self.repeat and self.parked >= 60:
+                self.reset()
+                return
+
+        # vertical: razão proporcional ao erro, limitada e suavizada
+        if self.phase in ("climb", "cruise", "descent"):
+            if self.phase == "descent":
+                # rampa até o destino; mínimo 150 fpm para não "flutuar"
+                minutes = self._to_destination_nm() / max(self.speed_kts, 1.0) * 60.0
+                need = (self.alt_ft - self.dest_ft) / max(minutes, 0.1)
+                cmd = -min(max(need, 150.0), 1.5 * self.descent_fpm)
+            else:
+                cmd = max(-self.descent_fpm, min(self.climb_fpm, (target_alt - self.alt_ft) * 2.0))
+            self.vs_fpm = _slew(self.vs_fpm, cmd, 200.0 * dt)
+            self.alt_ft += self.vs_fpm / 60.0 * dt
+        else:
+            self.vs_fpm = 0.0
+
+        # lateral: curva padrão em direção ao waypoint (no solo segue a pista)
+        if self.phase in ("climb", "cruise", "descent"):
+            self.course = _turn(self.course, desired, self.turn_rate * dt)
+
+        if self.speed_kts > 0:
+            self.lat, self.lon = destination(self.lat, self.lon, self.course,
+                                             self.speed_kts * dt / 3600.0)
+
+    def _sample(self) -> FlightSample:
+        nav = self.phase in ("climb", "cruise", "descent")
+        vnav_target = self.dest_ft if self.phase == "descent" else self.cruise_alt_ft
+        desired = self._leg_course(self.leg)
+        next_leg = self._leg_course(self.leg + 1)
+        return FlightSample(
+            self.lat, self.lon, self.alt_ft, self.speed_kts, self.course,
+            self.vs_fpm, self.alt_ft - self._ground_ft(),
+            self.alt_ft - vnav_target if nav else 0.0,
+            desired if desired is not None else self.course,
+            next_leg if next_leg is not None else (desired or self.course),
+            self.phase,
+        )
+
+    # ---------------- blocos ----------------
+
+    def next_chunk(self, n=None):
+        """calcula as próximas n amostras de uma vez"""
+        out = []
+        for _ in range(n or self.chunk):
+            self._step()
+            out.append(self._sample())
+        return out
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> FlightSample:
+        if not self._queue:
+            self._queue.extend(self.next_chunk())
+        return self._queue.popleft()
@@ -0,0 +1,226 @@
+"""
+Garmin G3X NMEA - modo em lote (pós-voo)
+
+Lê um log inteiro via mmap, agrupa as sentenças por ID e decodifica
+cada grupo de uma vez, coluna a coluna, com NumPy. Usa as mesmas
+tabelas de campos do parser em tempo real (GarminG3xParser).
+
+Saída: uma tabela por tipo de sentença, em CSV, NPZ ou Parquet.
+
+  python3 GarminG3xBatch.py nmea.log -o saida --format npz
+
+Requer: numpy (Parquet: pyarrow)
+"""
+
+import argparse
+import csv
+import mmap
+import os
+import re
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from GarminG3xParser import DISPATCH
+
+
+# $<ID>,<campos>[*<cs>]
+SENTENCE_RE = re.compile(rb"\$([A-Z0-9]+),([^*\r\n$]*)(?:\*([0-9A-Fa-f]{2}))?")
+
+Columns = Dict[str, np.ndarray]
+
+
+# ============================================================
+# Leitura + agrupamento
+# ============================================================
+
+def _xor_checksums(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """XOR de buf[start:end] para cada sentença, num único reduceat"""
+    idx = np.empty(2 * len(starts), dtype=np.int64)
+    idx[0::2] = starts
+    idx[1::2] = ends
+    # o último índice não pode apontar para o fim do buffer
+    if len(idx) and idx[-1] >= len(buf):
+        buf = np.append(buf, np.uint8(0))
+    return np.bitwise_xor.reduceat(buf, idx)[0::2]
+
+
+def group_log(path: str, validate=True) -> Tuple[Dict[str, List[bytes]], int]:
+    """
+    Retorna ({sentence_id: [corpo, ...]}, n_checksum_invalido).
+    O corpo é tudo após "<ID>," e antes de "*".
+    """
+    groups: Dict[str, List[bytes]] = {}
+    bad = 0
+
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return groups, 0
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            matches = list(SENTENCE_RE.finditer(mm))
+
+            keep = None
+            if validate and matches:
+                starts = np.fromiter((m.start(1) for m in matches), np.int64, len(matches))
+                ends = np.fromiter((m.end(2) for m in matches), np.int64, len(matches))
+                calc = _xor_checksums(np.frombuffer(mm, dtype=np.uint8), starts, ends)
+                given = np.fromiter(
+                    (int(m.group(3), 16) if m.group(3) else -1 for m in matches),
+                    np.int64, len(matches)
+                )
+                # sem checksum -> aceito (mesma regra do parser)
+                keep = (given < 0) | (given == calc)
+                bad = int(len(matches) - keep.sum())
+                del calc
+
+            for k, m in enumerate(matches):
+                if keep is not None and not keep[k]:
+                    continue
+                sid = m.group(1).decode("ascii")
+                groups.setdefault(sid, []).append(m.group(2))
+
+            del matches
+
+    return groups, bad
+
+
+# ============================================================
+# Decodificação vetorizada por grupo
+# ============================================================
+
+def _column(rows: List[List[bytes]], i: int) -> np.ndarray:
+    """coluna i como array de bytes (campo ausente -> b'')"""
+    return np.array([r[i] if i < len(r) else b"" for r in rows], dtype="S")
+
+
+def _to_float(v: bytes) -> float:
+    try:
+        return float(v)
+    except ValueError:
+        return np.nan
+
+
+def _numeric(col: np.ndarray) -> np.ndarray:
+    col = np.where(col == b"", b"nan", col)
+    try:
+        return col.astype(np.float64)
+    except ValueError:
+        # lixo no campo: converte elemento a elemento (lento, raro)
+        return np.array([_to_float(v) for v in col], dtype=np.float64)
+
+
+def dm_to_deg(dm: np.ndarray, hemi: np.ndarray) -> np.ndarray:
+    """ddmm.mmmm / dddmm.mmmm -> graus decimais (vetorizado)"""
+    v = _numeric(dm)
+    deg = np.floor(v / 100.0)
+    val = deg + (v - deg * 100.0) / 60.0
+    return np.where((hemi == b"S") | (hemi == b"W"), -val, val)
+
+
+def decode_group(sid: str, bodies: List[bytes]) -> Columns:
+    entry = DISPATCH.get(sid)
+    if entry is None:
+        return {}
+    spec = entry[2]
+
+    rows = [b.split(b",") for b in bodies]
+    out: Columns = {}
+
+    for name, get in spec.items():
+        if get.kind == "coord":
+            i, j = get.index
+            out[name] = dm_to_deg(_column(rows, i), _column(rows, j))
+        elif get.kind == "flag":
+            out[name] = _column(rows, get.index) == get.conv.encode()
+        elif get.conv in (int, float):
+            out[name] = _numeric(_column(rows, get.index))
+        else:
+            out[name] = _column(rows, get.index).astype(str)
+
+    return out
+
+
+def parse_log_columnar(path: str, validate=True) -> Tuple[Dict[str, Columns], int]:
+    """
+    Retorna ({sentence_id: {coluna: ndarray}}, n_checksum_invalido).
+    Campos numéricos são float64 (NaN = vazio).
+    """
+    groups, bad = group_log(path, validate)
+    tables = {}
+    for sid, bodies in groups.items():
+        if sid not in DISPATCH:
+            continue
+        tables[sid] = decode_group(sid, bodies)
+    return tables, bad
+
+
+# ============================================================
+# Exportação
+# ============================================================
+
+def write_csv(tables: Dict[str, Columns], outdir: str):
+    os.makedirs(outdir, exist_ok=True)
+    for sid, cols in tables.items():
+        names = list(cols)
+        with open(os.path.join(outdir, f"{sid}.csv"), "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(names)
+            w.writerows(zip(*(cols[n].tolist() for n in names)))
+
+
+def write_npz(tables: Dict[str, Columns], outdir: str):
+    os.makedirs(outdir, exist_ok=True)
+    for sid, cols in tables.items():
+        np.savez_compressed(os.path.join(outdir, f"{sid}.npz"), **cols)
+
+
+def write_parquet(tables: Dict[str, Columns], outdir: str):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(outdir, exist_ok=True)
+    for sid, cols in tables.items():
+        pq.write_table(
+            pa.table({n: pa.array(c) for n, c in cols.items()}),
+            os.path.join(outdir, f"{sid}.parquet")
+        )
+
+
+WRITERS = {
+    "csv": write_csv,
+    "npz": write_npz,
+    "parquet": write_parquet,
+}
+
+
+# ============================================================
+# Main
+# ============================================================
+
+def main():
+    ap = argparse.ArgumentParser(description="G3X NMEA log -> tabelas por sentença")
+    ap.add_argument("log", help="arquivo de log NMEA")
+    ap.add_argument("-o", "--outdir", default="nmea_tables")
+    ap.add_argument("--format", choices=WRITERS, default="npz")
+    ap.add_argument("--no-checksum", action="store_true",
+                    help="não valida checksum")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    tables, bad = parse_log_columnar(args.log, validate=not args.no_checksum)
+    t1 = time.perf_counter()
+    WRITERS[args.format](tables, args.outdir)
+    t2 = time.perf_counter()
+
+    for sid, cols in sorted(tables.items()):
+        n = len(next(iter(cols.values()))) if cols else 0
+        print(f"{sid:<8} {n:>9} linhas")
+    if bad:
+        print(f"checksum inválido: {bad}")
+    print(f"parse {t1 - t0:.2f}s, escrita {t2 - t1:.2f}s -> {args.outdir}")
+
+
+if __name__ == "__main__":
+    main()
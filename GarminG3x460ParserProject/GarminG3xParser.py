@@ -1,7 +1,292 @@
 import re
 import socket
+import time
 import serial
-from typing import Dict, Any, Optional, Generator
+from typing import Dict, Any, Optional, Generator, Callable, List, Tuple
+
+
+# ============================================================
+# Conversão de campos
+#  - cada campo é um "getter" f(fields) -> valor
+#  - campo vazio, ausente ou ilegível -> None
+# ============================================================
+
+def dm_to_deg(dm: str, hemi: str) -> Optional[float]:
+    if not dm:
+        return None
+    deg = int(dm[:-7])
+    minutes = float(dm[-7:])
+    val = deg + minutes / 60.0
+    return -val if hemi in ("S", "W") else val
+
+
+def _field(i: int, conv: Optional[Callable[[str], Any]] = None):
+    if conv is None:
+        def get(f):
+            return f[i] if i < len(f) else None
+    else:
+        def get(f):
+            if i >= len(f) or not f[i]:
+                return None
+            try:
+                return conv(f[i])
+            except ValueError:
+                # decodificação preguiçosa: o erro apareceria longe do parse()
+                return None
+    # metadados usados pelo modo em lote (GarminG3xBatch)
+    get.kind, get.index, get.conv = "field", i, conv
+    return get
+
+
+def _coord(i: int, j: int):
+    def get(f):
+        if j >= len(f):
+            return None
+        try:
+            return dm_to_deg(f[i], f[j])
+        except ValueError:
+            return None
+    get.kind, get.index, get.conv = "coord", (i, j), None
+    return get
+
+
+def _flag(i: int, value: str):
+    def get(f):
+        return i < len(f) and f[i] == value
+    get.kind, get.index, get.conv = "flag", i, value
+    return get
+
+
+def _or_none(v: str) -> Optional[str]:
+    return v or None
+
+
+# ============================================================
+# Tabelas de campos por sentença
+# ============================================================
+
+# Garmin Proprietary (190-00684-00 Rev. C)
+GARMIN_FIELDS: Dict[str, Dict[str, Callable]] = {
+    "PGRME": {
+        "hpe_m": _field(0, float),
+        "vpe_m": _field(2, float),
+        "epe_m": _field(4, float),
+    },
+    "PGRMF": {
+        "gps_week": _field(0, int),
+        "gps_seconds": _field(1, int),
+        "utc_date": _field(2),
+        "utc_time": _field(3),
+        "leap_seconds": _field(4, int),
+        "lat": _coord(5, 6),
+        "lon": _coord(7, 8),
+        "mode": _field(9),
+        "fix_type": _field(10, int),
+        "speed_kmh": _field(11, float),
+        "course_deg": _field(12, float),
+        "pdop": _field(13, int),
+        "tdop": _field(14, int),
+    },
+    "PGRMH": {
+        "valid": _flag(0, "A"),
+        "vertical_speed_fpm": _field(1, int),
+        "vnav_error_ft": _field(2, int),
+        "vnav_vs_fpm": _field(3, int),
+        "next_wp_vs_fpm": _field(4, int),
+        "terrain_ft": _field(5, int),
+        "desired_track_deg": _field(6, float),
+        "next_leg_course_deg": _field(7, float),
+    },
+    "PGRMM": {
+        "map_datum": _field(0),
+    },
+    "PGRMT": {
+        "product": _field(0),
+        "rom_test": _field(1),
+        "receiver_failure": _field(2),
+        "stored_data": _field(3),
+        "rtc": _field(4),
+        "oscillator": _field(5),
+        "collecting": _field(6, _or_none),
+        "temperature_c": _field(7, float),
+        "config_data": _field(8),
+    },
+    "PGRMV": {
+        "vel_e_mps": _field(0, float),
+        "vel_n_mps": _field(1, float),
+        "vel_up_mps": _field(2, float),
+    },
+    "PGRMZ": {
+        "altitude_ft": _field(0, int),
+        "fix_type": _field(2, int),
+    },
+    "PGRMB": {
+        "beacon_freq_khz": _field(0, float),
+        "bitrate_bps": _field(1, int),
+        "snr": _field(2, int),
+        "quality": _field(3, int),
+        "distance_km": _field(4, float),
+        "receiver_status": _field(6, int),
+        "dgps_source": _field(7),
+        "dgps_mode": _field(8),
+    },
+}
+
+# NMEA 0183 padrão
+STANDARD_FIELDS: Dict[str, Dict[str, Callable]] = {
+    "RMC": {
+        "utc_time": _field(0),
+        "status": _field(1),
+        "lat": _coord(2, 3),
+        "lon": _coord(4, 5),
+        "speed_knots": _field(6, float),
+        "course_deg": _field(7, float),
+        "date": _field(8),
+    },
+    "GGA": {
+        "utc_time": _field(0),
+        "lat": _coord(1, 2),
+        "lon": _coord(3, 4),
+        "fix_quality": _field(5, int),
+        "satellites": _field(6, int),
+        "hdop": _field(7, float),
+        "altitude_m": _field(8, float),
+    },
+    "VTG": {
+        "course_true": _field(0, float),
+        "speed_knots": _field(4, float),
+        "speed_kmh": _field(6, float),
+    },
+    "GSA": {
+        "mode": _field(0),
+        "fix_type": _field(1, int),
+        "pdop": _field(14, float),
+        "hdop": _field(15, float),
+        "vdop": _field(16, float),
+    },
+    "GSV": {
+        "total_msgs": _field(0, int),
+        "msg_num": _field(1, int),
+        "sats_in_view": _field(2, int),
+    },
+    "GLL": {
+        "lat": _coord(0, 1),
+        "lon": _coord(2, 3),
+        "utc_time": _field(4),
+        "status": _field(5),
+    },
+}
+
+TALKERS = ("GP", "GN", "GL")
+
+# sentence id -> (protocol, talker, tabela de campos)
+DISPATCH: Dict[str, Tuple[str, Optional[str], Dict[str, Callable]]] = {
+    sid: ("garmin", None, spec) for sid, spec in GARMIN_FIELDS.items()
+}
+DISPATCH.update({
+    talker + msg: ("nmea0183", talker, spec)
+    for talker in TALKERS
+    for msg, spec in STANDARD_FIELDS.items()
+})
+
+_NO_FIELDS: Dict[str, Callable] = {}
+
+
+# ============================================================
+# Registro leve com decodificação preguiçosa
+# ============================================================
+
+class NMEARecord:
+    """
+    Uma sentença decodificada. Só o id da sentença é extraído na hora;
+    os campos são separados e convertidos no primeiro acesso e ficam em
+    cache, então msg.lat num RMC não toca nos outros campos. O checksum
+    também é calculado uma vez só, no primeiro acesso.
+
+    Também se lê como o dict antigo: msg["lat"], msg.get(),
+    msg.to_dict().
+    """
+
+    __slots__ = (
+        "raw", "sentence", "protocol", "talker",
+        "_rest", "_body", "_cs", "_ok", "_spec", "_fields", "_cache",
+    )
+
+    BASE_KEYS = ("raw", "sentence", "checksum_ok", "protocol", "talker")
+
+    def __init__(self, raw, sentence, protocol, talker, rest, body, cs, spec):
+        self.raw = raw
+        self.sentence = sentence
+        self.protocol = protocol
+        self.talker = talker
+        self._rest = rest
+        self._body = body
+        self._cs = cs
+        self._ok = None
+        self._spec = spec
+        self._fields = None
+        self._cache = None
+
+    @property
+    def fields(self) -> List[str]:
+        if self._fields is None:
+            self._fields = self._rest.split(",") if self._rest is not None else []
+        return self._fields
+
+    @property
+    def checksum_ok(self) -> bool:
+        ok = self._ok
+        if ok is None:
+            ok = self._ok = (not self._cs
+                             or int(self._cs, 16) == NMEAParser.calc_checksum(self._body))
+        return ok
+
+    def __getattr__(self, name):
+        # só chamado para nomes que não são slots/propriedades
+        get = self._spec.get(name)
+        if get is None:
+            raise AttributeError(name)
+        cache = self._cache
+        if cache is None:
+            cache = self._cache = {}
+        elif name in cache:
+            return cache[name]
+        value = cache[name] = get(self.fields)
+        return value
+
+    # ---------------- compat. com a saída em dict ----------------
+
+    def keys(self):
+        keys = ["raw", "sentence", "checksum_ok", "protocol"]
+        if self.talker is not None:
+            keys.append("talker")
+        keys.extend(self._spec)
+        return keys
+
+    def __getitem__(self, key):
+        if key in self._spec or key in self.BASE_KEYS:
+            value = getattr(self, key)
+            if key == "talker" and value is None:
+                raise KeyError(key)
+            return value
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self._spec or (
+            key in self.BASE_KEYS and (key != "talker" or self.talker is not None)
+        )
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: self[k] for k in self.keys()}
+
+    def __repr__(self):
+        return f"NMEARecord({self.sentence}, {self.raw!r})"
 
 
 # ============================================================
@@ -26,211 +311,257 @@ class NMEAParser:
         return c
 
     def checksum_ok(self, sentence: str) -> bool:
-        m = self.nmea_re.match(sentence.strip())
-        if not m or not m.group("cs"):
-            return True
-        return int(m.group("cs"), 16) == self.calc_checksum(m.group("body"))
+        """mesma verificação do NMEARecord; sentença não reconhecida -> True"""
+        msg = self.parse(sentence)
+        return msg is None or msg.checksum_ok
 
-    @staticmethod
-    def dm_to_deg(dm: str, hemi: str) -> Optional[float]:
-        if not dm:
-            return None
-        deg = int(dm[:-7])
-        minutes = float(dm[-7:])
-        val = deg + minutes / 60.0
-        return -val if hemi in ("S", "W") else val
+    dm_to_deg = staticmethod(dm_to_deg)
 
     # --------------------------------------------------------
-    # Dispatcher principal
+    # Dispatcher principal: 1 regex + 1 lookup por sentença
     # --------------------------------------------------------
 
-    def parse(self, sentence: str) -> Optional[Dict[str, Any]]:
+    def parse(self, sentence: str) -> Optional[NMEARecord]:
         sentence = sentence.strip()
         m = self.nmea_re.match(sentence)
         if not m:
             return None
 
-        body = m.group("body")
-        fields = body.split(",")
-        sid = fields[0]
+        body, cs = m.group("body", "cs")
+        sid, sep, rest = body.partition(",")
+
+        entry = DISPATCH.get(sid)
+        if entry is None:
+            # sentença sem tabela: mantém só o cabeçalho
+            if sid.startswith("PGRM"):
+                entry = ("garmin", None, _NO_FIELDS)
+            elif sid[:2] in TALKERS:
+                entry = ("nmea0183", sid[:2], _NO_FIELDS)
+            else:
+                return None
+
+        protocol, talker, spec = entry
+        return NMEARecord(
+            sentence, sid, protocol, talker,
+            rest if sep else None, body, cs, spec,
+        )
+
+    # --------------------------------------------------------
+    # Decodificação completa (eager), p/ compatibilidade
+    # --------------------------------------------------------
 
-        base = {
-            "raw": sentence,
-            "sentence": sid,
-            "checksum_ok": self.checksum_ok(sentence),
-        }
+    def parse_garmin(self, sid: str, f) -> Dict[str, Any]:
+        spec = GARMIN_FIELDS.get(sid, _NO_FIELDS)
+        return {name: get(f) for name, get in spec.items()}
 
-        # Garmin Proprietary
-        if sid.startswith("PGRM"):
-            base["protocol"] = "garmin"
-            base.update(self.parse_garmin(sid, fields[1:]))
-            return base
+    def parse_standard(self, msg: str, f) -> Dict[str, Any]:
+        spec = STANDARD_FIELDS.get(msg, _NO_FIELDS)
+        return {name: get(f) for name, get in spec.items()}
 
-        # NMEA padrão
-        talker = sid[:2]
-        msg = sid[2:]
 
-        if talker in ("GP", "GN", "GL"):
-            base["protocol"] = "nmea0183"
-            base["talker"] = talker
-            base.update(self.parse_standard(msg, fields[1:]))
-            return base
+# ============================================================
+# Fusão por época (1 fix por segundo)
+#  - RMC / GGA / PGRMF trazem a hora UTC e abrem/identificam a época
+#  - as demais sentenças entram na época corrente
+#  - emite quando todas as sentenças de EPOCH_SENTENCES chegaram,
+#    quando começa outra época ou após `timeout` segundos
+# ============================================================
 
+# tipo (sem talker) -> ((campo do registro, slot do FusedFix), ...)
+# ordem do generate_stream: o primeiro valor não-nulo vence
+FUSION_MAP: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "RMC": (("utc_time", "utc_time"), ("date", "date"),
+            ("lat", "lat"), ("lon", "lon"),
+            ("speed_knots", "speed_kts"), ("course_deg", "course_deg")),
+    "GGA": (("utc_time", "utc_time"), ("lat", "lat"), ("lon", "lon"),
+            ("fix_quality", "fix_quality"), ("satellites", "satellites"),
+            ("hdop", "hdop"), ("altitude_m", "alt_m")),
+    "VTG": (("course_true", "course_deg"), ("speed_knots", "speed_kts")),
+    "GSA": (("fix_type", "fix_type"), ("pdop", "pdop"),
+            ("hdop", "hdop"), ("vdop", "vdop")),
+    "GSV": (("sats_in_view", "sats_in_view"),),
+    "GLL": (("utc_time", "utc_time"), ("lat", "lat"), ("lon", "lon")),
+    "PGRMF": (("utc_time", "utc_time"), ("utc_date", "date"),
+              ("lat", "lat"), ("lon", "lon"),
+              ("gps_week", "gps_week"), ("gps_seconds", "gps_seconds")),
+    "PGRME": (("hpe_m", "hpe_m"), ("vpe_m", "vpe_m"), ("epe_m", "epe_m")),
+    "PGRMH": (("vertical_speed_fpm", "vs_fpm"),),
+    "PGRMV": (("vel_e_mps", "vel_e_mps"), ("vel_n_mps", "vel_n_mps"),
+              ("vel_up_mps", "vel_up_mps")),
+    "PGRMZ": (("altitude_ft", "alt_ft"), ("fix_type", "fix_type")),
+}
+
+TIMED_SENTENCES = frozenset(("RMC", "GGA", "PGRMF", "GLL"))
+
+# o que o G3X (e o generate_stream) manda todo segundo
+EPOCH_SENTENCES = frozenset((
+    "RMC", "GGA", "VTG", "GSA",
+    "PGRMF", "PGRME", "PGRMH", "PGRMV", "PGRMZ",
+))
+
+
+def _utc_seconds(t: str) -> Optional[float]:
+    """hhmmss[.ss] -> segundos do dia"""
+    try:
+        return int(t[0:2]) * 3600 + int(t[2:4]) * 60 + float(t[4:])
+    except (ValueError, IndexError):
         return None
 
-    # ========================================================
-    # Garmin Proprietary (190-00684-00 Rev. C)
-    # ========================================================
-
-    def parse_garmin(self, sid: str, f):
-        handlers = {
-            "PGRME": self.pgrme,
-            "PGRMF": self.pgrmf,
-            "PGRMH": self.pgrmh,
-            "PGRMM": self.pgrmm,
-            "PGRMT": self.pgrmt,
-            "PGRMV": self.pgrmv,
-            "PGRMZ": self.pgrmz,
-            "PGRMB": self.pgrmb,
-        }
-        return handlers.get(sid, lambda _: {})(f)
-
-    def pgrme(self, f):
-        return {"hpe_m": float(f[0]), "vpe_m": float(f[2]), "epe_m": float(f[4])}
-
-    def pgrmf(self, f):
-        return {
-            "gps_week": int(f[0]),
-            "gps_seconds": int(f[1]),
-            "utc_date": f[2],
-            "utc_time": f[3],
-            "leap_seconds": int(f[4]),
-            "lat": self.dm_to_deg(f[5], f[6]),
-            "lon": self.dm_to_deg(f[7], f[8]),
-            "mode": f[9],
-            "fix_type": int(f[10]),
-            "speed_kmh": float(f[11]),
-            "course_deg": float(f[12]),
-            "pdop": int(f[13]),
-            "tdop": int(f[14]),
-        }
-
-    def pgrmh(self, f):
-        return {
-            "valid": f[0] == "A",
-            "vertical_speed_fpm": int(f[1]),
-            "vnav_error_ft": int(f[2]),
-            "vnav_vs_fpm": int(f[3]),
-            "next_wp_vs_fpm": int(f[4]),
-            "terrain_ft": int(f[5]),
-            "desired_track_deg": float(f[6]),
-            "next_leg_course_deg": float(f[7]),
-        }
-
-    def pgrmm(self, f):
-        return {"map_datum": f[0]}
-
-    def pgrmt(self, f):
-        return {
-            "product": f[0],
-            "rom_test": f[1],
-            "receiver_failure": f[2],
-            "stored_data": f[3],
-            "rtc": f[4],
-            "oscillator": f[5],
-            "collecting": f[6] or None,
-            "temperature_c": float(f[7]),
-            "config_data": f[8],
-        }
-
-    def pgrmv(self, f):
-        return {
-            "vel_e_mps": float(f[0]),
-            "vel_n_mps": float(f[1]),
-            "vel_up_mps": float(f[2]),
-        }
-
-    def pgrmz(self, f):
-        return {"altitude_ft": int(f[0]), "fix_type": int(f[2])}
-
-    def pgrmb(self, f):
-        return {
-            "beacon_freq_khz": float(f[0]),
-            "bitrate_bps": int(f[1]),
-            "snr": int(f[2]),
-            "quality": int(f[3]),
-            "distance_km": float(f[4]),
-            "receiver_status": int(f[6]),
-            "dgps_source": f[7],
-            "dgps_mode": f[8],
-        }
-
-    # ========================================================
-    # NMEA 0183 padrão
-    # ========================================================
-
-    def parse_standard(self, msg: str, f):
-        return {
-            "RMC": self.rmc,
-            "GGA": self.gga,
-            "VTG": self.vtg,
-            "GSA": self.gsa,
-            "GSV": self.gsv,
-            "GLL": self.gll,
-        }.get(msg, lambda _: {})(f)
-
-    def rmc(self, f):
-        return {
-            "utc_time": f[0],
-            "status": f[1],
-            "lat": self.dm_to_deg(f[2], f[3]),
-            "lon": self.dm_to_deg(f[4], f[5]),
-            "speed_knots": float(f[6]) if f[6] else None,
-            "course_deg": float(f[7]) if f[7] else None,
-            "date": f[8],
-        }
-
-    def gga(self, f):
-        return {
-            "utc_time": f[0],
-            "lat": self.dm_to_deg(f[1], f[2]),
-            "lon": self.dm_to_deg(f[3], f[4]),
-            "fix_quality": int(f[5]) if f[5] else None,
-            "satellites": int(f[6]) if f[6] else None,
-            "hdop": float(f[7]) if f[7] else None,
-            "altitude_m": float(f[8]) if f[8] else None,
-        }
-
-    def vtg(self, f):
-        return {
-            "course_true": float(f[0]) if f[0] else None,
-            "speed_knots": float(f[4]) if f[4] else None,
-            "speed_kmh": float(f[6]) if f[6] else None,
-        }
-
-    def gsa(self, f):
-        return {
-            "mode": f[0],
-            "fix_type": int(f[1]) if f[1] else None,
-            "pdop": float(f[14]) if len(f) > 14 and f[14] else None,
-            "hdop": float(f[15]) if len(f) > 15 and f[15] else None,
-            "vdop": float(f[16]) if len(f) > 16 and f[16] else None,
-        }
-
-    def gsv(self, f):
-        return {
-            "total_msgs": int(f[0]),
-            "msg_num": int(f[1]),
-            "sats_in_view": int(f[2]),
-        }
-
-    def gll(self, f):
-        return {
-            "lat": self.dm_to_deg(f[0], f[1]),
-            "lon": self.dm_to_deg(f[2], f[3]),
-            "utc_time": f[4],
-            "status": f[5],
-        }
+
+class FusedFix:
+    """Um fix completo por época, montado a partir de várias sentenças."""
+
+    __slots__ = (
+        "utc_time", "date", "lat", "lon", "alt_m", "alt_ft",
+        "speed_kts", "course_deg", "fix_quality", "fix_type",
+        "satellites", "sats_in_view", "hdop", "pdop", "vdop",
+        "hpe_m", "vpe_m", "epe_m",
+        "vel_e_mps", "vel_n_mps", "vel_up_mps", "vs_fpm",
+        "gps_week", "gps_seconds",
+        "seen", "complete",
+    )
+
+    FIELDS = __slots__[:-2]
+
+    def __init__(self):
+        for name in self.FIELDS:
+            setattr(self, name, None)
+        self.seen = set()
+        self.complete = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = {name: getattr(self, name) for name in self.FIELDS}
+        d["seen"] = sorted(self.seen)
+        d["complete"] = self.complete
+        return d
+
+    def __repr__(self):
+        return f"FusedFix({self.utc_time}, {self.lat}, {self.lon}, seen={len(self.seen)})"
+
+
+class EpochFuser:
+    """
+    Recebe NMEARecord na ordem de chegada e devolve FusedFix.
+
+        fuser = EpochFuser()
+        for msg in records:
+            for fix in fuser.feed(msg):
+                ...
+        fuser.flush()
+
+    Um segundo do relógio pode virar entre o RMC e o PGRMF da mesma
+    rajada; por isso uma hora diferente só abre nova época se esse
+    tipo de sentença já apareceu na época corrente ou se a diferença
+    passa de `max_skew` segundos.
+
+    Sentenças com checksum errado são descartadas (bad_checksum); campo
+    ilegível numa sentença íntegra entra como None.
+    """
+
+    def __init__(self, required=EPOCH_SENTENCES, timeout: float = 1.5,
+                 max_skew: float = 1.0, clock=time.monotonic):
+        self.required = frozenset(required)
+        self.timeout = timeout
+        self.max_skew = max_skew
+        self.clock = clock
+
+        self._fix: Optional[FusedFix] = None
+        self._secs: Optional[float] = None
+        self._opened = 0.0
+
+        self.emitted = 0
+        self.incomplete = 0
+        self.bad_checksum = 0
+
+    # --------------------------------------------------------
+
+    def _new_epoch(self, out: List[FusedFix]):
+        self._close(out)
+        self._fix = FusedFix()
+        self._secs = None
+        self._opened = self.clock()
+
+    def _close(self, out: List[FusedFix]):
+        fix = self._fix
+        if fix is not None and fix.seen:
+            if not fix.complete:
+                self.incomplete += 1
+            self.emitted += 1
+            out.append(fix)
+        self._fix = None
+        self._secs = None
+
+    def _is_new_epoch(self, kind: str, secs: Optional[float]) -> bool:
+        fix = self._fix
+        if fix is None:
+            return True
+        if kind in fix.seen and kind != "GSV":
+            return True
+        if secs is None or self._secs is None:
+            return False
+        diff = abs(secs - self._secs)
+        diff = min(diff, 86400 - diff)      # virada da meia-noite
+        return diff > self.max_skew
+
+    # --------------------------------------------------------
+
+    def feed(self, msg: NMEARecord) -> List[FusedFix]:
+        out: List[FusedFix] = []
+        self.poll(out)
+
+        if not msg.checksum_ok:
+            self.bad_checksum += 1
+            return out
+
+        sid = msg.sentence
+        kind = sid if msg.talker is None else sid[2:]
+        mapping = FUSION_MAP.get(kind)
+        if mapping is None:
+            return out
+
+        secs = None
+        if kind in TIMED_SENTENCES:
+            t = msg.utc_time
+            secs = _utc_seconds(t) if t else None
+
+        if self._is_new_epoch(kind, secs):
+            self._new_epoch(out)
+
+        fix = self._fix
+        for attr, slot in mapping:
+            if getattr(fix, slot) is None:
+                setattr(fix, slot, getattr(msg, attr))
+        fix.seen.add(kind)
+        if self._secs is None and secs is not None:
+            self._secs = secs
+
+        if self.required <= fix.seen:
+            fix.complete = True
+            self._close(out)
+
+        return out
+
+    def poll(self, out: Optional[List[FusedFix]] = None) -> List[FusedFix]:
+        """emite a época corrente se passou do timeout"""
+        if out is None:
+            out = []
+        if self._fix is not None and self.clock() - self._opened >= self.timeout:
+            self._close(out)
+        return out
+
+    def flush(self) -> List[FusedFix]:
+        out: List[FusedFix] = []
+        self._close(out)
+        return out
+
+
+def fuse(records, fuser: Optional[EpochFuser] = None) -> Generator[FusedFix, None, None]:
+    """NMEARecord -> FusedFix (um por época)"""
+    fuser = fuser or EpochFuser()
+    for msg in records:
+        if msg is not None:
+            yield from fuser.feed(msg)
+    yield from fuser.flush()
 
 
 # ============================================================
@@ -265,23 +596,30 @@ def source_log(path: str) -> Generator[str, None, None]:
 # Main
 # ============================================================
 
-def run(source: Generator[str, None, None]):
+def run(source: Generator[str, None, None], fused: bool = False):
     parser = NMEAParser()
+
+    if fused:
+        for fix in fuse(parser.parse(line) for line in source):
+            print(fix.to_dict())
+        return
+
     for line in source:
         msg = parser.parse(line)
         if msg:
-            print(msg)
+            print(msg.to_dict())
 
 
 if __name__ == "__main__":
 
     MODE = "tcp"      # tcp | serial | log
+    FUSED = False     # True: 1 fix por época em vez de 1 dict por sentença
 
     if MODE == "tcp":
-        run(source_tcp("127.0.0.1", 3100))
+        run(source_tcp("127.0.0.1", 3100), FUSED)
 
     elif MODE == "serial":
-        run(source_serial("/dev/ttyUSB0", 9600))
+        run(source_serial("/dev/ttyUSB0", 9600), FUSED)
 
     elif MODE == "log":
-        run(source_log("nmea.log"))
+        run(source_log("nmea.log"), FUSED)
@@ -0,0 +1,81 @@
+"""
+Test fusing of NMEA sentences into one fix per epoch.
+"""
+
+import unittest
+
+from GarminG3xParser import NMEAParser, EpochFuser, fuse
+
+
+def sentence(body, checksum=None):
+    if checksum is None:
+        checksum = NMEAParser.calc_checksum(body)
+    return f"${body}*{checksum:02X}"
+
+
+# one G3X epoch (12:35:19 UTC), in the order the unit sends it
+EPOCH = [
+    "GPRMC,123519,A,2230.0000,S,04630.0000,W,100.0,045.0,010126",
+    "GPGGA,123519,2230.0000,S,04630.0000,W,1,08,0.9,762.0,M",
+    "GPVTG,045.0,T,,M,100.0,N,185.2,K",
+    "GPGSA,A,3,01,02,03,04,05,06,07,08,,,,,1.8,0.9,1.5",
+    "PGRMF,2400,311719,010126,123519,18,2230.0000,S,04630.0000,W,A,2,185,45,2,1",
+    "PGRME,5.0,M,7.5,M,9.0,M",
+    "PGRMH,A,500,0,0,0,,45.0,90.0",
+    "PGRMV,36.4,36.4,2.5",
+    "PGRMZ,2500,f,3",
+]
+
+
+class FuserChecks(unittest.TestCase):
+    """Test that damaged sentences do not break or poison an epoch"""
+
+    def _fuse(self, lines):
+        parser = NMEAParser()
+        fuser = EpochFuser(clock=lambda: 0.0)
+        fixes = list(fuse((parser.parse(line) for line in lines), fuser))
+        return fixes, fuser
+
+    def test_clean_epoch(self):
+        fixes, fuser = self._fuse([sentence(s) for s in EPOCH])
+        self.assertEqual(len(fixes), 1)
+        fix = fixes[0]
+        self.assertTrue(fix.complete)
+        self.assertAlmostEqual(fix.lat, -22.5, places=9)
+        self.assertAlmostEqual(fix.alt_m, 762.0, places=9)
+        self.assertEqual(fuser.bad_checksum, 0)
+
+    def test_bad_checksum_in_the_middle(self):
+        # GGA altitude hit by line noise: the checksum no longer matches
+        lines = [sentence(s) for s in EPOCH]
+        good = NMEAParser.calc_checksum(EPOCH[1])
+        lines[1] = sentence(EPOCH[1].replace("762.0", "7X2.0"), good)
+
+        fixes, fuser = self._fuse(lines)
+        self.assertEqual(len(fixes), 1)
+        fix = fixes[0]
+        self.assertFalse(fix.complete)
+        self.assertNotIn("GGA", fix.seen)
+        self.assertIsNone(fix.alt_m)
+        self.assertIsNone(fix.satellites)
+        self.assertAlmostEqual(fix.lat, -22.5, places=9)
+        self.assertEqual(fix.alt_ft, 2500)
+        self.assertEqual(fuser.bad_checksum, 1)
+
+    def test_unreadable_field_with_good_checksum(self):
+        # RMC latitude truncated by the sender: the field is missing, the
+        # rest of the epoch still fuses and GGA fills the latitude in
+        lines = [sentence(s) for s in EPOCH]
+        lines[0] = sentence(EPOCH[0].replace("2230.0000", "22"))
+
+        fixes, fuser = self._fuse(lines)
+        self.assertEqual(len(fixes), 1)
+        fix = fixes[0]
+        self.assertTrue(fix.complete)
+        self.assertAlmostEqual(fix.lat, -22.5, places=9)
+        self.assertAlmostEqual(fix.speed_kts, 100.0, places=9)
+        self.assertEqual(fuser.bad_checksum, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
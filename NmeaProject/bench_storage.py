@@ -0,0 +1,123 @@
+"""
+Ingest throughput benchmark for the storage backends
+
+Runs the same pipeline as main.py (parse + save_raw/save_parsed/
+save_ais + latest state) over a synthetic GNSS/AIS stream, without
+the network/serial source, and reports sentences per second.
+
+  python3 bench_storage.py                  # sqlite + parquet
+  python3 bench_storage.py -n 200000 --postgres
+
+Run it on the target box (e.g. Raspberry Pi) to size the backend;
+--postgres writes into the database from config.DB_CONFIG.
+"""
+
+import argparse
+import os
+import platform
+import shutil
+import tempfile
+import time
+
+from nmea_parser import parse_nmea
+from ais_decoder import decode_ais
+from latest_state import LatestStateWriter
+
+
+def _nmea(body: str, start="$") -> str:
+    c = 0
+    for ch in body:
+        c ^= ord(ch)
+    return f"{start}{body}*{c:02X}"
+
+
+SAMPLE = [
+    _nmea("GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,"),
+    _nmea("GPRMC,123519,A,4807.038,N,01131.000,E,022.4,084.4,230394,003.1,W"),
+    _nmea("GPVTG,054.7,T,034.4,M,005.5,N,010.2,K"),
+    _nmea("GPGSA,A,3,04,05,,09,12,,,24,,,,,2.5,1.3,2.1"),
+    _nmea("AIVDM,1,1,,A,13aEOK?P00PD2wVMdLDRhgvL289?,0", "!"),
+]
+
+
+def run_backend(storage, count, chunk=10) -> float:
+    latest = LatestStateWriter(storage)
+
+    t0 = time.perf_counter()
+    for i in range(count):
+        sentence = SAMPLE[i % len(SAMPLE)]
+        raw_id = storage.save_raw(sentence)
+
+        if sentence.startswith("!"):
+            ais = decode_ais(sentence)
+            if ais:
+                storage.save_ais(raw_id, ais)
+                latest.update_ais(raw_id, ais)
+        else:
+            parsed = parse_nmea(sentence)
+            storage.save_parsed(raw_id, parsed)
+            latest.update_gnss(raw_id, parsed)
+
+        # main.py commits once per received chunk
+        if i % chunk == chunk - 1:
+            latest.maybe_flush()
+            storage.commit()
+
+    latest.flush()
+    storage.close()
+    return count / (time.perf_counter() - t0)
+
+
+def parse_only(count) -> float:
+    t0 = time.perf_counter()
+    for i in range(count):
+        sentence = SAMPLE[i % len(SAMPLE)]
+        if sentence.startswith("!"):
+            decode_ais(sentence)
+        else:
+            parse_nmea(sentence)
+    return count / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="NMEA storage ingest benchmark")
+    ap.add_argument("-n", "--count", type=int, default=100000)
+    ap.add_argument("--postgres", action="store_true",
+                    help="also benchmark PostgreSQL (config.DB_CONFIG)")
+    args = ap.parse_args()
+
+    print(f"Host: {platform.node()} {platform.machine()} "
+          f"Python {platform.python_version()}")
+    print(f"Sentences: {args.count}\n")
+
+    results = [("parse only", parse_only(args.count))]
+
+    tmp = tempfile.mkdtemp(prefix="nmea_bench_")
+    try:
+        from storage_sqlite import SQLiteBackend
+        db = SQLiteBackend(os.path.join(tmp, "bench.db"))
+        results.append(("sqlite", run_backend(db, args.count)))
+
+        try:
+            from storage_parquet import ParquetBackend
+        except ImportError:
+            print("pyarrow não instalado: PARQUET ignorado")
+        else:
+            pq = ParquetBackend(os.path.join(tmp, "spool"))
+            results.append(("parquet", run_backend(pq, args.count)))
+
+        if args.postgres:
+            from config import DB_CONFIG
+            from storage_pg import PostgresBackend
+            results.append(
+                ("postgres", run_backend(PostgresBackend(DB_CONFIG), args.count))
+            )
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    for name, rate in results:
+        print(f"{name:<12} {rate:>12,.0f} sentences/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,3 +18,31 @@ SERIAL_CONFIG = {
     "baudrate": 4800,
     "timeout": 1
 }
+
+# Tabelas de estado atual (ais_vessel_state / gnss_latest)
+LATEST_STATE_CONFIG = {
+    "flush_interval": 1.0,   # segundos
+    "max_pending": 500
+}
+
+# Armazenamento: "POSTGRES", "SQLITE" ou "PARQUET"
+STORAGE_BACKEND = "POSTGRES"
+
+SQLITE_CONFIG = {
+    "path": "nmea_local.db",
+    "batch_size": 500,          # linhas por COMMIT
+    "commit_interval": 1.0      # segundos
+}
+
+PARQUET_CONFIG = {
+    "directory": "nmea_spool",
+    "rows_per_segment": 50000,
+    "rotate_interval": 300.0    # segundos
+}
+
+# Sync dos backends locais -> PostgreSQL central (DB_CONFIG)
+SYNC_CONFIG = {
+    "enabled": True,
+    "interval": 60.0,           # segundos entre tentativas
+    "connect_timeout": 3
+}
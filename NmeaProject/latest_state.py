@@ -0,0 +1,147 @@
+"""
+Latest-state materialization for AIS vessels and GNSS fix
+
+Keeps one row per MMSI (ais_vessel_state) and one row per GNSS
+talker (gnss_latest). Updates are coalesced in memory and written
+with a single upsert per table on each flush, through the storage
+backend in use (see storage.py).
+"""
+
+import time
+from datetime import datetime
+
+
+AIS_COLUMNS = (
+    "mmsi", "raw_id", "message_type", "latitude", "longitude",
+    "sog", "cog", "heading", "nav_status", "updated_at",
+)
+
+GNSS_COLUMNS = (
+    "talker", "raw_id", "latitude", "longitude", "altitude",
+    "fix_quality", "fix_type", "satellites_count",
+    "hdop", "pdop", "vdop", "speed_knots", "course", "updated_at",
+)
+
+# semantic key -> gnss_latest column
+GNSS_SEMANTIC_MAP = {
+    "latitude": "latitude",
+    "longitude": "longitude",
+    "altitude": "altitude",
+    "fix_quality": "fix_quality",
+    "fix_type": "fix_type",
+    "satellites_count": "satellites_count",
+    "hdop": "hdop",
+    "pdop": "pdop",
+    "vdop": "vdop",
+    "speed_knots": "speed_knots",
+    "course": "course",
+    "course_true": "course",   # VTG
+}
+
+
+def upsert_sql(table, columns, key, coalesce=False, values="%s"):
+    """
+    Builds an INSERT ... ON CONFLICT DO UPDATE (PostgreSQL / SQLite).
+    `values` is "%s" for execute_values or "(?, ?, ...)" for sqlite3.
+    With coalesce=True, NULLs in the new row keep the stored value.
+    """
+    updates = []
+    for col in columns:
+        if col == key:
+            continue
+        if coalesce and col not in ("raw_id", "updated_at"):
+            updates.append(f"{col} = COALESCE(EXCLUDED.{col}, {table}.{col})")
+        else:
+            updates.append(f"{col} = EXCLUDED.{col}")
+
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES {values} "
+        f"ON CONFLICT ({key}) DO UPDATE SET {', '.join(updates)} "
+        f"WHERE {table}.updated_at <= EXCLUDED.updated_at"
+    )
+
+
+AIS_UPSERT = upsert_sql("ais_vessel_state", AIS_COLUMNS, "mmsi")
+GNSS_UPSERT = upsert_sql("gnss_latest", GNSS_COLUMNS, "talker", coalesce=True)
+
+
+class LatestStateWriter:
+    """
+    Coalesces AIS/GNSS updates within a flush window and upserts
+    only the newest state per key.
+    """
+
+    def __init__(self, storage, flush_interval=1.0, max_pending=500):
+        self.storage = storage
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._ais = {}     # mmsi -> row tuple
+        self._gnss = {}    # talker -> column dict
+        self._last_flush = time.monotonic()
+
+    # -------------------------
+    # Updates
+    # -------------------------
+    def update_ais(self, raw_id: int, ais: dict):
+        mmsi = ais.get("mmsi")
+        if mmsi is None:
+            return
+
+        # newest wins: older pending update for the same MMSI is dropped
+        self._ais[mmsi] = (
+            mmsi,
+            raw_id,
+            ais.get("message_type"),
+            ais.get("latitude"),
+            ais.get("longitude"),
+            ais.get("sog"),
+            ais.get("cog"),
+            ais.get("heading"),
+            ais.get("nav_status"),
+            datetime.now(),
+        )
+
+    def update_gnss(self, raw_id: int, parsed: dict):
+        sem = parsed.get("semantic") or {}
+        if not sem:
+            return
+
+        talker = parsed["talker"]
+        state = self._gnss.setdefault(talker, {"talker": talker})
+
+        # GGA/RMC/VTG/GSA each carry part of the fix: merge them
+        for key, col in GNSS_SEMANTIC_MAP.items():
+            value = sem.get(key)
+            if value is not None:
+                state[col] = value
+
+        state["raw_id"] = raw_id
+        state["updated_at"] = datetime.now()
+
+    @property
+    def pending(self) -> int:
+        return len(self._ais) + len(self._gnss)
+
+    # -------------------------
+    # Flush
+    # -------------------------
+    def maybe_flush(self):
+        elapsed = time.monotonic() - self._last_flush
+        if elapsed >= self.flush_interval or self.pending >= self.max_pending:
+            self.flush()
+
+    def flush(self):
+        if self._ais:
+            self.storage.upsert_ais_state(list(self._ais.values()))
+            self._ais.clear()
+
+        if self._gnss:
+            rows = [
+                tuple(state.get(col) for col in GNSS_COLUMNS)
+                for state in self._gnss.values()
+            ]
+            self.storage.upsert_gnss_latest(rows)
+            self._gnss.clear()
+
+        self._last_flush = time.monotonic()
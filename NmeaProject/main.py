@@ -1,89 +1,46 @@
-import psycopg2
-from psycopg2.extras import Json
-
 from config import DB_CONFIG, USE_SOURCE, TCP_CONFIG, SERIAL_CONFIG
+from config import LATEST_STATE_CONFIG, STORAGE_BACKEND
+from config import SQLITE_CONFIG, PARQUET_CONFIG, SYNC_CONFIG
 from nmea_reader import tcp_reader, serial_reader
 from nmea_stream import extract_nmea_sentences
 from nmea_checksum import validate_checksum
 from nmea_parser import parse_nmea
 from ais_decoder import decode_ais
+from latest_state import LatestStateWriter
+from storage import open_storage, SyncScheduler
 
 
 # =========================
-# Database connection
-# =========================
-conn = psycopg2.connect(**DB_CONFIG)
-conn.autocommit = True
-cur = conn.cursor()
-
-# =========================
-# Database helpers
+# Storage backend
 # =========================
-def save_raw(sentence: str) -> int:
-    cur.execute(
-        "INSERT INTO nmea_raw (sentence) VALUES (%s) RETURNING id",
-        (sentence,)
-    )
-    return cur.fetchone()[0]
-
-
-def save_parsed(raw_id: int, parsed: dict):
-    sem = parsed.get("semantic", {})
-    stype = parsed["sentence_type"]
-
-    cur.execute(
-        """
-        INSERT INTO nmea_parsed
-        (raw_id, talker, sentence_type, fields,
-         latitude, longitude, altitude,
-         fix_quality, satellites_count, hdop,
-         satellites_used, pdop, vdop)
-        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-        """,
-        (
-            raw_id,
-            parsed["talker"],
-            stype,
-            Json(parsed["fields"]),
-
-            # posição (GGA / RMC)
-            sem.get("latitude"),
-            sem.get("longitude"),
-            sem.get("altitude"),
-
-            # GGA
-            sem.get("fix_quality"),
-            sem.get("satellites_count"),
-            sem.get("hdop"),
-
-            # GSA
-            sem.get("satellites_used"),
-            sem.get("pdop"),
-            sem.get("vdop"),
-        )
-    )
-
-
-def save_ais(raw_id: int, ais: dict):
-    cur.execute(
-        """
-        INSERT INTO ais_messages
-        (raw_id, message_type, mmsi, latitude, longitude,
-         sog, cog, heading, nav_status, raw)
-        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-        """,
-        (
-            raw_id,
-            ais.get("message_type"),
-            ais.get("mmsi"),
-            ais.get("latitude"),
-            ais.get("longitude"),
-            ais.get("sog"),
-            ais.get("cog"),
-            ais.get("heading"),
-            ais.get("nav_status"),
-            Json(ais),
-        )
+STORAGE_CONFIG = {
+    "POSTGRES": DB_CONFIG,
+    "SQLITE": SQLITE_CONFIG,
+    "PARQUET": PARQUET_CONFIG,
+}
+
+storage = open_storage(STORAGE_BACKEND, STORAGE_CONFIG[STORAGE_BACKEND.upper()])
+print("💾 Armazenamento:", storage.name)
+
+save_raw = storage.save_raw
+save_parsed = storage.save_parsed
+save_ais = storage.save_ais
+
+# estado atual por MMSI / talker (upsert em lote)
+latest = LatestStateWriter(
+    storage,
+    LATEST_STATE_CONFIG["flush_interval"],
+    LATEST_STATE_CONFIG["max_pending"]
+)
+
+# backends locais sincronizam com o PostgreSQL central quando houver rede
+sync = None
+if storage.name != "postgres" and SYNC_CONFIG["enabled"]:
+    sync = SyncScheduler(
+        storage,
+        DB_CONFIG,
+        SYNC_CONFIG["interval"],
+        SYNC_CONFIG["connect_timeout"]
     )
 
 
@@ -134,6 +91,7 @@ for chunk in reader:
             print("AIS decoded:", ais)
             if ais:
                 save_ais(raw_id, ais)
+                latest.update_ais(raw_id, ais)
                 print("🚢 AIS:", ais)
             continue
 
@@ -141,3 +99,14 @@ for chunk in reader:
         parsed = parse_nmea(sentence)
         if parsed:
             save_parsed(raw_id, parsed)
+            latest.update_gnss(raw_id, parsed)
+
+    # 4) estado atual (flush por janela de tempo)
+    latest.maybe_flush()
+    storage.commit()
+
+    if sync:
+        sync.maybe_sync()
+
+latest.flush()
+storage.close()
@@ -0,0 +1,36 @@
+-- Latest-state materialization (1 linha por MMSI / por talker GNSS)
+-- Mantidas por upsert em lote pelo LatestStateWriter (latest_state.py)
+\c nmea_db;
+
+CREATE TABLE IF NOT EXISTS ais_vessel_state (
+    mmsi integer PRIMARY KEY,
+    raw_id integer REFERENCES nmea_raw(id),
+    message_type integer,
+    latitude double precision,
+    longitude double precision,
+    sog double precision,
+    cog double precision,
+    heading integer,
+    nav_status integer,
+    updated_at timestamp without time zone NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_ais_vessel_state_updated
+    ON ais_vessel_state (updated_at);
+
+CREATE TABLE IF NOT EXISTS gnss_latest (
+    talker varchar(10) PRIMARY KEY,
+    raw_id integer REFERENCES nmea_raw(id),
+    latitude double precision,
+    longitude double precision,
+    altitude double precision,
+    fix_quality integer,
+    fix_type integer,
+    satellites_count integer,
+    hdop double precision,
+    pdop double precision,
+    vdop double precision,
+    speed_knots double precision,
+    course double precision,
+    updated_at timestamp without time zone NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,186 @@
+"""
+Storage backend interface for the NMEA + AIS receiver
+
+Backends:
+  POSTGRES - central database (psycopg2)
+  SQLITE   - embedded local file (WAL, batched transactions)
+  PARQUET  - append-only Arrow/Parquet segments
+
+Local backends keep the capture timestamp of every row and can be
+synced in bulk to the central PostgreSQL when it becomes reachable.
+"""
+
+import time
+from datetime import datetime
+
+
+RAW_COLUMNS = ("id", "timestamp", "sentence")
+
+PARSED_COLUMNS = (
+    "raw_id", "talker", "sentence_type", "fields",
+    "latitude", "longitude", "altitude",
+    "fix_quality", "satellites_count", "hdop",
+    "satellites_used", "pdop", "vdop",
+    "timestamp",
+)
+
+AIS_MESSAGE_COLUMNS = (
+    "raw_id", "message_type", "mmsi", "latitude", "longitude",
+    "sog", "cog", "heading", "nav_status", "raw",
+    "timestamp",
+)
+
+
+def parsed_row(raw_id: int, parsed: dict, ts: datetime) -> tuple:
+    sem = parsed.get("semantic", {})
+    return (
+        raw_id,
+        parsed["talker"],
+        parsed["sentence_type"],
+        parsed["fields"],
+
+        # posição (GGA / RMC)
+        sem.get("latitude"),
+        sem.get("longitude"),
+        sem.get("altitude"),
+
+        # GGA
+        sem.get("fix_quality"),
+        sem.get("satellites_count"),
+        sem.get("hdop"),
+
+        # GSA
+        sem.get("satellites_used"),
+        sem.get("pdop"),
+        sem.get("vdop"),
+
+        ts,
+    )
+
+
+def ais_row(raw_id: int, ais: dict, ts: datetime) -> tuple:
+    return (
+        raw_id,
+        ais.get("message_type"),
+        ais.get("mmsi"),
+        ais.get("latitude"),
+        ais.get("longitude"),
+        ais.get("sog"),
+        ais.get("cog"),
+        ais.get("heading"),
+        ais.get("nav_status"),
+        ais,
+        ts,
+    )
+
+
+class StorageBackend:
+    """
+    Common interface used by main.py and LatestStateWriter.
+    """
+
+    name = "base"
+
+    def save_raw(self, sentence: str) -> int:
+        raise NotImplementedError
+
+    def save_parsed(self, raw_id: int, parsed: dict):
+        raise NotImplementedError
+
+    def save_ais(self, raw_id: int, ais: dict):
+        raise NotImplementedError
+
+    def upsert_ais_state(self, rows: list):
+        """rows follow latest_state.AIS_COLUMNS"""
+        raise NotImplementedError
+
+    def upsert_gnss_latest(self, rows: list):
+        """rows follow latest_state.GNSS_COLUMNS"""
+        raise NotImplementedError
+
+    def commit(self):
+        """Called once per received chunk; backends decide when to flush."""
+        pass
+
+    def close(self):
+        pass
+
+    def sync_to_postgres(self, pg) -> int:
+        """
+        Bulk-copies local rows not yet synced into `pg`
+        (a PostgresBackend). Returns number of raw rows synced.
+        """
+        return 0
+
+    def sync_latest_to_postgres(self, pg):
+        """Pushes the local ais_vessel_state / gnss_latest snapshot."""
+        pass
+
+
+def open_storage(kind: str, config: dict) -> StorageBackend:
+    """
+    Factory; imports the backend module lazily so edge boxes
+    only need the driver they actually use.
+    """
+    kind = kind.upper()
+
+    if kind == "POSTGRES":
+        from storage_pg import PostgresBackend
+        return PostgresBackend(config)
+
+    if kind == "SQLITE":
+        from storage_sqlite import SQLiteBackend
+        return SQLiteBackend(**config)
+
+    if kind == "PARQUET":
+        from storage_parquet import ParquetBackend
+        return ParquetBackend(**config)
+
+    raise ValueError(f"unknown storage backend: {kind}")
+
+
+class SyncScheduler:
+    """
+    Tries to reach the central PostgreSQL every `interval` seconds
+    and, when it answers, pushes the local backlog in bulk.
+    """
+
+    def __init__(self, local: StorageBackend, pg_config: dict,
+                 interval=60.0, connect_timeout=3, max_chunks=20):
+        self.local = local
+        self.pg_config = dict(pg_config, connect_timeout=connect_timeout)
+        self.interval = interval
+        self.max_chunks = max_chunks    # bounds time taken from ingest
+        self._next = time.monotonic()
+
+    def maybe_sync(self) -> int:
+        now = time.monotonic()
+        if now < self._next:
+            return 0
+        self._next = now + self.interval
+        return self.sync()
+
+    def sync(self) -> int:
+        from storage_pg import PostgresBackend
+        import psycopg2
+
+        try:
+            pg = PostgresBackend(self.pg_config, autocommit=False)
+        except psycopg2.OperationalError as e:
+            print("⏳ PostgreSQL indisponível, sync adiado:", str(e).strip())
+            return 0
+
+        try:
+            total = 0
+            for _ in range(self.max_chunks):
+                n = self.local.sync_to_postgres(pg)
+                if n == 0:
+                    break
+                total += n
+            self.local.sync_latest_to_postgres(pg)
+            pg.conn.commit()
+            if total:
+                print(f"🔄 Sync: {total} sentenças enviadas ao PostgreSQL")
+            return total
+        finally:
+            pg.close()
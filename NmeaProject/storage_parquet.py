@@ -0,0 +1,235 @@
+"""
+Append-only Parquet/Arrow storage backend
+
+Rows are buffered in memory and written as one segment (three
+Parquet files: raw, parsed, ais) every `rows_per_segment` sentences
+or `rotate_interval` seconds. Segments are never modified; after a
+successful sync they are moved to `<directory>/synced`.
+
+The latest-state tables are kept in memory and snapshotted to
+latest_ais.parquet / latest_gnss.parquet on every rotation.
+
+Requires: pip3 install pyarrow
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from storage import StorageBackend, parsed_row, ais_row
+
+
+RAW_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("timestamp", pa.timestamp("us")),
+    ("sentence", pa.string()),
+])
+
+PARSED_SCHEMA = pa.schema([
+    ("raw_id", pa.int64()),
+    ("talker", pa.string()),
+    ("sentence_type", pa.string()),
+    ("fields", pa.list_(pa.string())),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+    ("altitude", pa.float64()),
+    ("fix_quality", pa.int32()),
+    ("satellites_count", pa.int32()),
+    ("hdop", pa.float64()),
+    ("satellites_used", pa.list_(pa.string())),
+    ("pdop", pa.float64()),
+    ("vdop", pa.float64()),
+    ("timestamp", pa.timestamp("us")),
+])
+
+AIS_SCHEMA = pa.schema([
+    ("raw_id", pa.int64()),
+    ("message_type", pa.int32()),
+    ("mmsi", pa.int64()),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+    ("sog", pa.float64()),
+    ("cog", pa.float64()),
+    ("heading", pa.int32()),
+    ("nav_status", pa.int32()),
+    ("raw", pa.string()),       # JSON
+    ("timestamp", pa.timestamp("us")),
+])
+
+AIS_STATE_SCHEMA = pa.schema([
+    ("mmsi", pa.int64()),
+    ("raw_id", pa.int64()),
+    ("message_type", pa.int32()),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+    ("sog", pa.float64()),
+    ("cog", pa.float64()),
+    ("heading", pa.int32()),
+    ("nav_status", pa.int32()),
+    ("updated_at", pa.timestamp("us")),
+])
+
+GNSS_LATEST_SCHEMA = pa.schema([
+    ("talker", pa.string()),
+    ("raw_id", pa.int64()),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+    ("altitude", pa.float64()),
+    ("fix_quality", pa.int32()),
+    ("fix_type", pa.int32()),
+    ("satellites_count", pa.int32()),
+    ("hdop", pa.float64()),
+    ("pdop", pa.float64()),
+    ("vdop", pa.float64()),
+    ("speed_knots", pa.float64()),
+    ("course", pa.float64()),
+    ("updated_at", pa.timestamp("us")),
+])
+
+
+def _table(rows, schema) -> pa.Table:
+    """row tuples -> Arrow table (column-wise, no per-row dicts)"""
+    columns = list(zip(*rows)) if rows else [[] for _ in schema]
+    return pa.Table.from_arrays(
+        [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+        schema=schema
+    )
+
+
+class ParquetBackend(StorageBackend):
+
+    name = "parquet"
+
+    def __init__(self, directory="nmea_spool", rows_per_segment=50000,
+                 rotate_interval=300.0, compression="zstd"):
+        self.directory = directory
+        self.synced_dir = os.path.join(directory, "synced")
+        os.makedirs(self.synced_dir, exist_ok=True)
+
+        self.rows_per_segment = rows_per_segment
+        self.rotate_interval = rotate_interval
+        self.compression = compression
+
+        self._raw = []
+        self._parsed = []
+        self._ais = []
+        self._ais_state = {}
+        self._gnss_latest = {}
+        self._opened = time.monotonic()
+
+    # =========================
+    # Live ingest
+    # =========================
+    def save_raw(self, sentence: str) -> int:
+        # ids are only unique inside a segment; sync remaps them
+        raw_id = len(self._raw) + 1
+        self._raw.append((raw_id, datetime.now(), sentence))
+        return raw_id
+
+    def save_parsed(self, raw_id: int, parsed: dict):
+        self._parsed.append(parsed_row(raw_id, parsed, datetime.now()))
+
+    def save_ais(self, raw_id: int, ais: dict):
+        row = list(ais_row(raw_id, ais, datetime.now()))
+        row[9] = json.dumps(row[9])
+        self._ais.append(tuple(row))
+
+    def upsert_ais_state(self, rows: list):
+        for r in rows:
+            self._ais_state[r[0]] = r
+
+    def upsert_gnss_latest(self, rows: list):
+        for r in rows:
+            old = self._gnss_latest.get(r[0])
+            if old:
+                # same COALESCE rule as the SQL upsert
+                r = tuple(o if n is None else n for n, o in zip(r, old))
+            self._gnss_latest[r[0]] = r
+
+    def commit(self):
+        if not self._raw:
+            return
+        if (len(self._raw) >= self.rows_per_segment
+                or time.monotonic() - self._opened >= self.rotate_interval):
+            self._rotate()
+
+    def close(self):
+        self._rotate()
+
+    # =========================
+    # Segments
+    # =========================
+    def _write(self, path, rows, schema):
+        tmp = path + ".tmp"
+        pq.write_table(_table(rows, schema), tmp, compression=self.compression)
+        os.replace(tmp, path)   # readers never see half-written files
+
+    def _rotate(self):
+        if self._raw:
+            seg = os.path.join(
+                self.directory, datetime.now().strftime("seg-%Y%m%d-%H%M%S-%f")
+            )
+            # raw last: a segment is complete once its -raw file exists
+            self._write(seg + "-parsed.parquet", self._parsed, PARSED_SCHEMA)
+            self._write(seg + "-ais.parquet", self._ais, AIS_SCHEMA)
+            self._write(seg + "-raw.parquet", self._raw, RAW_SCHEMA)
+            self._raw, self._parsed, self._ais = [], [], []
+
+        self._write(
+            os.path.join(self.directory, "latest_ais.parquet"),
+            list(self._ais_state.values()), AIS_STATE_SCHEMA
+        )
+        self._write(
+            os.path.join(self.directory, "latest_gnss.parquet"),
+            list(self._gnss_latest.values()), GNSS_LATEST_SCHEMA
+        )
+        self._opened = time.monotonic()
+
+    def _segments(self):
+        return sorted(
+            name[:-len("-raw.parquet")]
+            for name in os.listdir(self.directory)
+            if name.endswith("-raw.parquet")
+        )
+
+    # =========================
+    # Sync -> PostgreSQL
+    # =========================
+    def sync_to_postgres(self, pg) -> int:
+        """Imports the oldest closed segment (one per call)."""
+        segments = self._segments()
+        if not segments:
+            return 0
+
+        seg = segments[0]
+        files = [
+            os.path.join(self.directory, f"{seg}-{part}.parquet")
+            for part in ("raw", "parsed", "ais")
+        ]
+        raw, parsed, ais = (pq.read_table(f) for f in files)
+
+        raw_rows = list(zip(*(raw.column(c).to_pylist() for c in raw.column_names)))
+        parsed_rows = list(zip(*(parsed.column(c).to_pylist() for c in parsed.column_names)))
+        ais_rows = [
+            (*r[:9], json.loads(r[9]), r[10])
+            for r in zip(*(ais.column(c).to_pylist() for c in ais.column_names))
+        ]
+
+        pg.bulk_import(raw_rows, parsed_rows, ais_rows)
+
+        # raw moved last, mirroring _rotate()
+        for f in reversed(files):
+            os.replace(f, os.path.join(self.synced_dir, os.path.basename(f)))
+        return len(raw_rows)
+
+    def sync_latest_to_postgres(self, pg):
+        ais = [(r[0], None, *r[2:]) for r in self._ais_state.values()]
+        gnss = [(r[0], None, *r[2:]) for r in self._gnss_latest.values()]
+        if ais:
+            pg.upsert_ais_state(ais)
+        if gnss:
+            pg.upsert_gnss_latest(gnss)
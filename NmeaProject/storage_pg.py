@@ -0,0 +1,146 @@
+"""
+PostgreSQL storage backend (central database)
+"""
+
+import psycopg2
+from psycopg2.extras import Json, execute_values
+
+from storage import StorageBackend, PARSED_COLUMNS, AIS_MESSAGE_COLUMNS
+from latest_state import AIS_UPSERT, GNSS_UPSERT
+
+
+class PostgresBackend(StorageBackend):
+
+    name = "postgres"
+
+    def __init__(self, config: dict, autocommit=True):
+        self.conn = psycopg2.connect(**config)
+        self.conn.autocommit = autocommit
+        self.cur = self.conn.cursor()
+
+    # =========================
+    # Live ingest
+    # =========================
+    def save_raw(self, sentence: str) -> int:
+        self.cur.execute(
+            "INSERT INTO nmea_raw (sentence) VALUES (%s) RETURNING id",
+            (sentence,)
+        )
+        return self.cur.fetchone()[0]
+
+    def save_parsed(self, raw_id: int, parsed: dict):
+        sem = parsed.get("semantic", {})
+        stype = parsed["sentence_type"]
+
+        self.cur.execute(
+            """
+            INSERT INTO nmea_parsed
+            (raw_id, talker, sentence_type, fields,
+             latitude, longitude, altitude,
+             fix_quality, satellites_count, hdop,
+             satellites_used, pdop, vdop)
+            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+            """,
+            (
+                raw_id,
+                parsed["talker"],
+                stype,
+                Json(parsed["fields"]),
+
+                # posição (GGA / RMC)
+                sem.get("latitude"),
+                sem.get("longitude"),
+                sem.get("altitude"),
+
+                # GGA
+                sem.get("fix_quality"),
+                sem.get("satellites_count"),
+                sem.get("hdop"),
+
+                # GSA
+                sem.get("satellites_used"),
+                sem.get("pdop"),
+                sem.get("vdop"),
+            )
+        )
+
+    def save_ais(self, raw_id: int, ais: dict):
+        self.cur.execute(
+            """
+            INSERT INTO ais_messages
+            (raw_id, message_type, mmsi, latitude, longitude,
+             sog, cog, heading, nav_status, raw)
+            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+            """,
+            (
+                raw_id,
+                ais.get("message_type"),
+                ais.get("mmsi"),
+                ais.get("latitude"),
+                ais.get("longitude"),
+                ais.get("sog"),
+                ais.get("cog"),
+                ais.get("heading"),
+                ais.get("nav_status"),
+                Json(ais),
+            )
+        )
+
+    def upsert_ais_state(self, rows: list):
+        execute_values(self.cur, AIS_UPSERT, rows)
+
+    def upsert_gnss_latest(self, rows: list):
+        execute_values(self.cur, GNSS_UPSERT, rows)
+
+    def close(self):
+        self.cur.close()
+        self.conn.close()
+
+    # =========================
+    # Bulk import (sync from local backends)
+    # =========================
+    def bulk_import(self, raw_rows, parsed_rows, ais_rows) -> dict:
+        """
+        raw_rows    : [(local_id, timestamp, sentence), ...]
+        parsed_rows : tuples in storage.PARSED_COLUMNS order
+        ais_rows    : tuples in storage.AIS_MESSAGE_COLUMNS order
+
+        Local raw ids are remapped to the ids assigned by PostgreSQL.
+        Everything goes in one transaction. Returns {local_id: pg_id}.
+        """
+        if not raw_rows:
+            return {}
+
+        pg_ids = execute_values(
+            self.cur,
+            "INSERT INTO nmea_raw (timestamp, sentence) VALUES %s RETURNING id",
+            [(ts, sentence) for _, ts, sentence in raw_rows],
+            page_size=len(raw_rows),
+            fetch=True,
+        )
+        id_map = {row[0]: pg[0] for row, pg in zip(raw_rows, pg_ids)}
+
+        if parsed_rows:
+            execute_values(
+                self.cur,
+                f"INSERT INTO nmea_parsed ({', '.join(PARSED_COLUMNS)}) VALUES %s",
+                [
+                    (id_map.get(r[0]), *r[1:3], Json(r[3]), *r[4:])
+                    for r in parsed_rows
+                ],
+                page_size=1000,
+            )
+
+        if ais_rows:
+            execute_values(
+                self.cur,
+                f"INSERT INTO ais_messages ({', '.join(AIS_MESSAGE_COLUMNS)}) VALUES %s",
+                [
+                    (id_map.get(r[0]), *r[1:9], Json(r[9]), r[10])
+                    for r in ais_rows
+                ],
+                page_size=1000,
+            )
+
+        self.conn.commit()
+        return id_map
@@ -0,0 +1,282 @@
+"""
+Embedded SQLite storage backend (edge boxes without PostgreSQL)
+
+- WAL journal: readers (dashboards, sync) never block the writer
+- batched transactions: one COMMIT every `batch_size` rows or
+  `commit_interval` seconds instead of one fsync per sentence
+- fixed SQL strings, so sqlite3 reuses its prepared statements
+"""
+
+import json
+import sqlite3
+import time
+from datetime import datetime
+
+from storage import (
+    StorageBackend, parsed_row, ais_row,
+    PARSED_COLUMNS, AIS_MESSAGE_COLUMNS,
+)
+from latest_state import upsert_sql, AIS_COLUMNS, GNSS_COLUMNS
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nmea_raw (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    sentence TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS nmea_parsed (
+    id INTEGER PRIMARY KEY,
+    raw_id INTEGER REFERENCES nmea_raw(id),
+    talker TEXT,
+    sentence_type TEXT,
+    fields TEXT,
+    latitude REAL,
+    longitude REAL,
+    altitude REAL,
+    fix_quality INTEGER,
+    satellites_count INTEGER,
+    hdop REAL,
+    satellites_used TEXT,
+    pdop REAL,
+    vdop REAL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_nmea_parsed_raw ON nmea_parsed(raw_id);
+
+CREATE TABLE IF NOT EXISTS ais_messages (
+    id INTEGER PRIMARY KEY,
+    raw_id INTEGER REFERENCES nmea_raw(id),
+    message_type INTEGER,
+    mmsi INTEGER,
+    latitude REAL,
+    longitude REAL,
+    sog REAL,
+    cog REAL,
+    heading INTEGER,
+    nav_status INTEGER,
+    raw TEXT,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ais_messages_raw ON ais_messages(raw_id);
+
+CREATE TABLE IF NOT EXISTS ais_vessel_state (
+    mmsi INTEGER PRIMARY KEY,
+    raw_id INTEGER,
+    message_type INTEGER,
+    latitude REAL,
+    longitude REAL,
+    sog REAL,
+    cog REAL,
+    heading INTEGER,
+    nav_status INTEGER,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS gnss_latest (
+    talker TEXT PRIMARY KEY,
+    raw_id INTEGER,
+    latitude REAL,
+    longitude REAL,
+    altitude REAL,
+    fix_quality INTEGER,
+    fix_type INTEGER,
+    satellites_count INTEGER,
+    hdop REAL,
+    pdop REAL,
+    vdop REAL,
+    speed_knots REAL,
+    course REAL,
+    updated_at TEXT NOT NULL
+);
+
+-- high-water mark of nmea_raw.id already copied to PostgreSQL
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    last_raw_id INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO sync_state (name, last_raw_id) VALUES ('postgres', 0);
+"""
+
+
+def _placeholders(columns) -> str:
+    return "(" + ", ".join("?" * len(columns)) + ")"
+
+
+INSERT_RAW = "INSERT INTO nmea_raw (timestamp, sentence) VALUES (?, ?)"
+INSERT_PARSED = (
+    f"INSERT INTO nmea_parsed ({', '.join(PARSED_COLUMNS)}) "
+    f"VALUES {_placeholders(PARSED_COLUMNS)}"
+)
+INSERT_AIS = (
+    f"INSERT INTO ais_messages ({', '.join(AIS_MESSAGE_COLUMNS)}) "
+    f"VALUES {_placeholders(AIS_MESSAGE_COLUMNS)}"
+)
+UPSERT_AIS_STATE = upsert_sql(
+    "ais_vessel_state", AIS_COLUMNS, "mmsi",
+    values=_placeholders(AIS_COLUMNS)
+)
+UPSERT_GNSS_LATEST = upsert_sql(
+    "gnss_latest", GNSS_COLUMNS, "talker", coalesce=True,
+    values=_placeholders(GNSS_COLUMNS)
+)
+
+
+def _ts(value):
+    """datetime -> ISO text (SQLite has no native timestamp type)"""
+    return value.isoformat(sep=" ") if isinstance(value, datetime) else value
+
+
+class SQLiteBackend(StorageBackend):
+
+    name = "sqlite"
+
+    def __init__(self, path="nmea_local.db", batch_size=500,
+                 commit_interval=1.0, synchronous="NORMAL"):
+        # isolation_level=None: transactions are opened explicitly below
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+        self.conn.executescript(SCHEMA)
+        self.cur = self.conn.cursor()
+
+        self.batch_size = batch_size
+        self.commit_interval = commit_interval
+        self._pending = 0
+        self._last_commit = time.monotonic()
+        self._in_tx = False
+
+    # =========================
+    # Transactions
+    # =========================
+    def _begin(self):
+        if not self._in_tx:
+            self.cur.execute("BEGIN")
+            self._in_tx = True
+
+    def _flush(self):
+        if self._in_tx:
+            self.cur.execute("COMMIT")
+            self._in_tx = False
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+    def commit(self):
+        if not self._pending:
+            return
+        if (self._pending >= self.batch_size
+                or time.monotonic() - self._last_commit >= self.commit_interval):
+            self._flush()
+
+    # =========================
+    # Live ingest
+    # =========================
+    def save_raw(self, sentence: str) -> int:
+        self._begin()
+        self.cur.execute(INSERT_RAW, (_ts(datetime.now()), sentence))
+        self._pending += 1
+        return self.cur.lastrowid
+
+    def save_parsed(self, raw_id: int, parsed: dict):
+        self._begin()
+        row = list(parsed_row(raw_id, parsed, _ts(datetime.now())))
+        row[3] = json.dumps(row[3])
+        row[10] = json.dumps(row[10]) if row[10] is not None else None
+        self.cur.execute(INSERT_PARSED, row)
+        self._pending += 1
+
+    def save_ais(self, raw_id: int, ais: dict):
+        self._begin()
+        row = list(ais_row(raw_id, ais, _ts(datetime.now())))
+        row[9] = json.dumps(row[9])
+        self.cur.execute(INSERT_AIS, row)
+        self._pending += 1
+
+    def upsert_ais_state(self, rows: list):
+        self._begin()
+        self.cur.executemany(
+            UPSERT_AIS_STATE, [(*r[:-1], _ts(r[-1])) for r in rows]
+        )
+
+    def upsert_gnss_latest(self, rows: list):
+        self._begin()
+        self.cur.executemany(
+            UPSERT_GNSS_LATEST, [(*r[:-1], _ts(r[-1])) for r in rows]
+        )
+
+    def close(self):
+        self._flush()
+        self.conn.close()
+
+    # =========================
+    # Sync -> PostgreSQL
+    # =========================
+    def sync_to_postgres(self, pg, chunk=5000) -> int:
+        self._flush()
+
+        (last_id,) = self.cur.execute(
+            "SELECT last_raw_id FROM sync_state WHERE name = 'postgres'"
+        ).fetchone()
+
+        raw_rows = self.cur.execute(
+            "SELECT id, timestamp, sentence FROM nmea_raw "
+            "WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, chunk)
+        ).fetchall()
+        if not raw_rows:
+            return 0
+
+        max_id = raw_rows[-1][0]
+
+        parsed_rows = []
+        for r in self.cur.execute(
+            f"SELECT {', '.join(PARSED_COLUMNS)} FROM nmea_parsed "
+            "WHERE raw_id > ? AND raw_id <= ?",
+            (last_id, max_id)
+        ):
+            r = list(r)
+            r[3] = json.loads(r[3])
+            r[10] = json.loads(r[10]) if r[10] is not None else None
+            parsed_rows.append(tuple(r))
+
+        ais_rows = []
+        for r in self.cur.execute(
+            f"SELECT {', '.join(AIS_MESSAGE_COLUMNS)} FROM ais_messages "
+            "WHERE raw_id > ? AND raw_id <= ?",
+            (last_id, max_id)
+        ):
+            r = list(r)
+            r[9] = json.loads(r[9])
+            ais_rows.append(tuple(r))
+
+        # PostgreSQL commits first; only then the high-water mark moves
+        pg.bulk_import(raw_rows, parsed_rows, ais_rows)
+
+        self.cur.execute(
+            "UPDATE sync_state SET last_raw_id = ? WHERE name = 'postgres'",
+            (max_id,)
+        )
+        return len(raw_rows)
+
+    def sync_latest_to_postgres(self, pg):
+        self._flush()
+
+        # local raw ids mean nothing centrally: raw_id goes as NULL
+        ais = [
+            (r[0], None, *r[2:])
+            for r in self.cur.execute(
+                f"SELECT {', '.join(AIS_COLUMNS)} FROM ais_vessel_state"
+            )
+        ]
+        gnss = [
+            (r[0], None, *r[2:])
+            for r in self.cur.execute(
+                f"SELECT {', '.join(GNSS_COLUMNS)} FROM gnss_latest"
+            )
+        ]
+
+        if ais:
+            pg.upsert_ais_state(ais)
+        if gnss:
+            pg.upsert_gnss_latest(gnss)
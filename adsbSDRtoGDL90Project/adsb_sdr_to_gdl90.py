@@ -2,128 +2,78 @@
 # -*- coding: utf-8 -*-
 
 import socket
-import struct
-import time
-import threading
+import asyncio
+
+from aircraft_store import AircraftStore, read_sbs
+from spatial_index import SpatialGrid
+from traffic_frames import TrafficFrameCache, packDatagrams
+from traffic_scheduler import TrafficScheduler
 
 # ===============================
-# GDL90 CONSTANTS
+# TRAFFIC OUTPUT
 # ===============================
-FLAG = 0x7E
-ESC = 0x7D
+VELOCITY_MAX_AGE = 10.0       # older MSG,4 data is reported as unknown
 
-MSG_HEARTBEAT = 0x00
-MSG_TRAFFIC = 0x14
+TICK = 0.25                   # scheduler resolution (s)
+HEARTBEAT_PERIOD = 1.0
+MAX_RATE = 200.0              # traffic reports per second, all targets
+OWNSHIP = None                # (lat, lon) for range-based rates; None = moving targets at 1 Hz
+OWNSHIP_ALT = None            # ft; None = no altitude band
 
-CRC_POLY = 0x8408
-CRC_INIT = 0xFFFF
+# with OWNSHIP set, only targets inside this cylinder are sent
+FILTER_RADIUS_NM = 60.0
+FILTER_BAND_FT = 10000.0
 
 
-# ===============================
-# CRC
-# ===============================
-def crc16_ccitt(data: bytes) -> int:
-    crc = CRC_INIT
-    for b in data:
-        crc ^= b
-        for _ in range(8):
-            if crc & 1:
-                crc = (crc >> 1) ^ CRC_POLY
-            else:
-                crc >>= 1
-    return (~crc) & 0xFFFF
+def relevant(store, ownship):
+    """targets worth sending to the EFB, nearest first"""
+    if ownship is None or store.index is None:
+        return store
+    hits = store.index.query(ownship[0], ownship[1], FILTER_RADIUS_NM,
+                             OWNSHIP_ALT, FILTER_BAND_FT)
+    return [ac for _, ac in hits]
 
 
-def escape_bytes(data: bytes) -> bytes:
-    out = bytearray()
-    for b in data:
-        if b == FLAG:
-            out.extend([ESC, 0x5E])
-        elif b == ESC:
-            out.extend([ESC, 0x5D])
-        else:
-            out.append(b)
-    return bytes(out)
+async def send_traffic(store, udp, target, scheduler, tick=TICK):
+    loop = asyncio.get_running_loop()
+    cache = TrafficFrameCache()
+    deadline = next_heartbeat = loop.time()
+    while True:
+        frames = []
+        if deadline >= next_heartbeat:
+            frames.append(bytes(cache.encoder.msgHeartbeat()))
+            next_heartbeat += HEARTBEAT_PERIOD
+
+        now = store.clock()
+        gone = store.expire(now)
+        cache.forget(gone)
+        scheduler.forget(gone)
+        for ac in scheduler.select(relevant(store, scheduler.ownship), now, tick):
+            vel = ac.velocity(now, VELOCITY_MAX_AGE)
+            if vel:
+                frames.append(cache.frame(ac, *vel))
+            else:
+                frames.append(cache.frame(ac))
 
+        for datagram in packDatagrams(frames):
+            udp.sendto(datagram, target)
 
-def frame_gdl90(msg: bytes) -> bytes:
-    crc = crc16_ccitt(msg)
-    packet = msg + struct.pack("<H", crc)
-    return bytes([FLAG]) + escape_bytes(packet) + bytes([FLAG])
+        # absolute deadlines on the loop's monotonic clock: no drift
+        deadline += tick
+        delay = deadline - loop.time()
+        if delay < -tick:
+            deadline = loop.time()      # fell behind: skip, don't burst
+        await asyncio.sleep(max(0.0, delay))
 
 
-# ===============================
-# GDL90 MESSAGES
-# ===============================
-def gdl90_heartbeat():
-    msg = struct.pack("<BHH", MSG_HEARTBEAT, 0x0000, 0)
-    return frame_gdl90(msg)
-
-
-def gdl90_traffic(icao, lat, lon, alt_ft, gs, track):
-    lat_i = int(lat * 1e7)
-    lon_i = int(lon * 1e7)
-    alt_i = int((alt_ft + 1000) / 25)
-
-    airborne = 0x01
-
-    msg = struct.pack(
-        "<BIiiHHHB",
-        MSG_TRAFFIC,
-        icao,
-        lat_i,
-        lon_i,
-        alt_i,
-        int(gs),
-        int(track),
-        airborne
+async def run(adsb_host, adsb_port, udp_target):
+    udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    store = AircraftStore(ttl=10.0, index=SpatialGrid())
+    scheduler = TrafficScheduler(MAX_RATE, OWNSHIP)
+    await asyncio.gather(
+        read_sbs(store, adsb_host, adsb_port),
+        send_traffic(store, udp, udp_target, scheduler),
     )
-    return frame_gdl90(msg)
-
-
-# ===============================
-# ADS-B (SBS-1)
-# ===============================
-class ADSBReceiver(threading.Thread):
-    def __init__(self, host, port):
-        super().__init__(daemon=True)
-        self.sock = socket.create_connection((host, port))
-        self.aircraft = {}
-
-    def run(self):
-        buffer = ""
-        while True:
-            buffer += self.sock.recv(4096).decode(errors="ignore")
-            while "\n" in buffer:
-                line, buffer = buffer.split("\n", 1)
-                self.parse_sbs(line.strip())
-
-    def parse_sbs(self, line):
-        fields = line.split(",")
-        if len(fields) < 22 or fields[0] != "MSG":
-            return
-
-        icao = fields[4]
-        lat = fields[14]
-        lon = fields[15]
-        alt = fields[11]
-        gs = fields[12]
-        track = fields[13]
-
-        if not lat or not lon or not alt:
-            return
-
-        try:
-            self.aircraft[int(icao, 16)] = {
-                "lat": float(lat),
-                "lon": float(lon),
-                "alt": float(alt),
-                "gs": float(gs) if gs else 0,
-                "track": float(track) if track else 0,
-                "time": time.time()
-            }
-        except ValueError:
-            pass
 
 
 # ===============================
@@ -136,35 +86,14 @@ def main():
     UDP_IP = "127.0.0.1"
     UDP_PORT = 4000
 
-    udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-
-    adsb = ADSBReceiver(ADSB_HOST, ADSB_PORT)
-    adsb.start()
-
     print("ADS-B SDR → GDL90 Traffic")
     print("Listening ADS-B on TCP 30003")
     print("Sending GDL90 to UDP 4000")
 
-    while True:
-        udp.sendto(gdl90_heartbeat(), (UDP_IP, UDP_PORT))
-
-        now = time.time()
-        for icao, ac in list(adsb.aircraft.items()):
-            if now - ac["time"] > 10:
-                del adsb.aircraft[icao]
-                continue
-
-            pkt = gdl90_traffic(
-                icao,
-                ac["lat"],
-                ac["lon"],
-                ac["alt"],
-                ac["gs"],
-                ac["track"]
-            )
-            udp.sendto(pkt, (UDP_IP, UDP_PORT))
-
-        time.sleep(1)
+    try:
+        asyncio.run(run(ADSB_HOST, ADSB_PORT, (UDP_IP, UDP_PORT)))
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == "__main__":
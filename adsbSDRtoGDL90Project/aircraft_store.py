@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SBS-1 (BaseStation, dump1090 port 30003) ingest and aircraft table.
+
+Everything runs on one asyncio loop: the reader task feeds lines into
+the store and the output task reads from it, so no lock is needed.
+
+  - SBSLineSplitter: scans each received chunk once (bytes.split)
+  - Aircraft: one __slots__ record per ICAO address; MSG subtypes carry
+    different fields (1 identity, 3 position, 4 velocity, 5-7 altitude /
+    squawk) and are merged field by field; position, altitude and
+    velocity keep the time of their last update, so stale ones can be
+    left out
+  - AircraftStore: dict by ICAO + min-heap of expiry deadlines, so the
+    periodic expiry only touches aircraft that may actually be stale;
+    an optional spatial_index.SpatialGrid is kept in step with it
+"""
+
+import asyncio
+import heapq
+import time
+
+# ===============================
+# SBS-1 FIELDS
+# ===============================
+SBS_FIELDS = 22
+
+F_TYPE = 1
+F_ICAO = 4
+F_CALLSIGN = 10
+F_ALT = 11
+F_GS = 12
+F_TRACK = 13
+F_LAT = 14
+F_LON = 15
+F_VRATE = 16
+F_SQUAWK = 17
+F_GROUND = 21
+
+MAX_LINE = 1024
+
+
+# ===============================
+# LINE SPLITTER
+# ===============================
+class SBSLineSplitter:
+    def __init__(self):
+        self.tail = b""
+        self.dropped = 0
+
+    def feed(self, chunk: bytes):
+        """complete lines in this chunk; the partial last line is kept"""
+        lines = (self.tail + chunk).split(b"\n") if self.tail else chunk.split(b"\n")
+        self.tail = lines.pop()
+        if len(self.tail) > MAX_LINE:
+            # no newline in sight: garbage on the feed
+            self.dropped += 1
+            self.tail = b""
+        return lines
+
+
+# ===============================
+# AIRCRAFT TABLE
+# ===============================
+class Aircraft:
+    __slots__ = (
+        "icao", "seen",
+        "lat", "lon", "t_pos",
+        "alt", "t_alt",
+        "gs", "track", "vrate", "t_vel",
+        "callsign", "squawk",
+        "on_ground",
+        "moved",
+    )
+
+    def __init__(self, icao):
+        self.icao = icao
+        self.seen = 0.0
+        self.lat = self.lon = None
+        self.alt = None
+        self.gs = self.track = self.vrate = None
+        self.callsign = None
+        self.squawk = None
+        self.on_ground = False
+        # per-field-group time of last update (0 = never)
+        self.t_pos = self.t_alt = self.t_vel = 0.0
+        self.moved = False      # position/altitude changed since last report
+
+    def has_position(self, now, max_age):
+        """position and altitude both known and neither older than max_age"""
+        return (self.lat is not None and self.alt is not None
+                and now - self.t_pos <= max_age and now - self.t_alt <= max_age)
+
+    def velocity(self, now, max_age):
+        """(gs, track, vrate) if the velocity group is fresh, else None"""
+        if self.gs is None or now - self.t_vel > max_age:
+            return None
+        return self.gs, self.track, self.vrate
+
+
+class AircraftStore:
+    def __init__(self, ttl=10.0, clock=time.monotonic, index=None):
+        self.ttl = ttl
+        self.clock = clock
+        self.index = index      # updated on position change and expiry
+        self.aircraft = {}
+        # at most one (deadline, icao) entry per aircraft; a popped entry
+        # whose aircraft was seen again is pushed back with the new deadline
+        self.heap = []
+        self.messages = 0
+        self.rejected = 0
+
+    def __len__(self):
+        return len(self.aircraft)
+
+    def __iter__(self):
+        return iter(self.aircraft.values())
+
+    def get(self, icao):
+        return self.aircraft.get(icao)
+
+    def touch(self, icao, now):
+        """record for icao, created on first sight, marked as seen now"""
+        ac = self.aircraft.get(icao)
+        if ac is None:
+            ac = self.aircraft[icao] = Aircraft(icao)
+            heapq.heappush(self.heap, (now + self.ttl, icao))
+        ac.seen = now
+        return ac
+
+    def expire(self, now=None):
+        """drop aircraft not seen for ttl seconds; returns their ICAOs"""
+        now = self.clock() if now is None else now
+        heap = self.heap
+        ttl = self.ttl
+        removed = []
+        while heap and heap[0][0] <= now:
+            _, icao = heapq.heappop(heap)
+            ac = self.aircraft.get(icao)
+            if ac is None:
+                continue
+            deadline = ac.seen + ttl
+            if deadline <= now:
+                del self.aircraft[icao]
+                removed.append(icao)
+            else:
+                heapq.heappush(heap, (deadline, icao))
+        if removed and self.index is not None:
+            self.index.remove(removed)
+        return removed
+
+    # ---------------- SBS-1 ----------------
+    def feed_line(self, line: bytes, now=None):
+        fields = line.split(b",")
+        if len(fields) < SBS_FIELDS or fields[0] != b"MSG":
+            return None
+        self.messages += 1
+        now = self.clock() if now is None else now
+
+        try:
+            icao = int(fields[F_ICAO], 16)
+
+            lat = fields[F_LAT]
+            lon = fields[F_LON]
+            alt = fields[F_ALT]
+            gs = fields[F_GS]
+            track = fields[F_TRACK]
+            vrate = fields[F_VRATE]
+            callsign = fields[F_CALLSIGN]
+            squawk = fields[F_SQUAWK]
+
+            # convert everything before touching the record: a bad line
+            # must not leave a half-merged state behind
+            lat = float(lat) if lat and lon else None
+            lon = float(lon) if lon and lat is not None else None
+            alt = float(alt) if alt else None
+            gs = float(gs) if gs else None
+            track = float(track) if track else None
+            vrate = float(vrate) if vrate else None
+        except ValueError:
+            self.rejected += 1
+            return None
+
+        ac = self.touch(icao, now)
+
+        if lat is not None:
+            if lat != ac.lat or lon != ac.lon:
+                ac.lat = lat
+                ac.lon = lon
+                ac.moved = True
+                if self.index is not None:
+                    self.index.update(ac)
+            ac.t_pos = now
+
+        if alt is not None:
+            if alt != ac.alt:
+                ac.alt = alt
+                ac.moved = True
+            ac.t_alt = now
+
+        if gs is not None or track is not None or vrate is not None:
+            if gs is not None:
+                ac.gs = gs
+            if track is not None:
+                ac.track = track
+            if vrate is not None:
+                ac.vrate = vrate
+            ac.t_vel = now
+
+        if callsign:
+            ac.callsign = callsign.strip().decode("ascii", "ignore")
+        if squawk:
+            ac.squawk = squawk.decode("ascii", "ignore")
+
+        ground = fields[F_GROUND].strip()
+        if ground:
+            ac.on_ground = ground == b"-1"
+
+        return ac
+
+    def feed_lines(self, lines):
+        now = self.clock()
+        feed = self.feed_line
+        for line in lines:
+            feed(line, now)
+
+
+# ===============================
+# ASYNC READER
+# ===============================
+async def read_sbs(store, host, port, retry=2.0, verbose=True):
+    """keeps a TCP connection to the SBS-1 feed, reconnecting on loss"""
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError as e:
+            if verbose:
+                print(f"SBS-1 {host}:{port} unavailable ({e}), retrying")
+            await asyncio.sleep(retry)
+            continue
+
+        if verbose:
+            print(f"SBS-1 connected to {host}:{port}")
+        splitter = SBSLineSplitter()
+        try:
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    break
+                store.feed_lines(splitter.feed(chunk))
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+        if verbose:
+            print("SBS-1 connection lost, retrying")
+        await asyncio.sleep(retry)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GDL90 traffic output benchmark for the ADS-B bridge.
+
+Compares, per 1 Hz tick over N targets:
+  legacy   the old per-aircraft struct.pack + bit-by-bit CRC, one
+           datagram per aircraft
+  cached   traffic_frames.TrafficFrameCache + MTU-sized datagrams
+
+and checks that every cached frame round-trips through gdl90.decoder.
+
+  python3 bench_traffic.py                 # 1000 targets
+  python3 bench_traffic.py -n 300 --moving 0.5
+"""
+
+import argparse
+import random
+import struct
+import time
+
+from aircraft_store import Aircraft
+from traffic_frames import TrafficFrameCache, packDatagrams, decodeMessages
+
+
+# ===============================
+# LEGACY (previous adsb_sdr_to_gdl90.py output)
+# ===============================
+def crc16_ccitt(data: bytes) -> int:
+    crc = 0xFFFF
+    for b in data:
+        crc ^= b
+        for _ in range(8):
+            if crc & 1:
+                crc = (crc >> 1) ^ 0x8408
+            else:
+                crc >>= 1
+    return (~crc) & 0xFFFF
+
+
+def escape_bytes(data: bytes) -> bytes:
+    out = bytearray()
+    for b in data:
+        if b == 0x7E:
+            out.extend([0x7D, 0x5E])
+        elif b == 0x7D:
+            out.extend([0x7D, 0x5D])
+        else:
+            out.append(b)
+    return bytes(out)
+
+
+def legacy_traffic(icao, lat, lon, alt_ft, gs, track):
+    msg = struct.pack("<BIiiHHHB", 0x14, icao, int(lat * 1e7), int(lon * 1e7),
+                      int((alt_ft + 1000) / 25), int(gs), int(track), 0x01)
+    packet = msg + struct.pack("<H", crc16_ccitt(msg))
+    return b"\x7e" + escape_bytes(packet) + b"\x7e"
+
+
+# ===============================
+# SCENARIO
+# ===============================
+def make_targets(n, seed=1):
+    rnd = random.Random(seed)
+    targets = []
+    for i in range(n):
+        ac = Aircraft(0xA00000 + i)
+        ac.lat = -23.0 + rnd.uniform(-2, 2)
+        ac.lon = -47.0 + rnd.uniform(-2, 2)
+        ac.alt = rnd.randrange(500, 41000, 25)
+        ac.gs = rnd.uniform(90, 480)
+        ac.track = rnd.uniform(0, 360)
+        ac.vrate = rnd.choice((0.0, 0.0, 640.0, -960.0))
+        ac.callsign = f"TST{i:04d}"
+        targets.append(ac)
+    return targets
+
+
+def move(targets, fraction, rnd):
+    """a fraction of the targets moves by more than one LSB per tick"""
+    for ac in targets:
+        if rnd.random() < fraction:
+            ac.lat += 0.0005
+            ac.lon += 0.0005
+
+
+def run_legacy(targets, ticks, fraction, seed):
+    rnd = random.Random(seed)
+    datagrams = 0
+    t0 = time.perf_counter()
+    for _ in range(ticks):
+        move(targets, fraction, rnd)
+        for ac in targets:
+            legacy_traffic(ac.icao, ac.lat, ac.lon, ac.alt, ac.gs, ac.track)
+            datagrams += 1
+    return (time.perf_counter() - t0) / ticks, datagrams / ticks
+
+
+def run_cached(targets, ticks, fraction, seed):
+    rnd = random.Random(seed)
+    cache = TrafficFrameCache()
+    datagrams = 0
+    t0 = time.perf_counter()
+    for _ in range(ticks):
+        move(targets, fraction, rnd)
+        frames = [cache.frame(ac, ac.gs, ac.track, ac.vrate) for ac in targets]
+        datagrams += len(packDatagrams(frames))
+    return (time.perf_counter() - t0) / ticks, datagrams / ticks, cache
+
+
+def roundtrip(targets):
+    cache = TrafficFrameCache()
+    frames = [cache.frame(ac, ac.gs, ac.track, ac.vrate) for ac in targets]
+    decoded, bad = decodeMessages(packDatagrams(frames))
+    lsb = 180.0 / 2 ** 23
+    errors = 0
+    for ac, m in zip(targets, decoded):
+        if (m.MsgType != "TrafficReport" or m.Address != ac.icao
+                or abs(m.Latitude - ac.lat) > lsb or abs(m.Longitude - ac.lon) > lsb
+                or abs(m.Altitude - ac.alt) >= 25 or m.HVelocity != int(ac.gs)
+                or m.CallSign.strip() != ac.callsign):
+            errors += 1
+    return len(decoded), bad, errors
+
+
+def main():
+    ap = argparse.ArgumentParser(description="GDL90 traffic output benchmark")
+    ap.add_argument("-n", "--targets", type=int, default=1000)
+    ap.add_argument("--ticks", type=int, default=20)
+    ap.add_argument("--moving", type=float, default=0.2,
+                    help="fraction of targets that move per tick")
+    args = ap.parse_args()
+
+    n = args.targets
+    dt_l, dg_l = run_legacy(make_targets(n), args.ticks, args.moving, 2)
+    dt_c, dg_c, cache = run_cached(make_targets(n), args.ticks, args.moving, 2)
+
+    print(f"targets: {n}, moving per tick: {args.moving:.0%}")
+    print(f"legacy   {dt_l * 1e3:8.2f} ms/tick  {dg_l:7.0f} datagrams/tick")
+    print(f"cached   {dt_c * 1e3:8.2f} ms/tick  {dg_c:7.0f} datagrams/tick  "
+          f"(encoded {cache.encoded}, reused {cache.hits})")
+
+    got, bad, errors = roundtrip(make_targets(n))
+    print(f"round-trip: {got}/{n} decoded, {bad} bad CRC, {errors} field mismatches")
+
+
+if __name__ == "__main__":
+    main()
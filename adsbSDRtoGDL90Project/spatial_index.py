@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Grid index over aircraft positions for "targets within X nm and +/-Y ft
+of ownship" queries.
+
+  - the globe is cut into cells of CELL_DEG x CELL_DEG; each cell holds
+    the aircraft whose last position falls in it
+  - update() is incremental: an aircraft only changes buckets when it
+    crosses a cell edge, otherwise it is a dict lookup and a compare
+  - query() visits only the cells overlapping the search circle (wider
+    in longitude away from the equator, wrapping at +/-180) and checks
+    the exact distance and altitude band on what it finds there, in one
+    batch through geoutils.haversine (vectorized when numpy is present)
+"""
+
+import os
+import sys
+import math
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import gdl90_checkout  # noqa: F401
+
+from geoutils.geoutils import haversine
+
+# ===============================
+# GRID
+# ===============================
+CELL_DEG = 0.25               # 15 nm north-south
+NM_PER_DEG = 60.0
+
+
+def _cell(lat, lon, size=CELL_DEG):
+    return int(math.floor(lat / size)), int(math.floor(lon / size))
+
+
+distance_nm = haversine       # great-circle nm
+
+
+class SpatialGrid:
+    def __init__(self, cell_deg=CELL_DEG):
+        self.cell_deg = cell_deg
+        self.lon_cells = int(round(360.0 / cell_deg))
+        self.cells = {}          # (row, col) -> {icao: aircraft}
+        self.where = {}          # icao -> (row, col)
+        self.moves = 0
+
+    def __len__(self):
+        return len(self.where)
+
+    def _key(self, lat, lon):
+        row, col = _cell(lat, lon, self.cell_deg)
+        return row, col % self.lon_cells
+
+    def update(self, ac):
+        """(re)index an aircraft record after its position changed"""
+        if ac.lat is None:
+            return
+        key = self._key(ac.lat, ac.lon)
+        old = self.where.get(ac.icao)
+        if old == key:
+            return
+        if old is not None:
+            self._discard(ac.icao, old)
+        self.where[ac.icao] = key
+        bucket = self.cells.get(key)
+        if bucket is None:
+            bucket = self.cells[key] = {}
+        bucket[ac.icao] = ac
+        self.moves += 1
+
+    def _discard(self, icao, key):
+        bucket = self.cells[key]
+        del bucket[icao]
+        if not bucket:
+            del self.cells[key]
+
+    def remove(self, icaos):
+        for icao in icaos:
+            key = self.where.pop(icao, None)
+            if key is not None:
+                self._discard(icao, key)
+
+    def _cells_around(self, lat, lon, radius_nm):
+        size = self.cell_deg
+        dlat = radius_nm / NM_PER_DEG
+        row0 = int(math.floor((lat - dlat) / size))
+        row1 = int(math.floor((lat + dlat) / size))
+
+        # the circle is widest in longitude at the edge nearest the pole
+        edge = min(89.9, abs(lat) + dlat)
+        dlon = dlat / math.cos(math.radians(edge))
+        if dlon >= 180.0:
+            cols = range(self.lon_cells)
+        else:
+            col0 = int(math.floor((lon - dlon) / size))
+            col1 = int(math.floor((lon + dlon) / size))
+            cols = [c % self.lon_cells for c in range(col0, min(col1, col0 + self.lon_cells - 1) + 1)]
+
+        cells = self.cells
+        for row in range(row0, row1 + 1):
+            for col in cols:
+                bucket = cells.get((row, col))
+                if bucket:
+                    yield bucket
+
+    def query(self, lat, lon, radius_nm, alt=None, band_ft=None):
+        """
+        [(distance_nm, aircraft)] within radius_nm of (lat, lon), nearest
+        first; with alt and band_ft, only aircraft within +/-band_ft of
+        alt (aircraft without altitude are left out)
+        """
+        check_alt = alt is not None and band_ft is not None
+        found = []
+        for bucket in self._cells_around(lat, lon, radius_nm):
+            if check_alt:
+                found.extend(ac for ac in bucket.values()
+                             if ac.alt is not None and abs(ac.alt - alt) <= band_ft)
+            else:
+                found.extend(bucket.values())
+        if not found:
+            return []
+
+        dist = haversine(lat, lon, [ac.lat for ac in found], [ac.lon for ac in found])
+        out = [(float(d), ac) for d, ac in zip(dist, found) if d <= radius_nm]
+        out.sort(key=lambda t: t[0])
+        return out
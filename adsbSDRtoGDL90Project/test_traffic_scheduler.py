@@ -0,0 +1,56 @@
+"""
+Test the variable-rate traffic scheduler.
+"""
+
+import unittest
+
+from aircraft_store import AircraftStore
+from traffic_scheduler import TrafficScheduler, REPORT_MAX_INTERVAL
+
+TICK = 0.25
+STATIC = 0xA00001
+MOVING = 0xA00002
+
+
+def sbs_position(icao, lat, lon, alt):
+    return f"MSG,3,1,1,{icao:06X},1,,,,,,{alt},,,{lat},{lon},,,,,,0".encode("ascii")
+
+
+class ChangeGateChecks(unittest.TestCase):
+    """Test that unchanged targets are not resent at the full rate"""
+
+    def _run(self, ownship, seconds=20):
+        """one position per second for both targets; reports per ICAO"""
+        store = AircraftStore(ttl=60.0)
+        scheduler = TrafficScheduler(max_rate=200.0, ownship=ownship)
+        reports = {STATIC: 0, MOVING: 0}
+        for n in range(int(seconds / TICK)):
+            now = n * TICK
+            if n % int(1 / TICK) == 0:
+                store.feed_line(sbs_position(STATIC, -23.0, -46.0, 3000), now)
+                store.feed_line(sbs_position(MOVING, -23.1 + 0.002 * now, -46.1, 5000), now)
+            for ac in scheduler.select(store, now, TICK):
+                reports[ac.icao] += 1
+        return reports
+
+    def test_no_ownship(self):
+        reports = self._run(None)
+        # static: first sighting, then every REPORT_MAX_INTERVAL
+        self.assertEqual(reports[STATIC], int(20 / REPORT_MAX_INTERVAL))
+        # moving: every new position, 1 Hz
+        self.assertEqual(reports[MOVING], 20)
+
+    def test_static_target_near_ownship(self):
+        # inside NEAR_NM the static target keeps 1 Hz
+        reports = self._run((-23.01, -46.0))
+        self.assertEqual(reports[STATIC], 20)
+
+    def test_static_target_far_from_ownship(self):
+        # both in the 10-30 nm band (2 s); unchanged, the static one drops to 5 s
+        reports = self._run((-23.4, -46.0))
+        self.assertEqual(reports[STATIC], 4)
+        self.assertEqual(reports[MOVING], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
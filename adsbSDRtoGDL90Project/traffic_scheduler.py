@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Variable-rate traffic output for the ADS-B bridge.
+
+  - each target has its own update interval, from its distance to
+    ownship (near traffic at >= 1 Hz, distant traffic throttled) and
+    shortened when its state changed noticeably since the last report
+  - a target whose position and altitude have not changed since its
+    last report is only resent every REPORT_MAX_INTERVAL, unless it is
+    within NEAR_NM of ownship
+  - a global budget caps the messages per second; when more targets are
+    due than the budget allows, the ones most overdue relative to their
+    own interval go first, so distant targets are delayed but never
+    starved
+"""
+
+import heapq
+import math
+
+from spatial_index import distance_nm
+
+# ===============================
+# POLICY
+# ===============================
+# (max distance nm, interval s)
+RANGE_INTERVALS = (
+    (10.0, 1.0),
+    (30.0, 2.0),
+    (60.0, 5.0),
+    (math.inf, 10.0),
+)
+NO_OWNSHIP_INTERVAL = 1.0
+NEAR_NM = RANGE_INTERVALS[0][0]   # static targets this close keep the full rate
+REPORT_MAX_INTERVAL = 5.0    # resend an unchanged target at least this often
+POSITION_MAX_AGE = 10.0      # older MSG,3 / altitude data: target not reported
+
+MIN_INTERVAL = 1.0
+ALT_CHANGE_FT = 200.0        # altitude change that forces an early report
+TRACK_CHANGE_DEG = 15.0      # track change that forces an early report
+
+
+# ===============================
+# SCHEDULER
+# ===============================
+class _Slot:
+    __slots__ = ("next_due", "last", "interval", "alt", "track")
+
+    def __init__(self, now):
+        self.next_due = now
+        self.last = None            # time of the last report
+        self.interval = MIN_INTERVAL
+        self.alt = None
+        self.track = None
+
+
+class TrafficScheduler:
+    def __init__(self, max_rate=200.0, ownship=None, position_max_age=POSITION_MAX_AGE):
+        self.max_rate = max_rate          # messages per second, all targets
+        self.ownship = ownship            # (lat, lon) or None
+        self.position_max_age = position_max_age
+        self.slots = {}
+        self.sent = 0
+        self.deferred = 0
+
+    def interval(self, ac):
+        if self.ownship is None:
+            interval, near = NO_OWNSHIP_INTERVAL, False
+        else:
+            d = distance_nm(self.ownship[0], self.ownship[1], ac.lat, ac.lon)
+            near = d <= NEAR_NM
+            for limit, interval in RANGE_INTERVALS:
+                if d <= limit:
+                    break
+        if ac.moved or near:
+            return interval
+        return max(interval, REPORT_MAX_INTERVAL)
+
+    def _changed(self, slot, ac):
+        if abs(ac.alt - slot.alt) >= ALT_CHANGE_FT:
+            return True
+        if ac.track is not None and slot.track is not None:
+            d = abs(ac.track - slot.track) % 360.0
+            if min(d, 360.0 - d) >= TRACK_CHANGE_DEG:
+                return True
+        return False
+
+    def select(self, aircraft, now, period):
+        """
+        targets to report in this tick (period seconds long), at most
+        max_rate * period of them
+        """
+        budget = max(1, int(self.max_rate * period))
+        max_age = self.position_max_age
+        slots = self.slots
+        due = []
+
+        for ac in aircraft:
+            if not ac.has_position(now, max_age):
+                continue
+            slot = slots.get(ac.icao)
+            if slot is None:
+                slot = slots[ac.icao] = _Slot(now)
+
+            slot.interval = self.interval(ac)
+            due_at = slot.next_due
+            if slot.last is not None:
+                if ac.moved:
+                    # moving again after a quiet spell: back to its own rate
+                    due_at = min(due_at, slot.last + slot.interval)
+                    if self._changed(slot, ac):
+                        # noticeable change: report as soon as the minimum allows
+                        due_at = min(due_at, slot.last + MIN_INTERVAL)
+                else:
+                    # unchanged since the last report: hold it to the longer interval
+                    due_at = max(due_at, slot.last + slot.interval)
+            if due_at <= now:
+                # lateness (plus this tick) in units of the target's own
+                # interval: near targets win ties, distant ones catch up
+                due.append(((now - due_at + period) / slot.interval, ac.icao, due_at, ac, slot))
+
+        if len(due) > budget:
+            self.deferred += len(due) - budget
+            due = heapq.nlargest(budget, due)
+
+        out = []
+        for _, _, due_at, ac, slot in due:
+            # keep the target's phase when it was only deferred a little,
+            # so a late tick does not lower its average rate
+            if now - due_at < slot.interval:
+                slot.next_due = due_at + slot.interval
+            else:
+                slot.next_due = now + slot.interval
+            slot.last = now
+            slot.alt = ac.alt
+            slot.track = ac.track
+            ac.moved = False
+            out.append(ac)
+        self.sent += len(out)
+        return out
+
+    def forget(self, icaos):
+        for icao in icaos:
+            self.slots.pop(icao, None)
@@ -241,29 +241,7 @@ class Decoder(object):
     
     def _unescape(self, msg:bytearray) -> bytearray:
         """unescape 0x7e and 0x7d characters in coded message"""
-        msgNew = bytearray()
-        escapeValue = 0x7d
-        foundEscapeChar = False
-        while True:
-            try:
-                i = msg.index(escapeValue)
-                foundEscapeChar = True
-                msgNew.extend(msg[0:i]); # everything up to the escape character
-                
-                # this will throw an exception if nothing follows the escape
-                escapedValue = msg[i+1] ^ 0x20
-                msgNew.append(escapedValue); # escaped value
-                del(msg[0:i+2]); # remove prefix bytes, escape, and escaped value
-                
-            except (ValueError, IndexError):
-                # no more escape characters
-                if foundEscapeChar:
-                    msgNew.extend(msg)
-                    return msgNew
-                else:
-                    return msg
-        
-        raise Exception("_unescape: unexpected reached end")
+        return unescape(msg)
     
     
     def _messageHex(self, msg, prefix="", suffix="", maxbytes=32, breakint=4):
@@ -276,4 +254,51 @@ class Decoder(object):
             if ((i+1) % breakint) == 0:
                 s += " "
         return "%s%s%s" % (prefix, s.strip(), suffix)
+
+
+def unescape(msg:bytearray) -> bytearray:
+    """unescape 0x7e and 0x7d characters in coded message"""
+    msgNew = bytearray()
+    escapeValue = 0x7d
+    foundEscapeChar = False
+    while True:
+        try:
+            i = msg.index(escapeValue)
+            foundEscapeChar = True
+            msgNew.extend(msg[0:i]); # everything up to the escape character
+            
+            # this will throw an exception if nothing follows the escape
+            escapedValue = msg[i+1] ^ 0x20
+            msgNew.append(escapedValue); # escaped value
+            del(msg[0:i+2]); # remove prefix bytes, escape, and escaped value
+            
+        except (ValueError, IndexError):
+            # no more escape characters
+            if foundEscapeChar:
+                msgNew.extend(msg)
+                return msgNew
+            else:
+                return msg
     
+    raise Exception("unescape: unexpected reached end")
+
+
+def decodeMessages(datagrams):
+    """decode the framed messages in a sequence of byte chunks (datagrams
+    or reads of a stream) without printing
+    Return:  (list of message objects, count of frames with a bad CRC)"""
+    data = b"".join(bytes(d) for d in datagrams)
+    decoded = []
+    badCrc = 0
+    # only what sits between two 0x7e markers is a whole frame
+    for escaped in data.split(b"\x7e")[1:-1]:
+        if not escaped:
+            continue
+        rawMsg = unescape(bytearray(escaped))
+        if len(rawMsg) < 5 or not crcCheck(rawMsg[:-2], rawMsg[-2:]):
+            badCrc += 1
+            continue
+        msg = messages.messageToObject(rawMsg[:-2])
+        if msg:
+            decoded.append(msg)
+    return decoded, badCrc
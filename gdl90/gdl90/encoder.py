@@ -6,6 +6,8 @@ import datetime
 import struct
 from gdl90.fcs import crcCompute
 
+UDP_PAYLOAD = 1472           # 1500 MTU - IPv4 (20) - UDP (8)
+
 class Encoder(object):
     """GDL-90 data link interface decoder class"""
 
@@ -265,3 +267,23 @@ class Encoder(object):
         msg.extend(struct.pack(fmt, subId, mv, sn, nameShort, nameLong, capmask))
 
         return(self._preparedMessage(msg))
+
+
+def packDatagrams(frames, limit=UDP_PAYLOAD):
+    """concatenate whole prepared messages into payloads of at most
+    limit bytes; limit <= 0 keeps one message per datagram"""
+    if limit <= 0:
+        return list(frames)
+    out = []
+    parts = []
+    size = 0
+    for f in frames:
+        if size + len(f) > limit and parts:
+            out.append(b"".join(parts))
+            parts = []
+            size = 0
+        parts.append(f)
+        size += len(f)
+    if parts:
+        out.append(b"".join(parts))
+    return out
@@ -113,7 +113,7 @@ def _parseMessageType10and20(msgType:str, msgBytes:bytearray) -> namedtuple:
     fields.append(msgBytes[18]) ;# emitter category
 
     # call sign; if blank, change to "-"
-    callsign = str(msgBytes[19:27]).rstrip()  # call sign
+    callsign = msgBytes[19:27].decode('ascii', 'replace').rstrip()  # call sign
     if callsign == "": callsign ="-"
     fields.append(callsign)
 
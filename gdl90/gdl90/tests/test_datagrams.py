@@ -0,0 +1,74 @@
+"""
+Test packing messages into UDP datagrams and decoding them back.
+"""
+
+import unittest
+
+from gdl90.encoder import Encoder, packDatagrams, UDP_PAYLOAD
+from gdl90.decoder import decodeMessages
+
+
+class DatagramChecks(unittest.TestCase):
+
+    def _traffic(self, count):
+        msg_encoder = Encoder()
+        frames = []
+        for i in range(count):
+            frames.append(bytes(msg_encoder.msgTrafficReport(
+                address=0xA00000 + i,
+                latitude=-23.5 + i * 0.01,
+                longitude=-46.6,
+                altitude=3000 + 100 * i,
+                callSign="T%d" % (i),
+            )))
+        return frames
+
+
+    def test_pack_whole_frames(self):
+        frames = self._traffic(100)
+        datagrams = packDatagrams(frames)
+        self.assertEqual(b"".join(datagrams), b"".join(frames))
+        self.assertTrue(all(len(d) <= UDP_PAYLOAD for d in datagrams))
+        self.assertLess(len(datagrams), len(frames))
+        # every datagram starts and ends on a frame boundary
+        for d in datagrams:
+            self.assertEqual(d[0], 0x7E)
+            self.assertEqual(d[-1], 0x7E)
+
+
+    def test_pack_one_per_datagram(self):
+        frames = self._traffic(5)
+        self.assertEqual(packDatagrams(frames, 0), frames)
+        self.assertEqual(packDatagrams(frames, 10), frames)
+
+
+    def test_round_trip(self):
+        frames = self._traffic(100)
+        decoded, badCrc = decodeMessages(packDatagrams(frames))
+        self.assertEqual(badCrc, 0)
+        self.assertEqual(len(decoded), 100)
+        for i, m in enumerate(decoded):
+            self.assertEqual(m.MsgType, 'TrafficReport')
+            self.assertEqual(m.Address, 0xA00000 + i)
+            self.assertEqual(m.Altitude, 3000 + 100 * i)
+
+
+    def test_bad_crc(self):
+        frames = self._traffic(3)
+        damaged = bytearray(frames[1])
+        damaged[10] ^= 0x01
+        decoded, badCrc = decodeMessages([frames[0], bytes(damaged), frames[2]])
+        self.assertEqual(badCrc, 1)
+        self.assertEqual([m.Address for m in decoded], [0xA00000, 0xA00002])
+
+
+    def test_partial_frames_are_ignored(self):
+        frames = self._traffic(2)
+        data = frames[0][5:] + frames[1] + frames[0][:5]
+        decoded, badCrc = decodeMessages([data])
+        self.assertEqual(badCrc, 0)
+        self.assertEqual([m.Address for m in decoded], [0xA00001])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,7 @@ Test GDL-90 message byte operation functions
 import unittest
 
 from gdl90.messages import _unsigned32, _signed32, _unsigned24, _signed24, _unsigned16, _signed16, _thunkByte
+from gdl90.messages import _parseTrafficReport
 
 class ByteChecks(unittest.TestCase):
 
@@ -206,4 +207,32 @@ class ByteChecks(unittest.TestCase):
             self.assertEqual(computed, expected, msg=msg)
 
         # Illegal input larger than 8-bit raises ValueError exception
-        self.assertRaises(ValueError, _thunkByte, 0x101, 0x0f, 0)
\ No newline at end of file
+        self.assertRaises(ValueError, _thunkByte, 0x101, 0x0f, 0)
+
+
+class CallsignChecks(unittest.TestCase):
+    """Test the 8-byte call sign field of ownship / traffic reports"""
+
+    # traffic report without the CRC, call sign in bytes 19..26
+    TRAFFIC = bytearray([0x14,0x02,0xA1,0xE6,0x36,0x15,0xAD,0x3F,0xBA,0x3A,0xA9,0x07,0xB9,0x88,0x06,0x7F,0xFF,0xA8,0x01,0x4E,0x32,0x32,0x31,0x52,0x47,0x20,0x20,0x00])
+
+    def _callsign(self, field):
+        self.assertEqual(len(field), 8)
+        data = bytearray(self.TRAFFIC)
+        data[19:27] = field
+        return _parseTrafficReport(data).CallSign
+
+    def test_callsign(self):
+        # samples are: callsign bytes, expected string
+        samples = [
+            (b'N221RG  ', 'N221RG'),          # space padding is stripped
+            (b'TAM3054 ', 'TAM3054'),
+            (b'GLO1234X', 'GLO1234X'),        # all 8 characters used
+            (b'        ', '-'),               # blank call sign
+            (b'N\xc9123   ', 'N\ufffd123'),  # non-ASCII byte is replaced, not an error
+            (b'\xff\xfe      ', '\ufffd\ufffd'),
+        ]
+        for (field, expected) in samples:
+            computed = self._callsign(field)
+            msg = "callsign %r computed=%r is not expected=%r" % (field, computed, expected)
+            self.assertEqual(computed, expected, msg=msg)
@@ -0,0 +1,213 @@
+"""
+Geodesy functions used by GDL 90 utilities
+
+Great-circle distance, initial bearing and destination point on a
+spherical earth, and local ENU/NED coordinates on the WGS-84 ellipsoid
+around a reference point.
+
+Every function accepts plain numbers or array-likes. Plain numbers take
+a 'math'-only path; arrays are computed in one vectorized pass with the
+optional 'numpy' package, which is installed with:
+  # pip3 install numpy
+
+Without numpy, sequences are still accepted and are computed one element
+at a time (results are lists).
+
+Units: degrees, nautical miles, and meters for ENU/NED and heights.
+"""
+
+import math
+from types import SimpleNamespace
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+EARTH_RADIUS_NM = 6371008.8 / 1852.0    # mean earth radius (IUGG)
+METERS_PER_NM = 1852.0
+METERS_PER_FOOT = 0.3048
+
+WGS84_A = 6378137.0
+WGS84_F = 1.0 / 298.257223563
+WGS84_B = WGS84_A * (1.0 - WGS84_F)
+WGS84_E2 = WGS84_F * (2.0 - WGS84_F)
+WGS84_EP2 = WGS84_E2 / (1.0 - WGS84_E2)
+
+
+# The formulas are written once against a small set of operations, bound
+# either to 'math' (scalars) or to numpy ufuncs (arrays).
+_MATH = SimpleNamespace(
+    sin=math.sin, cos=math.cos, sqrt=math.sqrt, hypot=math.hypot,
+    asin=math.asin, atan2=math.atan2,
+    radians=math.radians, degrees=math.degrees,
+    clip1=lambda x: min(1.0, max(-1.0, x)),
+)
+
+if np is not None:
+    _NUMPY = SimpleNamespace(
+        sin=np.sin, cos=np.cos, sqrt=np.sqrt, hypot=np.hypot,
+        asin=np.arcsin, atan2=np.arctan2,
+        radians=np.radians, degrees=np.degrees,
+        clip1=lambda x: np.clip(x, -1.0, 1.0),
+    )
+
+
+def _dispatch(core, *args):
+    """run core(ops, *args) on the scalar, numpy or element-wise path"""
+    for a in args:
+        if not isinstance(a, (int, float)):
+            break
+    else:
+        return core(_MATH, *args)
+
+    if np is not None:
+        return core(_NUMPY, *(np.asarray(a, dtype=np.float64) for a in args))
+
+    # no numpy: broadcast scalars against the sequences by hand
+    size = max(len(a) for a in args if not isinstance(a, (int, float)))
+    columns = [[a] * size if isinstance(a, (int, float)) else list(a) for a in args]
+    if any(len(c) != size for c in columns):
+        raise ValueError("sequence arguments must have the same length")
+    results = [core(_MATH, *row) for row in zip(*columns)]
+    if results and isinstance(results[0], tuple):
+        return tuple(list(col) for col in zip(*results))
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Spherical earth
+
+def _haversine(m, lat0, lon0, lat1, lon1):
+    p0 = m.radians(lat0)
+    p1 = m.radians(lat1)
+    s_dp = m.sin((p1 - p0) * 0.5)
+    s_dl = m.sin(m.radians(lon1 - lon0) * 0.5)
+    a = s_dp * s_dp + m.cos(p0) * m.cos(p1) * s_dl * s_dl
+    return 2.0 * m.asin(m.clip1(m.sqrt(a))) * EARTH_RADIUS_NM
+
+
+def _bearing(m, lat0, lon0, lat1, lon1):
+    p0 = m.radians(lat0)
+    p1 = m.radians(lat1)
+    dl = m.radians(lon1 - lon0)
+    y = m.sin(dl) * m.cos(p1)
+    x = m.cos(p0) * m.sin(p1) - m.sin(p0) * m.cos(p1) * m.cos(dl)
+    return (m.degrees(m.atan2(y, x)) + 360.0) % 360.0
+
+
+def _destination(m, lat, lon, bearing, dist):
+    p0 = m.radians(lat)
+    theta = m.radians(bearing)
+    d = dist / EARTH_RADIUS_NM
+    sin_p0, cos_p0 = m.sin(p0), m.cos(p0)
+    sin_d, cos_d = m.sin(d), m.cos(d)
+    sin_p1 = m.clip1(sin_p0 * cos_d + cos_p0 * sin_d * m.cos(theta))
+    dl = m.atan2(m.sin(theta) * sin_d * cos_p0, cos_d - sin_p0 * sin_p1)
+    lon1 = (lon + m.degrees(dl) + 180.0) % 360.0 - 180.0
+    return m.degrees(m.asin(sin_p1)), lon1
+
+
+def haversine(lat0, lon0, lat1, lon1):
+    """great-circle distance in nm between two points"""
+    return _dispatch(_haversine, lat0, lon0, lat1, lon1)
+
+
+def bearing(lat0, lon0, lat1, lon1):
+    """initial true bearing in degrees [0, 360) from point 0 to point 1"""
+    return _dispatch(_bearing, lat0, lon0, lat1, lon1)
+
+
+def destination(lat, lon, bearing, distance):
+    """(lat, lon) reached after distance nm on an initial true bearing"""
+    return _dispatch(_destination, lat, lon, bearing, distance)
+
+
+# ---------------------------------------------------------------------------
+# WGS-84 ellipsoid, local tangent plane
+
+def _geodetic_to_ecef(m, lat, lon, height):
+    p = m.radians(lat)
+    l = m.radians(lon)
+    sin_p, cos_p = m.sin(p), m.cos(p)
+    n = WGS84_A / m.sqrt(1.0 - WGS84_E2 * sin_p * sin_p)
+    r = (n + height) * cos_p
+    return r * m.cos(l), r * m.sin(l), (n * (1.0 - WGS84_E2) + height) * sin_p
+
+
+def _ecef_to_geodetic(m, x, y, z):
+    # Bowring's method: one step is sub-millimeter for aircraft heights
+    p = m.hypot(x, y)
+    t = m.atan2(z * WGS84_A, p * WGS84_B)
+    sin_t, cos_t = m.sin(t), m.cos(t)
+    lat = m.atan2(z + WGS84_EP2 * WGS84_B * sin_t ** 3,
+                  p - WGS84_E2 * WGS84_A * cos_t ** 3)
+    sin_p, cos_p = m.sin(lat), m.cos(lat)
+    height = p * cos_p + z * sin_p - WGS84_A * m.sqrt(1.0 - WGS84_E2 * sin_p * sin_p)
+    return m.degrees(lat), m.degrees(m.atan2(y, x)), height
+
+
+def _enu(m, lat, lon, height, ref_lat, ref_lon, ref_height):
+    x, y, z = _geodetic_to_ecef(m, lat, lon, height)
+    x0, y0, z0 = _geodetic_to_ecef(m, ref_lat, ref_lon, ref_height)
+    dx, dy, dz = x - x0, y - y0, z - z0
+    p = m.radians(ref_lat)
+    l = m.radians(ref_lon)
+    sin_p, cos_p = m.sin(p), m.cos(p)
+    sin_l, cos_l = m.sin(l), m.cos(l)
+    east = -sin_l * dx + cos_l * dy
+    north = -sin_p * cos_l * dx - sin_p * sin_l * dy + cos_p * dz
+    up = cos_p * cos_l * dx + cos_p * sin_l * dy + sin_p * dz
+    return east, north, up
+
+
+def _enu_to_geodetic(m, east, north, up, ref_lat, ref_lon, ref_height):
+    p = m.radians(ref_lat)
+    l = m.radians(ref_lon)
+    sin_p, cos_p = m.sin(p), m.cos(p)
+    sin_l, cos_l = m.sin(l), m.cos(l)
+    x0, y0, z0 = _geodetic_to_ecef(m, ref_lat, ref_lon, ref_height)
+    x = x0 - sin_l * east - sin_p * cos_l * north + cos_p * cos_l * up
+    y = y0 + cos_l * east - sin_p * sin_l * north + cos_p * sin_l * up
+    z = z0 + cos_p * north + sin_p * up
+    return _ecef_to_geodetic(m, x, y, z)
+
+
+def geodetic_to_ecef(lat, lon, height=0.0):
+    """WGS-84 earth-centered, earth-fixed (x, y, z) in meters"""
+    return _dispatch(_geodetic_to_ecef, lat, lon, height)
+
+
+def ecef_to_geodetic(x, y, z):
+    """(lat, lon, height) for WGS-84 ECEF coordinates in meters"""
+    return _dispatch(_ecef_to_geodetic, x, y, z)
+
+
+def enu(lat, lon, height, ref_lat, ref_lon, ref_height=0.0):
+    """(east, north, up) in meters of a point relative to a reference point"""
+    return _dispatch(_enu, lat, lon, height, ref_lat, ref_lon, ref_height)
+
+
+def enu_to_geodetic(east, north, up, ref_lat, ref_lon, ref_height=0.0):
+    """(lat, lon, height) of an ENU offset from a reference point"""
+    return _dispatch(_enu_to_geodetic, east, north, up, ref_lat, ref_lon, ref_height)
+
+
+def ned(lat, lon, height, ref_lat, ref_lon, ref_height=0.0):
+    """(north, east, down) in meters of a point relative to a reference point"""
+    east, north, up = enu(lat, lon, height, ref_lat, ref_lon, ref_height)
+    if isinstance(up, list):
+        return north, east, [-u for u in up]
+    return north, east, -up
+
+
+def ned_to_geodetic(north, east, down, ref_lat, ref_lon, ref_height=0.0):
+    """(lat, lon, height) of an NED offset from a reference point"""
+    if isinstance(down, (int, float)):
+        up = -down
+    elif np is not None:
+        up = -np.asarray(down, dtype=np.float64)
+    else:
+        up = [-d for d in down]
+    return enu_to_geodetic(east, north, up, ref_lat, ref_lon, ref_height)
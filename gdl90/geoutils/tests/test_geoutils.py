@@ -0,0 +1,199 @@
+"""
+Test geodesy functions.
+"""
+
+import math
+import unittest
+from geoutils import geoutils
+from geoutils.geoutils import (haversine, bearing, destination, geodetic_to_ecef,
+                               ecef_to_geodetic, enu, enu_to_geodetic, ned,
+                               ned_to_geodetic, EARTH_RADIUS_NM, WGS84_A, WGS84_B)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+NM_PER_DEGREE = EARTH_RADIUS_NM * math.pi / 180.0
+
+# (lat0, lon0, lat1, lon1)
+ROUTES = [
+    (33.942536, -118.408075, 40.639751, -73.778925),    # KLAX - KJFK
+    (-23.626111, -46.656389, -22.808889, -43.243611),   # SBSP - SBGL
+    (30.456447, -98.294189, 30.463333, -99.736390),     # short hop
+    (51.4775, -0.461389, -33.946111, 151.177222),       # EGLL - YSSY
+    (10.0, 179.5, -10.0, -179.5),                       # across the antimeridian
+]
+
+
+def law_of_cosines(lat0, lon0, lat1, lon1):
+    """independent reference for well separated points"""
+    p0, p1 = math.radians(lat0), math.radians(lat1)
+    dl = math.radians(lon1 - lon0)
+    c = math.sin(p0)*math.sin(p1) + math.cos(p0)*math.cos(p1)*math.cos(dl)
+    return math.acos(max(-1.0, min(1.0, c))) * EARTH_RADIUS_NM
+
+
+class SphericalEarth(unittest.TestCase):
+    """Test great-circle functions on plain floats"""
+
+    def test_haversine_meridian_and_equator(self):
+        self.assertAlmostEqual(haversine(0.0, 0.0, 1.0, 0.0), NM_PER_DEGREE, places=9)
+        self.assertAlmostEqual(haversine(0.0, 0.0, 0.0, 1.0), NM_PER_DEGREE, places=9)
+        self.assertAlmostEqual(haversine(0.0, 0.0, 0.0, 180.0), 180 * NM_PER_DEGREE, places=6)
+        self.assertAlmostEqual(haversine(-90.0, 0.0, 90.0, 0.0), 180 * NM_PER_DEGREE, places=6)
+        self.assertEqual(haversine(30.0, -98.0, 30.0, -98.0), 0.0)
+
+    def test_haversine_routes(self):
+        for route in ROUTES:
+            self.assertAlmostEqual(haversine(*route), law_of_cosines(*route), delta=1e-6)
+        # symmetric
+        for (a, b, c, d) in ROUTES:
+            self.assertAlmostEqual(haversine(a, b, c, d), haversine(c, d, a, b), places=9)
+
+    def test_haversine_short_distance(self):
+        # 1 m apart, where acos() has lost most of its digits
+        dlat = 1.0 / 1852.0 / NM_PER_DEGREE
+        self.assertAlmostEqual(haversine(30.0, -98.0, 30.0 + dlat, -98.0) * 1852.0, 1.0, places=6)
+
+    def test_bearing(self):
+        self.assertAlmostEqual(bearing(0.0, 0.0, 1.0, 0.0), 0.0, places=9)
+        self.assertAlmostEqual(bearing(0.0, 0.0, 0.0, 1.0), 90.0, places=9)
+        self.assertAlmostEqual(bearing(0.0, 0.0, -1.0, 0.0), 180.0, places=9)
+        self.assertAlmostEqual(bearing(0.0, 0.0, 0.0, -1.0), 270.0, places=9)
+        self.assertAlmostEqual(bearing(0.0, 179.5, 0.0, -179.5), 90.0, places=9)
+        # great circle from LAX to JFK starts well north of the rhumb line
+        self.assertAlmostEqual(bearing(*ROUTES[0]), 65.9, delta=0.1)
+
+    def test_destination(self):
+        lat, lon = destination(0.0, 0.0, 90.0, 60.0)
+        self.assertAlmostEqual(lat, 0.0, places=9)
+        self.assertAlmostEqual(lon, 60.0 / NM_PER_DEGREE, places=9)
+        lat, lon = destination(0.0, 179.9, 90.0, 0.2 * NM_PER_DEGREE)
+        self.assertAlmostEqual(lon, -179.9, places=9)
+        lat, lon = destination(89.0, 0.0, 0.0, 2 * NM_PER_DEGREE)
+        self.assertAlmostEqual(lat, 89.0, places=9)
+        self.assertAlmostEqual(abs(lon), 180.0, places=9)
+
+    def test_destination_round_trip(self):
+        for route in ROUTES:
+            dist = haversine(*route)
+            lat, lon = destination(route[0], route[1], bearing(*route), dist)
+            self.assertLess(haversine(lat, lon, route[2], route[3]), 1e-6)
+
+
+class Ellipsoid(unittest.TestCase):
+    """Test WGS-84 ECEF and local ENU/NED coordinates"""
+
+    def test_ecef_axes(self):
+        x, y, z = geodetic_to_ecef(0.0, 0.0, 0.0)
+        self.assertAlmostEqual(x, WGS84_A, places=6)
+        self.assertAlmostEqual(y, 0.0, places=6)
+        self.assertAlmostEqual(z, 0.0, places=6)
+        x, y, z = geodetic_to_ecef(90.0, 0.0, 100.0)
+        self.assertAlmostEqual(x, 0.0, places=6)
+        self.assertAlmostEqual(z, WGS84_B + 100.0, places=6)
+        x, y, z = geodetic_to_ecef(0.0, 90.0, 0.0)
+        self.assertAlmostEqual(y, WGS84_A, places=6)
+
+    def test_ecef_round_trip(self):
+        for (lat, lon, _, _) in ROUTES:
+            for height in (0.0, 3000.0, 15000.0):
+                out = ecef_to_geodetic(*geodetic_to_ecef(lat, lon, height))
+                self.assertAlmostEqual(out[0], lat, places=9)
+                self.assertAlmostEqual(out[1], lon, places=9)
+                self.assertAlmostEqual(out[2], height, places=4)
+
+    def test_enu(self):
+        ref = (30.0, -98.0, 300.0)
+        e, n, u = enu(*ref, *ref)
+        self.assertAlmostEqual(e, 0.0, places=6)
+        self.assertAlmostEqual(n, 0.0, places=6)
+        self.assertAlmostEqual(u, 0.0, places=6)
+        # straight up
+        e, n, u = enu(30.0, -98.0, 1300.0, *ref)
+        self.assertAlmostEqual(e, 0.0, places=6)
+        self.assertAlmostEqual(n, 0.0, places=6)
+        self.assertAlmostEqual(u, 1000.0, places=6)
+        # north and east are positive along their axes; the earth curves away below
+        e, n, u = enu(30.01, -98.0, 300.0, *ref)
+        self.assertAlmostEqual(e, 0.0, places=6)
+        self.assertAlmostEqual(n, 1108.6, delta=0.5)
+        self.assertLess(u, 0.0)
+        e, n, u = enu(30.0, -97.99, 300.0, *ref)
+        self.assertAlmostEqual(e, 964.8, delta=0.5)
+
+    def test_enu_round_trip(self):
+        ref = (-23.55, -46.63, 760.0)
+        for (east, north, up) in ((0.0, 0.0, 0.0), (5000.0, -12000.0, 2500.0),
+                                  (-150000.0, 80000.0, 9000.0)):
+            lat, lon, h = enu_to_geodetic(east, north, up, *ref)
+            out = enu(lat, lon, h, *ref)
+            for got, want in zip(out, (east, north, up)):
+                self.assertAlmostEqual(got, want, places=4)
+
+    def test_ned(self):
+        ref = (45.0, 7.0, 0.0)
+        point = (45.05, 7.05, 1500.0)
+        e, n, u = enu(*point, *ref)
+        self.assertEqual(ned(*point, *ref), (n, e, -u))
+        lat, lon, h = ned_to_geodetic(n, e, -u, *ref)
+        self.assertAlmostEqual(lat, point[0], places=9)
+        self.assertAlmostEqual(lon, point[1], places=9)
+        self.assertAlmostEqual(h, point[2], places=4)
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class Vectorized(unittest.TestCase):
+    """Test that the numpy path matches the scalar path"""
+
+    def setUp(self):
+        self.routes = np.array(ROUTES).T
+
+    def test_haversine_bearing(self):
+        dist = haversine(*self.routes)
+        brg = bearing(*self.routes)
+        self.assertIsInstance(dist, np.ndarray)
+        for i, route in enumerate(ROUTES):
+            self.assertAlmostEqual(dist[i], haversine(*route), places=9)
+            self.assertAlmostEqual(brg[i], bearing(*route), places=9)
+
+    def test_broadcast_against_scalars(self):
+        lats, lons = self.routes[2], self.routes[3]
+        dist = haversine(30.0, -98.0, lats, lons)
+        for i in range(len(ROUTES)):
+            self.assertAlmostEqual(dist[i], haversine(30.0, -98.0, lats[i], lons[i]), places=9)
+
+    def test_destination_and_enu(self):
+        lat, lon = destination(self.routes[0], self.routes[1], [0.0, 90.0, 180.0, 270.0, 45.0], 100.0)
+        e, n, u = enu(lat, lon, 3000.0, 30.0, -98.0)
+        for i, (lat0, lon0, _, _) in enumerate(ROUTES):
+            one = destination(lat0, lon0, [0.0, 90.0, 180.0, 270.0, 45.0][i], 100.0)
+            self.assertAlmostEqual(lat[i], one[0], places=9)
+            self.assertAlmostEqual(lon[i], one[1], places=9)
+            self.assertAlmostEqual(e[i], enu(one[0], one[1], 3000.0, 30.0, -98.0)[0], places=4)
+
+
+class WithoutNumpy(unittest.TestCase):
+    """Test the element-wise fallback used when numpy is missing"""
+
+    def setUp(self):
+        self.saved = geoutils.np
+        geoutils.np = None
+
+    def tearDown(self):
+        geoutils.np = self.saved
+
+    def test_sequences(self):
+        lat0, lon0, lat1, lon1 = (list(col) for col in zip(*ROUTES))
+        dist = haversine(lat0, lon0, lat1, lon1)
+        self.assertIsInstance(dist, list)
+        for i, route in enumerate(ROUTES):
+            self.assertAlmostEqual(dist[i], haversine(*route), places=9)
+        lat, lon = destination(lat0, lon0, 90.0, 10.0)
+        self.assertEqual(len(lat), len(ROUTES))
+        self.assertAlmostEqual(lon[0], destination(lat0[0], lon0[0], 90.0, 10.0)[1], places=9)
+        n, e, d = ned(lat1, lon1, 0.0, 30.0, -98.0)
+        self.assertEqual(len(d), len(ROUTES))
+        self.assertRaises(ValueError, haversine, [1.0, 2.0], [1.0], 0.0, 0.0)
@@ -13,6 +13,7 @@ import argparse, logging, math, socket, sys, time, random
 from collections import namedtuple
 import gdl90.encoder
 from iputils.iputils import Interfaces
+from geoutils.geoutils import haversine
 
 
 # Default values for options
@@ -52,33 +53,10 @@ UAT_UNIT = {
 }
 
 
-LATLONG_TO_RADIANS = math.pi / 180.0
-RADIANS_TO_NM = 180.0 * 60.0 / math.pi
-
 # Network interface singleton
 NetIfaces = Interfaces()
 
 
-def distance(lat0:float, lon0:float, lat1:float, lon1:float) -> float:
-    """compute distance in nm between two points"""
-    lat0 *= LATLONG_TO_RADIANS
-    lat1 *= LATLONG_TO_RADIANS
-    lon0 *= -LATLONG_TO_RADIANS
-    lon1 *= -LATLONG_TO_RADIANS
-    radians = math.acos(math.sin(lat0)*math.sin(lat1)+math.cos(lat0)*math.cos(lat1)*math.cos(lon0-lon1))
-    return(radians*RADIANS_TO_NM)
-
-
-def distance_short(lat0:float, lon0:float, lat1:float, lon1:float) -> float:
-    """compute distance in nm between two points that are close to each other"""
-    lat0 *= LATLONG_TO_RADIANS
-    lat1 *= LATLONG_TO_RADIANS
-    lon0 *= -LATLONG_TO_RADIANS
-    lon1 *= -LATLONG_TO_RADIANS
-    radians = 2.0*math.asin(math.sqrt((math.sin((lat0-lat1)/2.0))**2 + math.cos(lat0)*math.cos(lat1)*(math.sin((lon0-lon1)/2.0))**2))
-    return(radians*RADIANS_TO_NM)
-
-
 def horizontal_speed(distance:float, seconds:float) -> int:
     """compute integer speed in knots for a distance traveled in some number of seconds"""
     return(int(3600.0 * distance / seconds))
@@ -307,7 +285,7 @@ def calculate_position(simtime, startAngle, angularVelo, latCenter, lonCenter, p
     if angularVelo < 0.0: 
         heading = 360.0 - heading
         
-    distanceMoved = distance_short(currLat, currLon, nextLat, nextLon)
+    distanceMoved = haversine(currLat, currLon, nextLat, nextLon)
     horzVelo = horizontal_speed(distanceMoved, 1.0)
 
     return([currLat, currLon, horzVelo, vertVelo, currAlt, heading])
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+gdl90 / geoutils for the projects in this repository checkout.
+
+Appends the gdl90 directory (the gdl90 and geoutils packages) to
+sys.path: an installed copy is found first, the checkout otherwise.
+A script only gets its own folder on sys.path, so each project reaches
+this module through the repository root:
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    import gdl90_checkout  # noqa: F401
+
+The gdl90 folder itself then looks like a namespace package from the
+root; a regular package (installed or in the checkout) still wins.
+"""
+
+import os
+import sys
+
+GDL90_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gdl90")
+
+if GDL90_DIR not in sys.path:
+    sys.path.append(GDL90_DIR)